@@ -1,3 +1,4 @@
+import numpy as np
 from seal import *
 from seal_helper import print_example_banner, print_parameters, print_vector
 
@@ -60,6 +61,62 @@ def ckks_rotation():
     print_vector(result, 8, 3)
 
 
+def hoisted_rotation_check():
+    print_example_banner("Example: Rotation / rotate_*_many against one rotation per step")
+
+    # Keys for some of the steps only: 5 and -5 are composed from the keys for 4 and 1,
+    # 0 is a copy, and 3 appears twice.
+    key_steps = [1, 2, 3, 4, -1, -4]
+    steps = [0, 1, 3, 4, -1, 5, -5, 3]
+
+    for name in ("bfv", "bgv", "ckks"):
+        scheme = getattr(scheme_type, name)
+        parms = EncryptionParameters(scheme)
+        poly_modulus_degree = 8192
+        parms.set_poly_modulus_degree(poly_modulus_degree)
+        if scheme == scheme_type.ckks:
+            parms.set_coeff_modulus(CoeffModulus.Create(poly_modulus_degree, [60, 40, 40, 60]))
+        else:
+            parms.set_coeff_modulus(CoeffModulus.BFVDefault(poly_modulus_degree))
+            parms.set_plain_modulus(PlainModulus.Batching(poly_modulus_degree, 20))
+
+        context = SEALContext(parms)
+        keygen = KeyGenerator(context)
+        encryptor = Encryptor(context, keygen.create_public_key())
+        evaluator = Evaluator(context)
+        decryptor = Decryptor(context, keygen.secret_key())
+        galois_keys = keygen.create_galois_keys(key_steps)
+
+        rng = np.random.default_rng(0)
+        if scheme == scheme_type.ckks:
+            encoder = CKKSEncoder(context)
+            values = rng.uniform(-1, 1, encoder.slot_count())
+            encrypted = encryptor.encrypt(encoder.encode(values, 2.0 ** 40))
+            rotate, rotate_many = evaluator.rotate_vector, evaluator.rotate_vector_many
+        else:
+            encoder = BatchEncoder(context)
+            values = rng.integers(0, 1000, encoder.slot_count(), dtype=np.int64)
+            encrypted = encryptor.encrypt(encoder.encode(values))
+            rotate, rotate_many = evaluator.rotate_rows, evaluator.rotate_rows_many
+
+        # The first data level, and one level further down the modulus chain.
+        for level, cipher in enumerate([encrypted, evaluator.mod_switch_to_next(encrypted)]):
+            hoisted = rotate_many(cipher, steps, galois_keys)
+            assert len(hoisted) == len(steps)
+            for step, result in zip(steps, hoisted):
+                expected = encoder.decode(decryptor.decrypt(rotate(cipher, step, galois_keys)))
+                actual = encoder.decode(decryptor.decrypt(result))
+                if scheme == scheme_type.ckks:
+                    assert np.allclose(actual, expected, atol=1e-3), f"{name} level {level} step {step}"
+                    assert np.allclose(actual, np.roll(values, -step), atol=1e-3), f"{name} level {level} step {step}"
+                else:
+                    assert np.array_equal(actual, expected), f"{name} level {level} step {step}"
+                    rows = np.concatenate([np.roll(row, -step) for row in values.reshape(2, -1)])
+                    assert np.array_equal(actual, rows), f"{name} level {level} step {step}"
+        print(f"{name}: rotate_*_many matches rotate_* for steps {steps} at two levels")
+
+
 if __name__ == "__main__":
     bfv_rotation()
     ckks_rotation()
+    hoisted_rotation_check()
@@ -52,19 +52,26 @@ def pickle_example():
     print('-' * 70)
     cipher1, context1, ckks_encoder1, decryptor1 = get_seal()
     with open('cipher1.bin', 'wb') as f:
-        pickle.dump(cipher1.to_string(), f)
+        pickle.dump(cipher1, f)
         print('write cipher1 data success')
 
     time.sleep(.5)
 
+    # Unpickled objects are rebound to the live SEALContext with the same parms_id.
     with open('cipher1.bin', 'rb') as f:
-        temp = pickle.load(f)
-        cipher2 = context1.from_cipher_str(temp)
+        cipher2 = pickle.load(f)
         plain2 = decryptor1.decrypt(cipher2)
         data = ckks_encoder1.decode(plain2)
         print('read cipher1 data success')
         print(data)
 
+    # Protocol 5 hands the polynomial data out-of-band instead of copying it into the stream.
+    buffers = []
+    header = pickle.dumps(cipher1, protocol=5, buffer_callback=buffers.append)
+    cipher3 = pickle.loads(header, buffers=buffers)
+    print(f'out-of-band pickle: {len(header)} header bytes, {buffers[0].raw().nbytes} data bytes')
+    print(ckks_encoder1.decode(decryptor1.decrypt(cipher3)))
+
     print('-' * 70)
 
 
@@ -1,4 +1,6 @@
+import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 from seal import *
 from seal_helper import print_example_banner
@@ -105,6 +107,56 @@ def bench_ckks(iter_count=10):
     print(f"square+relin+rescale avg: {(t7 - t6) / iter_count * 1000:.3f} ms")
 
 
+def bench_threads(task_count=64):
+    print_example_banner("Example: Performance / Threads")
+
+    parms = EncryptionParameters(scheme_type.ckks)
+    poly_modulus_degree = 8192
+    parms.set_poly_modulus_degree(poly_modulus_degree)
+    parms.set_coeff_modulus(CoeffModulus.Create(poly_modulus_degree, [60, 40, 40, 60]))
+
+    context = SEALContext(parms)
+    keygen = KeyGenerator(context)
+    encryptor = Encryptor(context, keygen.create_public_key())
+    evaluator = Evaluator(context)
+    encoder = CKKSEncoder(context)
+    relin_keys = keygen.create_relin_keys()
+    galois_keys = keygen.create_galois_keys()
+
+    scale = 2.0 ** 40
+    ct = encryptor.encrypt(encoder.encode(np.linspace(0, 1, 16), scale))
+
+    # The context, evaluator and keys are shared by every worker; each task
+    # only writes to the ciphertexts it creates.
+    def task(_):
+        tct = evaluator.square(ct)
+        evaluator.relinearize_inplace(tct, relin_keys)
+        evaluator.rescale_to_next_inplace(tct)
+        evaluator.rotate_vector_inplace(tct, 1, galois_keys)
+
+    worker_counts = sorted({1, 2, 4, 8, os.cpu_count() or 1})
+    baseline = None
+    for workers in worker_counts:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            t0 = time.perf_counter()
+            list(pool.map(task, range(task_count)))
+            t1 = time.perf_counter()
+        throughput = task_count / (t1 - t0)
+        baseline = baseline or throughput
+        print(f"{workers:>3} threads: {throughput:8.1f} ops/s, speedup {throughput / baseline:.2f}x")
+
+    plains = [encoder.encode(np.linspace(0, 1, 16), scale) for _ in range(task_count)]
+    ciphers = [ct] * task_count
+    for threads in worker_counts:
+        set_thread_count(threads)
+        t0 = time.perf_counter()
+        evaluator.multiply_plain_batch(ciphers, plains)
+        t1 = time.perf_counter()
+        print(f"{threads:>3} threads: multiply_plain_batch {task_count / (t1 - t0):8.1f} ops/s")
+    set_thread_count(0)
+
+
 if __name__ == "__main__":
     bench_bfv()
     bench_ckks()
+    bench_threads()
@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+from collections.abc import Buffer
 from enum import IntEnum
-from typing import Iterable, Sequence, TypeAlias, overload
+from typing import IO, Any, Iterable, Iterator, Sequence, TypeAlias, overload
 
 import numpy as np
 from numpy.typing import NDArray
@@ -59,6 +61,16 @@ class VectorUInt(list[int]): ...
 class VectorInt(list[int]): ...
 
 
+def set_thread_count(thread_count: int) -> None:
+    """Resize the native thread pool used by batched operations; 0 uses every core."""
+    ...
+
+
+def thread_count() -> int:
+    """Return the number of threads used by batched operations."""
+    ...
+
+
 class MemoryPoolHandle:
     """Handle to a memory pool used by SEAL for temporary allocations."""
 
@@ -105,6 +117,27 @@ class MemoryManager:
         ...
 
 
+class MemoryPoolScope:
+    """Context manager returned by memory_pool() that makes a pool the default for the current thread."""
+
+    def pool(self) -> MemoryPoolHandle:
+        """Return the pool this scope installs."""
+        ...
+
+    def __enter__(self) -> MemoryPoolHandle: ...
+    def __exit__(self, *args: Any) -> None: ...
+
+
+def memory_pool(pool: MemoryPoolHandle) -> MemoryPoolScope:
+    """Make pool the default for Evaluator, Encryptor and encoder calls on this thread inside the with block."""
+    ...
+
+
+def current_pool() -> MemoryPoolHandle:
+    """Return the pool calls on this thread allocate from: the innermost memory_pool scope, or the global pool."""
+    ...
+
+
 class Modulus:
     """Represents an integer modulus used in encryption parameters."""
 
@@ -198,6 +231,10 @@ class EncryptionParameters:
         """Load serialized encryption parameters from bytes."""
         ...
 
+    def load_from(self, buffer: Buffer) -> int:
+        """Load serialized encryption parameters from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
     def save_size(self, compr_mode: compr_mode_type = ...) -> int:
         """Return the serialized size in bytes for the given compression mode."""
         ...
@@ -206,6 +243,10 @@ class EncryptionParameters:
         """Serialize the encryption parameters to a Python bytes object."""
         ...
 
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the encryption parameters into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
 
 class EncryptionParameterQualifiers:
     """Precomputed validation results and capabilities of a parameter set."""
@@ -275,6 +316,25 @@ class SEALContext:
         """Create a context and optionally expand the modulus switching chain."""
         ...
 
+    @staticmethod
+    def shared(
+        parms: EncryptionParameters,
+        expand_mod_chain: bool = True,
+        sec_level: sec_level_type = sec_level_type.tc128,
+    ) -> SEALContext:
+        """Return the process-wide context for these parameters, creating it on first use."""
+        ...
+
+    @staticmethod
+    def shared_count() -> int:
+        """Return the number of contexts held by SEALContext.shared."""
+        ...
+
+    @staticmethod
+    def clear_shared() -> None:
+        """Drop the cache behind SEALContext.shared."""
+        ...
+
     def get_context_data(self, parms_id: ParmsId) -> ContextData | None:
         """Return ContextData for a specific parms_id."""
         ...
@@ -485,6 +545,10 @@ class Plaintext:
         """Load a serialized plaintext from bytes and validate it."""
         ...
 
+    def load_from(self, context: SEALContext, buffer: Buffer) -> int:
+        """Load a serialized plaintext from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
     def save_size(self, compr_mode: compr_mode_type = ...) -> int:
         """Return the serialized size in bytes for the given compression mode."""
         ...
@@ -493,6 +557,22 @@ class Plaintext:
         """Serialize the plaintext to a Python bytes object."""
         ...
 
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the plaintext into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+    def data(self) -> NDArray[np.uint64]:
+        """Return a writable zero-copy view of the coefficients."""
+        ...
+
+    def __buffer__(self, flags: int, /) -> memoryview:
+        """Expose the coefficients through the buffer protocol."""
+        ...
+
+    def __reduce_ex__(self, protocol: int, /) -> tuple[object, ...]:
+        """Pickle support; under protocol 5 the coefficient data travels out-of-band as a PickleBuffer."""
+        ...
+
 
 class Ciphertext:
     """Encrypted value together with parameter metadata."""
@@ -578,6 +658,10 @@ class Ciphertext:
         """Load a serialized ciphertext from bytes and validate it."""
         ...
 
+    def load_from(self, context: SEALContext, buffer: Buffer) -> int:
+        """Load a serialized ciphertext from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
     def save_size(self, compr_mode: compr_mode_type = ...) -> int:
         """Return the serialized size in bytes for the given compression mode."""
         ...
@@ -586,6 +670,22 @@ class Ciphertext:
         """Serialize the ciphertext to a Python bytes object."""
         ...
 
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the ciphertext into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+    def data(self) -> NDArray[np.uint64]:
+        """Return a writable zero-copy view of shape (size, coeff_modulus_size, poly_modulus_degree)."""
+        ...
+
+    def __buffer__(self, flags: int, /) -> memoryview:
+        """Expose the polynomial data through the buffer protocol."""
+        ...
+
+    def __reduce_ex__(self, protocol: int, /) -> tuple[object, ...]:
+        """Pickle support; under protocol 5 the polynomial data travels out-of-band as a PickleBuffer."""
+        ...
+
 
 class SecretKey:
     """Stores the secret key used for decryption and symmetric encryption."""
@@ -616,6 +716,22 @@ class SecretKey:
         """Serialize the secret key to a Python bytes object."""
         ...
 
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return the serialized size in bytes for the given compression mode."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the secret key into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+    def load_from(self, context: SEALContext, buffer: Buffer) -> int:
+        """Load a serialized secret key from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
+    def __reduce_ex__(self, protocol: int, /) -> tuple[object, ...]:
+        """Pickle support; under protocol 5 the serialized key travels out-of-band as a PickleBuffer."""
+        ...
+
 
 class PublicKey:
     """Stores the public key used for public-key encryption."""
@@ -646,6 +762,22 @@ class PublicKey:
         """Serialize the public key to a Python bytes object."""
         ...
 
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return the serialized size in bytes for the given compression mode."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the public key into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+    def load_from(self, context: SEALContext, buffer: Buffer) -> int:
+        """Load a serialized public key from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
+    def __reduce_ex__(self, protocol: int, /) -> tuple[object, ...]:
+        """Pickle support; under protocol 5 the serialized key travels out-of-band as a PickleBuffer."""
+        ...
+
 
 class KSwitchKeys:
     """Base container for key switching key material."""
@@ -703,6 +835,22 @@ class RelinKeys(KSwitchKeys):
         """Serialize the relinearization keys to a Python bytes object."""
         ...
 
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return the serialized size in bytes for the given compression mode."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the relinearization keys into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+    def load_from(self, context: SEALContext, buffer: Buffer) -> int:
+        """Load serialized relinearization keys from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
+    def __reduce_ex__(self, protocol: int, /) -> tuple[object, ...]:
+        """Pickle support; under protocol 5 the serialized key set travels out-of-band as a PickleBuffer."""
+        ...
+
 
 class GaloisKeys(KSwitchKeys):
     """Galois keys used for rotations and CKKS complex conjugation."""
@@ -730,6 +878,102 @@ class GaloisKeys(KSwitchKeys):
         """Serialize the Galois keys to a Python bytes object."""
         ...
 
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return the serialized size in bytes for the given compression mode."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize the Galois keys into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+    def load_from(self, context: SEALContext, buffer: Buffer) -> int:
+        """Load serialized Galois keys from any contiguous buffer without copying it and return the bytes read."""
+        ...
+
+    def __reduce_ex__(self, protocol: int, /) -> tuple[object, ...]:
+        """Pickle support; under protocol 5 the serialized key set travels out-of-band as a PickleBuffer."""
+        ...
+
+
+class SerializablePublicKey:
+    """Seed-compressed public key that can only be serialized; load it as a regular object."""
+
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return an upper bound on the serialized size in bytes."""
+        ...
+
+    def save(self, path: str, compr_mode: compr_mode_type = ...) -> None:
+        """Serialize to a file."""
+        ...
+
+    def to_bytes(self, compr_mode: compr_mode_type = ...) -> bytes:
+        """Serialize to a Python bytes object."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+
+class SerializableRelinKeys:
+    """Seed-compressed relinearization keys that can only be serialized; load it as a regular object."""
+
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return an upper bound on the serialized size in bytes."""
+        ...
+
+    def save(self, path: str, compr_mode: compr_mode_type = ...) -> None:
+        """Serialize to a file."""
+        ...
+
+    def to_bytes(self, compr_mode: compr_mode_type = ...) -> bytes:
+        """Serialize to a Python bytes object."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+
+class SerializableGaloisKeys:
+    """Seed-compressed Galois keys that can only be serialized; load it as a regular object."""
+
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return an upper bound on the serialized size in bytes."""
+        ...
+
+    def save(self, path: str, compr_mode: compr_mode_type = ...) -> None:
+        """Serialize to a file."""
+        ...
+
+    def to_bytes(self, compr_mode: compr_mode_type = ...) -> bytes:
+        """Serialize to a Python bytes object."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
+
+class SerializableCiphertext:
+    """Seed-compressed ciphertext that can only be serialized; load it as a regular object."""
+
+    def save_size(self, compr_mode: compr_mode_type = ...) -> int:
+        """Return an upper bound on the serialized size in bytes."""
+        ...
+
+    def save(self, path: str, compr_mode: compr_mode_type = ...) -> None:
+        """Serialize to a file."""
+        ...
+
+    def to_bytes(self, compr_mode: compr_mode_type = ...) -> bytes:
+        """Serialize to a Python bytes object."""
+        ...
+
+    def save_into(self, buffer: Buffer, compr_mode: compr_mode_type = ...) -> int:
+        """Serialize into a writable buffer of at least save_size(compr_mode) bytes and return the bytes written."""
+        ...
+
 
 class KeyGenerator:
     """Generate secret, public, relinearization, and Galois keys."""
@@ -779,10 +1023,33 @@ class KeyGenerator:
         ...
 
     @overload
-    def create_galois_keys(self, galois_elts: Sequence[int], destination: GaloisKeys) -> None:
+    def create_galois_keys(self, steps: Sequence[int]) -> GaloisKeys:
+        """Generate and return Galois keys for the requested rotation steps only."""
+        ...
+
+    @overload
+    def create_galois_keys(self, steps: Sequence[int], destination: GaloisKeys) -> None:
         """Generate Galois keys for the requested rotation steps."""
         ...
 
+    def create_public_key_serializable(self) -> SerializablePublicKey:
+        """Generate a public key that serializes with a seed, at about half the size."""
+        ...
+
+    def create_relin_keys_serializable(self) -> SerializableRelinKeys:
+        """Generate relinearization keys that serialize with seeds, at about half the size."""
+        ...
+
+    @overload
+    def create_galois_keys_serializable(self) -> SerializableGaloisKeys:
+        """Generate all supported Galois keys so that they serialize with seeds."""
+        ...
+
+    @overload
+    def create_galois_keys_serializable(self, steps: Sequence[int]) -> SerializableGaloisKeys:
+        """Generate Galois keys for the rotation steps so that they serialize with seeds."""
+        ...
+
 
 class Encryptor:
     """Encrypt plaintexts using a public key or a secret key."""
@@ -811,45 +1078,59 @@ class Encryptor:
         ...
 
     @overload
-    def encrypt_zero(self) -> Ciphertext:
+    def encrypt_zero(self, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Encrypt zero at the first data level and return the ciphertext."""
         ...
 
     @overload
-    def encrypt_zero(self, destination: Ciphertext) -> None:
+    def encrypt_zero(self, destination: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encrypt zero at the first data level into destination."""
         ...
 
     @overload
-    def encrypt_zero(self, parms_id: ParmsId) -> Ciphertext:
+    def encrypt_zero(self, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Encrypt zero for the specified parms_id and return the ciphertext."""
         ...
 
     @overload
-    def encrypt_zero(self, parms_id: ParmsId, destination: Ciphertext) -> None:
+    def encrypt_zero(self, parms_id: ParmsId, destination: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encrypt zero for the specified parms_id into destination."""
         ...
 
     @overload
-    def encrypt(self, plain: Plaintext) -> Ciphertext:
+    def encrypt(self, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Encrypt a plaintext with the public key and return the ciphertext."""
         ...
 
     @overload
-    def encrypt(self, plain: Plaintext, destination: Ciphertext) -> None:
+    def encrypt(self, plain: Plaintext, destination: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encrypt a plaintext with the public key into destination."""
         ...
 
     @overload
-    def encrypt_symmetric(self, plain: Plaintext) -> Ciphertext:
+    def encrypt_symmetric(self, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Encrypt a plaintext with the secret key and return the ciphertext."""
         ...
 
     @overload
-    def encrypt_symmetric(self, plain: Plaintext, destination: Ciphertext) -> None:
+    def encrypt_symmetric(self, plain: Plaintext, destination: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encrypt a plaintext with the secret key into destination."""
         ...
 
+    def encrypt_symmetric_serializable(self, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> SerializableCiphertext:
+        """Encrypt with the secret key into a ciphertext that serializes with a seed, at about half the size."""
+        ...
+
+    @overload
+    def encrypt_zero_symmetric_serializable(self, *, pool: MemoryPoolHandle | None = None) -> SerializableCiphertext:
+        """Encrypt zero with the secret key at the first data level into a seed-compressed ciphertext."""
+        ...
+
+    @overload
+    def encrypt_zero_symmetric_serializable(self, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> SerializableCiphertext:
+        """Encrypt zero with the secret key for parms_id into a seed-compressed ciphertext."""
+        ...
+
 
 class Evaluator:
     """Apply homomorphic operations to ciphertexts and plaintexts."""
@@ -886,31 +1167,31 @@ class Evaluator:
         """Subtract two ciphertexts and return the result."""
         ...
 
-    def multiply_inplace(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> None:
+    def multiply_inplace(self, encrypted1: Ciphertext, encrypted2: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Multiply two ciphertexts and store the result in encrypted1."""
         ...
 
-    def multiply(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> Ciphertext:
+    def multiply(self, encrypted1: Ciphertext, encrypted2: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Multiply two ciphertexts and return the result."""
         ...
 
-    def square_inplace(self, encrypted1: Ciphertext) -> None:
+    def square_inplace(self, encrypted1: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Square a ciphertext in place."""
         ...
 
-    def square(self, encrypted1: Ciphertext) -> Ciphertext:
+    def square(self, encrypted1: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Square a ciphertext and return the result."""
         ...
 
-    def relinearize_inplace(self, encrypted1: Ciphertext, relin_keys: RelinKeys) -> None:
+    def relinearize_inplace(self, encrypted1: Ciphertext, relin_keys: RelinKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Relinearize a ciphertext in place using relinearization keys."""
         ...
 
-    def relinearize(self, encrypted1: Ciphertext, relin_keys: RelinKeys) -> Ciphertext:
+    def relinearize(self, encrypted1: Ciphertext, relin_keys: RelinKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Relinearize a ciphertext and return the result."""
         ...
     @overload
-    def mod_switch_to_next(self, encrypted: Ciphertext) -> Ciphertext:
+    def mod_switch_to_next(self, encrypted: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Mod-switch a ciphertext to the next level and return the result."""
         ...
 
@@ -920,7 +1201,7 @@ class Evaluator:
         ...
 
     @overload
-    def mod_switch_to_next_inplace(self, encrypted: Ciphertext) -> None:
+    def mod_switch_to_next_inplace(self, encrypted: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Mod-switch a ciphertext to the next level in place."""
         ...
 
@@ -930,7 +1211,7 @@ class Evaluator:
         ...
 
     @overload
-    def mod_switch_to_inplace(self, encrypted: Ciphertext, parms_id: ParmsId) -> None:
+    def mod_switch_to_inplace(self, encrypted: Ciphertext, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> None:
         """Mod-switch a ciphertext in place to the specified parms_id."""
         ...
 
@@ -940,7 +1221,7 @@ class Evaluator:
         ...
 
     @overload
-    def mod_switch_to(self, encrypted: Ciphertext, parms_id: ParmsId) -> Ciphertext:
+    def mod_switch_to(self, encrypted: Ciphertext, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Mod-switch a ciphertext to the specified parms_id and return it."""
         ...
 
@@ -949,60 +1230,60 @@ class Evaluator:
         """Mod-switch a plaintext to the specified parms_id and return it."""
         ...
 
-    def rescale_to_next(self, encrypted: Ciphertext) -> Ciphertext:
+    def rescale_to_next(self, encrypted: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Rescale a CKKS ciphertext to the next level and return the result."""
         ...
 
-    def rescale_to_next_inplace(self, encrypted: Ciphertext) -> None:
+    def rescale_to_next_inplace(self, encrypted: Ciphertext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Rescale a CKKS ciphertext to the next level in place."""
         ...
 
-    def rescale_to_inplace(self, encrypted: Ciphertext, parms_id: ParmsId) -> None:
+    def rescale_to_inplace(self, encrypted: Ciphertext, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> None:
         """Rescale a CKKS ciphertext in place to the specified parms_id."""
         ...
 
-    def rescale_to(self, encrypted: Ciphertext, parms_id: ParmsId) -> Ciphertext:
+    def rescale_to(self, encrypted: Ciphertext, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Rescale a CKKS ciphertext to the specified parms_id and return it."""
         ...
 
-    def multiply_many(self, encrypteds: Sequence[Ciphertext], relin_keys: RelinKeys) -> Ciphertext:
+    def multiply_many(self, encrypteds: Sequence[Ciphertext], relin_keys: RelinKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Multiply many ciphertexts together and return the result."""
         ...
 
-    def exponentiate_inplace(self, encrypted: Ciphertext, exponent: int, relin_keys: RelinKeys) -> None:
+    def exponentiate_inplace(self, encrypted: Ciphertext, exponent: int, relin_keys: RelinKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Raise a ciphertext to a power in place."""
         ...
 
-    def exponentiate(self, encrypted: Ciphertext, exponent: int, relin_keys: RelinKeys) -> Ciphertext:
+    def exponentiate(self, encrypted: Ciphertext, exponent: int, relin_keys: RelinKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Raise a ciphertext to a power and return the result."""
         ...
 
-    def add_plain_inplace(self, encrypted: Ciphertext, plain: Plaintext) -> None:
+    def add_plain_inplace(self, encrypted: Ciphertext, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Add a plaintext to a ciphertext in place."""
         ...
 
-    def add_plain(self, encrypted: Ciphertext, plain: Plaintext) -> Ciphertext:
+    def add_plain(self, encrypted: Ciphertext, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Add a plaintext to a ciphertext and return the result."""
         ...
 
-    def sub_plain_inplace(self, encrypted: Ciphertext, plain: Plaintext) -> None:
+    def sub_plain_inplace(self, encrypted: Ciphertext, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Subtract a plaintext from a ciphertext in place."""
         ...
 
-    def sub_plain(self, encrypted: Ciphertext, plain: Plaintext) -> Ciphertext:
+    def sub_plain(self, encrypted: Ciphertext, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Subtract a plaintext from a ciphertext and return the result."""
         ...
 
-    def multiply_plain_inplace(self, encrypted: Ciphertext, plain: Plaintext) -> None:
+    def multiply_plain_inplace(self, encrypted: Ciphertext, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Multiply a ciphertext by a plaintext in place."""
         ...
 
-    def multiply_plain(self, encrypted: Ciphertext, plain: Plaintext) -> Ciphertext:
+    def multiply_plain(self, encrypted: Ciphertext, plain: Plaintext, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Multiply a ciphertext by a plaintext and return the result."""
         ...
 
     @overload
-    def transform_to_ntt_inplace(self, plain: Plaintext, parms_id: ParmsId) -> None:
+    def transform_to_ntt_inplace(self, plain: Plaintext, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> None:
         """Transform a plaintext to NTT form in place."""
         ...
 
@@ -1012,7 +1293,7 @@ class Evaluator:
         ...
 
     @overload
-    def transform_to_ntt(self, plain: Plaintext, parms_id: ParmsId) -> Plaintext:
+    def transform_to_ntt(self, plain: Plaintext, parms_id: ParmsId, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Transform a plaintext to NTT form and return the result."""
         ...
 
@@ -1029,46 +1310,98 @@ class Evaluator:
         """Transform an NTT-form ciphertext back to coefficient form."""
         ...
 
-    def apply_galois_inplace(self, encrypted: Ciphertext, galois_elt: int, galois_keys: GaloisKeys) -> None:
+    def apply_galois_inplace(self, encrypted: Ciphertext, galois_elt: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Apply a Galois automorphism to a ciphertext in place."""
         ...
 
-    def apply_galois(self, encrypted: Ciphertext, galois_elt: int, galois_keys: GaloisKeys) -> Ciphertext:
+    def apply_galois(self, encrypted: Ciphertext, galois_elt: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Apply a Galois automorphism to a ciphertext and return the result."""
         ...
 
-    def rotate_rows_inplace(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> None:
+    def rotate_rows_inplace(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Rotate BFV/BGV batching rows in place."""
         ...
 
-    def rotate_rows(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> Ciphertext:
+    def rotate_rows(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Rotate BFV/BGV batching rows and return the result."""
         ...
 
-    def rotate_columns_inplace(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> None:
+    def rotate_columns_inplace(self, encrypted: Ciphertext, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Rotate BFV/BGV batching columns in place."""
         ...
 
-    def rotate_columns(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> Ciphertext:
+    def rotate_columns(self, encrypted: Ciphertext, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Rotate BFV/BGV batching columns and return the result."""
         ...
 
-    def rotate_vector_inplace(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> None:
+    def rotate_vector_inplace(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Rotate a CKKS vector in place."""
         ...
 
-    def rotate_vector(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> Ciphertext:
+    def rotate_vector(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Rotate a CKKS vector and return the result."""
         ...
 
-    def complex_conjugate_inplace(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> None:
+    def complex_conjugate_inplace(self, encrypted: Ciphertext, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> None:
         """Apply CKKS complex conjugation in place."""
         ...
 
-    def complex_conjugate(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> Ciphertext:
+    def complex_conjugate(self, encrypted: Ciphertext, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> Ciphertext:
         """Apply CKKS complex conjugation and return the result."""
         ...
 
+    def add_batch(self, encrypteds1: Sequence[Ciphertext], encrypteds2: Sequence[Ciphertext], *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Add two lists of ciphertexts element-wise on the native thread pool."""
+        ...
+
+    def sub_batch(self, encrypteds1: Sequence[Ciphertext], encrypteds2: Sequence[Ciphertext], *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Subtract two lists of ciphertexts element-wise on the native thread pool."""
+        ...
+
+    def multiply_batch(self, encrypteds1: Sequence[Ciphertext], encrypteds2: Sequence[Ciphertext], *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Multiply two lists of ciphertexts element-wise on the native thread pool."""
+        ...
+
+    def add_plain_batch(self, encrypteds: Sequence[Ciphertext], plains: Sequence[Plaintext], *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Add plaintexts to ciphertexts element-wise on the native thread pool."""
+        ...
+
+    def multiply_plain_batch(self, encrypteds: Sequence[Ciphertext], plains: Sequence[Plaintext], *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Multiply ciphertexts by plaintexts element-wise on the native thread pool."""
+        ...
+
+    def relinearize_batch(self, encrypteds: Sequence[Ciphertext], relin_keys: RelinKeys, *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Relinearize a list of ciphertexts on the native thread pool."""
+        ...
+
+    def rescale_to_next_batch(self, encrypteds: Sequence[Ciphertext], *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Rescale a list of CKKS ciphertexts to the next level on the native thread pool."""
+        ...
+
+    def rotate_rows_batch(self, encrypteds: Sequence[Ciphertext], steps: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Rotate the BFV/BGV batching rows of every ciphertext on the native thread pool."""
+        ...
+
+    @overload
+    def rotate_vector_batch(self, encrypteds: Sequence[Ciphertext], steps: int, galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Rotate every CKKS ciphertext by steps on the native thread pool."""
+        ...
+
+    @overload
+    def rotate_vector_batch(
+        self, encrypteds: Sequence[Ciphertext], steps: Sequence[int], galois_keys: GaloisKeys
+    ) -> list[Ciphertext]:
+        """Rotate each CKKS ciphertext by its own step count on the native thread pool."""
+        ...
+
+    def rotate_rows_many(self, encrypted: Ciphertext, steps: Sequence[int], galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Rotate one BFV/BGV ciphertext by every step, decomposing it once."""
+        ...
+
+    def rotate_vector_many(self, encrypted: Ciphertext, steps: Sequence[int], galois_keys: GaloisKeys, *, pool: MemoryPoolHandle | None = None) -> list[Ciphertext]:
+        """Rotate one CKKS ciphertext by every step, decomposing it once."""
+        ...
+
 
 class CKKSEncoder:
     """Encode floating-point and complex vectors into CKKS plaintexts."""
@@ -1082,27 +1415,32 @@ class CKKSEncoder:
         ...
 
     @overload
-    def encode(self, values: FloatLikeArray, scale: float) -> Plaintext:
+    def encode(self, values: FloatLikeArray, scale: float, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Encode real values and return the plaintext."""
         ...
 
     @overload
-    def encode(self, values: FloatLikeArray, scale: float, destination: Plaintext) -> None:
+    def encode(self, values: FloatLikeArray, scale: float, destination: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encode real values into destination."""
         ...
 
     @overload
-    def encode(self, value: float, scale: float) -> Plaintext:
+    def encode(self, value: float, scale: float, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Encode one real value and return the plaintext."""
         ...
 
     @overload
-    def encode(self, value: float, scale: float, destination: Plaintext) -> None:
+    def encode(self, value: float, scale: float, destination: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encode one real value into destination."""
         ...
 
     @overload
-    def encode(self, value: int) -> Plaintext:
+    def encode(self, values: NDArray[np.float64], scale: float, *, pool: MemoryPoolHandle | None = None) -> list[Plaintext]:
+        """Encode each row of a 2-D (batch, slots) array in parallel and return the plaintexts."""
+        ...
+
+    @overload
+    def encode(self, value: int, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Encode one integer exactly into a CKKS plaintext."""
         ...
 
@@ -1112,31 +1450,46 @@ class CKKSEncoder:
         ...
 
     @overload
-    def encode_complex(self, values: ComplexLikeArray, scale: float) -> Plaintext:
+    def encode_complex(self, values: ComplexLikeArray, scale: float, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Encode complex values and return the plaintext."""
         ...
 
     @overload
-    def encode_complex(self, values: ComplexLikeArray, scale: float, destination: Plaintext) -> None:
+    def encode_complex(self, values: ComplexLikeArray, scale: float, destination: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encode complex values into destination."""
         ...
 
     @overload
-    def encode_complex(self, value: complex, scale: float) -> Plaintext:
+    def encode_complex(self, values: NDArray[np.complex128], scale: float, *, pool: MemoryPoolHandle | None = None) -> list[Plaintext]:
+        """Encode each row of a 2-D (batch, slots) array in parallel and return the plaintexts."""
+        ...
+
+    @overload
+    def encode_complex(self, value: complex, scale: float, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Encode one complex value and return the plaintext."""
         ...
 
     @overload
-    def encode_complex(self, value: complex, scale: float, destination: Plaintext) -> None:
+    def encode_complex(self, value: complex, scale: float, destination: Plaintext, *, pool: MemoryPoolHandle | None = None) -> None:
         """Encode one complex value into destination."""
         ...
 
-    def decode(self, plain: Plaintext) -> NDArray[np.float64]:
-        """Decode a CKKS plaintext into a NumPy array of real values."""
+    def decode(self, plain: Plaintext, out: NDArray[np.float64] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.float64]:
+        """Decode a CKKS plaintext into real values, optionally filling out in place."""
+        ...
+
+    def decode_many(self, plains: Sequence[Plaintext], out: NDArray[np.float64] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.float64]:
+        """Decode plaintexts in parallel into one (batch, slots) array of real values."""
+        ...
+
+    def decode_complex(self, plain: Plaintext, out: NDArray[np.complex128] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.complex128]:
+        """Decode a CKKS plaintext into complex values, optionally filling out in place."""
         ...
 
-    def decode_complex(self, plain: Plaintext) -> NDArray[np.complex128]:
-        """Decode a CKKS plaintext into a NumPy array of complex values."""
+    def decode_complex_many(
+        self, plains: Sequence[Plaintext], out: NDArray[np.complex128] | None = None, *, pool: MemoryPoolHandle | None = None
+    ) -> NDArray[np.complex128]:
+        """Decode plaintexts in parallel into one (batch, slots) array of complex values."""
         ...
 
 
@@ -1179,14 +1532,692 @@ class BatchEncoder:
         ...
 
     @overload
-    def encode(self, values: IntLikeArray) -> Plaintext:
+    def encode(self, values: IntLikeArray, *, pool: MemoryPoolHandle | None = None) -> Plaintext:
         """Encode integers and return the plaintext."""
         ...
 
-    def decode(self, plain: Plaintext) -> NDArray[np.int64]:
-        """Decode a batched plaintext into signed 64-bit integers."""
+    @overload
+    def encode(self, values: NDArray[np.int64] | NDArray[np.uint64], *, pool: MemoryPoolHandle | None = None) -> list[Plaintext]:
+        """Encode each row of a 2-D (batch, slots) array in parallel and return the plaintexts."""
+        ...
+
+    def decode(self, plain: Plaintext, out: NDArray[np.int64] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.int64]:
+        """Decode a batched plaintext into signed 64-bit integers, optionally filling out in place."""
+        ...
+
+    def decode_many(self, plains: Sequence[Plaintext], out: NDArray[np.int64] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.int64]:
+        """Decode plaintexts in parallel into one (batch, slots) array of signed 64-bit integers."""
+        ...
+
+    def decode_uint64(self, plain: Plaintext, out: NDArray[np.uint64] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.uint64]:
+        """Decode a batched plaintext into unsigned 64-bit integers, optionally filling out in place."""
+        ...
+
+    def decode_uint64_many(self, plains: Sequence[Plaintext], out: NDArray[np.uint64] | None = None, *, pool: MemoryPoolHandle | None = None) -> NDArray[np.uint64]:
+        """Decode plaintexts in parallel into one (batch, slots) array of unsigned 64-bit integers."""
+        ...
+
+
+class ContainerWriter:
+    """Write many ciphertexts and plaintexts into one indexed container file."""
+
+    def __init__(self, path: str, context: SEALContext) -> None:
+        """Create or truncate a container file for objects of the given context."""
+        ...
+
+    @overload
+    def append(self, cipher: Ciphertext, compr_mode: compr_mode_type = ...) -> int:
+        """Append a ciphertext and return its record index."""
+        ...
+
+    @overload
+    def append(self, plain: Plaintext, compr_mode: compr_mode_type = ...) -> int:
+        """Append a plaintext and return its record index."""
+        ...
+
+    def close(self) -> None:
+        """Write the index and close the file."""
+        ...
+
+    def __len__(self) -> int:
+        """Return the number of records written so far."""
+        ...
+
+    def __enter__(self) -> ContainerWriter: ...
+    def __exit__(self, *args: Any) -> None: ...
+
+
+class ContainerReader:
+    """Memory-map a container file and load records lazily by index or slice."""
+
+    def __init__(self, path: str, context: SEALContext | None = None) -> None:
+        """Open a container file, binding records to the given or the matching live context."""
+        ...
+
+    def __len__(self) -> int:
+        """Return the number of records in the container."""
+        ...
+
+    @overload
+    def __getitem__(self, index: int) -> Ciphertext | Plaintext:
+        """Load one record."""
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Ciphertext | Plaintext]:
+        """Load a slice of records in parallel."""
+        ...
+
+    def parms_id(self) -> ParmsId:
+        """Return the key-level parms_id recorded in the header."""
+        ...
+
+    def close(self) -> None:
+        """Unmap and close the file."""
+        ...
+
+    def __enter__(self) -> ContainerReader: ...
+    def __exit__(self, *args: Any) -> None: ...
+
+
+class CiphertextWriter:
+    """Write framed ciphertexts and plaintexts incrementally to a binary stream."""
+
+    def __init__(self, stream: IO[bytes], context: SEALContext) -> None:
+        """Write the stream header for the given context."""
+        ...
+
+    @overload
+    def write(self, cipher: Ciphertext, compr_mode: compr_mode_type = ...) -> None:
+        """Append one ciphertext frame to the stream."""
+        ...
+
+    @overload
+    def write(self, plain: Plaintext, compr_mode: compr_mode_type = ...) -> None:
+        """Append one plaintext frame to the stream."""
         ...
 
-    def decode_uint64(self, plain: Plaintext) -> NDArray[np.uint64]:
-        """Decode a batched plaintext into unsigned 64-bit integers."""
+    def flush(self) -> None:
+        """Flush the underlying stream."""
         ...
+
+
+class CiphertextReader:
+    """Iterate over the objects in a stream written by CiphertextWriter, one frame at a time."""
+
+    def __init__(self, stream: IO[bytes], context: SEALContext | None = None, max_frame_bytes: int = 0) -> None:
+        """Read the stream header, binding objects to the given or the matching live context.
+
+        Frames larger than max_frame_bytes are rejected; 0 allows the largest uncompressed ciphertext at the key level.
+        """
+        ...
+
+    def __iter__(self) -> Iterator[Ciphertext | Plaintext]: ...
+
+    def __next__(self) -> Ciphertext | Plaintext:
+        """Load the next object from the stream."""
+        ...
+
+
+class GaloisKeyPlan:
+    """Galois key set chosen by plan_galois_keys."""
+
+    def steps(self) -> list[int]:
+        """Return the rotation steps to pass to KeyGenerator.create_galois_keys."""
+        ...
+
+    def key_bytes(self) -> int:
+        """Return the estimated size of the planned keys in bytes."""
+        ...
+
+    def bytes_per_key(self) -> int:
+        """Return the estimated size of one Galois key in bytes."""
+        ...
+
+    def path(self, rotation: int) -> list[int]:
+        """Return the planned steps whose rotations compose to the requested rotation."""
+        ...
+
+    def rotation_cost(self, rotation: int) -> int:
+        """Return the number of rotations needed for the requested rotation."""
+        ...
+
+    def extra_rotations(self) -> int:
+        """Return the total number of rotations beyond one per requested rotation."""
+        ...
+
+
+class LinearTransform:
+    """Pre-encoded CKKS matrix-vector product using baby-step giant-step rotations."""
+
+    def __init__(self, context: SEALContext, matrix: NDArray[np.float64], scale: float,
+                 parms_id: ParmsId | None = None, baby_steps: int = 0) -> None:
+        """Encode the diagonals of a (rows, columns) matrix at scale and parms_id, the first data level by default."""
+        ...
+
+    def apply(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> Ciphertext:
+        """Return M x for a ciphertext holding x in its first columns slots and zeros elsewhere, not rescaled."""
+        ...
+
+    def galois_steps(self) -> list[int]:
+        """Return the rotation steps apply() uses, to pass to KeyGenerator.create_galois_keys."""
+        ...
+
+    def rotation_count(self) -> int:
+        """Return the number of key-switching rotations per apply()."""
+        ...
+
+    def shape(self) -> tuple[int, int]:
+        """Return the matrix shape as (rows, columns)."""
+        ...
+
+    def baby_steps(self) -> int:
+        """Return the baby-step count n1."""
+        ...
+
+    def diagonal_count(self) -> int:
+        """Return the number of nonzero diagonals encoded."""
+        ...
+
+    def scale(self) -> float:
+        """Return the scale the diagonals are encoded at."""
+        ...
+
+
+class EncryptedMatMul:
+    """Encrypted square matrix product for CKKS with pre-encoded permutation plaintexts."""
+
+    def __init__(self, context: SEALContext, dimension: int, parms_id: ParmsId | None = None,
+                 cache_path: str | None = None) -> None:
+        """Encode the permutation plaintexts once, or load them from cache_path when it matches."""
+        ...
+
+    def multiply(self, encrypted1: Ciphertext, encrypted2: Ciphertext, relin_keys: RelinKeys,
+                 galois_keys: GaloisKeys) -> Ciphertext:
+        """Return the encrypted product of two row-major encrypted matrices, relinearized and rescaled."""
+        ...
+
+    def galois_steps(self) -> list[int]:
+        """Return the rotation steps multiply() uses, to pass to KeyGenerator.create_galois_keys."""
+        ...
+
+    def dimension(self) -> int:
+        """Return the matrix dimension."""
+        ...
+
+    def parms_id(self) -> ParmsId:
+        """Return the parms_id the inputs are multiplied at."""
+        ...
+
+
+class PlaintextCache:
+    """Memory-bounded LRU cache of encoded plaintexts keyed by a digest of the values, the scale and the target parms_id."""
+
+    def __init__(self, context: SEALContext, max_bytes: int = 1 << 28) -> None:
+        """Create an empty cache holding at most max_bytes of plaintext data."""
+        ...
+
+    def encode(self, values: NDArray[np.float64], scale: float, parms_id: ParmsId | None = None) -> Plaintext:
+        """Return the CKKS plaintext for real values at scale and parms_id, encoding it only on a cache miss."""
+        ...
+
+    def encode_complex(self, values: NDArray[np.complex128], scale: float, parms_id: ParmsId | None = None) -> Plaintext:
+        """Return the CKKS plaintext for complex values at scale and parms_id, encoding it only on a cache miss."""
+        ...
+
+    @overload
+    def encode_integers(self, values: NDArray[np.int64], parms_id: ParmsId | None = None) -> Plaintext:
+        """Return the BFV/BGV plaintext for signed values, in NTT form at parms_id if given."""
+        ...
+
+    @overload
+    def encode_integers(self, values: NDArray[np.uint64], parms_id: ParmsId | None = None) -> Plaintext:
+        """Return the BFV/BGV plaintext for unsigned values, in NTT form at parms_id if given."""
+        ...
+
+    def clear(self) -> None:
+        """Drop every cached plaintext; the counters are kept."""
+        ...
+
+    def __len__(self) -> int: ...
+
+    def bytes(self) -> int:
+        """Return the plaintext data currently cached, in bytes."""
+        ...
+
+    def max_bytes(self) -> int:
+        """Return the memory bound in bytes."""
+        ...
+
+    def hits(self) -> int:
+        """Return the number of lookups served from the cache."""
+        ...
+
+    def misses(self) -> int:
+        """Return the number of lookups that had to encode."""
+        ...
+
+    def evictions(self) -> int:
+        """Return the number of plaintexts evicted to stay within max_bytes."""
+        ...
+
+
+class SlotPacker:
+    """Packs many fixed-width records into the slots of each plaintext."""
+
+    def __init__(self, context: SEALContext, width: int) -> None:
+        """Create a packer for records of width slots under a CKKS or batching-enabled BFV/BGV context."""
+        ...
+
+    def width(self) -> int:
+        """Return the number of slots per record."""
+        ...
+
+    def capacity(self) -> int:
+        """Return the number of records packed into one plaintext."""
+        ...
+
+    def slot_count(self) -> int:
+        """Return the number of slots per plaintext."""
+        ...
+
+    def plain_count(self, records: int) -> int:
+        """Return the number of plaintexts needed to hold the given number of records."""
+        ...
+
+    def offset(self, position: int) -> int:
+        """Return the first slot of the record at position within its plaintext."""
+        ...
+
+    @overload
+    def locate(self, record: int) -> tuple[int, int]:
+        """Return (plaintext index, slot offset) of a record."""
+        ...
+
+    @overload
+    def locate(self, records: NDArray[np.uint64]) -> tuple[NDArray[np.uint64], NDArray[np.uint64]]:
+        """Return (plaintext indices, slot offsets) arrays for an array of records."""
+        ...
+
+    def pack(self, records: NDArray[np.float64], scale: float, parms_id: ParmsId | None = None) -> list[Plaintext]:
+        """Pack a (count, width) array of real records into CKKS plaintexts."""
+        ...
+
+    @overload
+    def pack_integers(self, records: NDArray[np.int64], parms_id: ParmsId | None = None) -> list[Plaintext]:
+        """Pack a (count, width) array of signed records into BFV/BGV plaintexts, in NTT form at parms_id if given."""
+        ...
+
+    @overload
+    def pack_integers(self, records: NDArray[np.uint64], parms_id: ParmsId | None = None) -> list[Plaintext]:
+        """Pack a (count, width) array of unsigned records into BFV/BGV plaintexts, in NTT form at parms_id if given."""
+        ...
+
+    def unpack(
+        self, plains: Sequence[Plaintext], count: int | None = None, out: NDArray[np.float64] | None = None
+    ) -> NDArray[np.float64]:
+        """Decode the first count records of CKKS plaintexts into a (count, width) array."""
+        ...
+
+    def unpack_integers(
+        self,
+        plains: Sequence[Plaintext],
+        count: int | None = None,
+        signed: bool = True,
+        out: NDArray[np.int64] | NDArray[np.uint64] | None = None,
+    ) -> NDArray[np.int64] | NDArray[np.uint64]:
+        """Decode the first count records of BFV/BGV plaintexts into a (count, width) int64, or uint64, array."""
+        ...
+
+    def mask(self, positions: Sequence[int], parms_id: ParmsId | None = None, scale: float | None = None) -> Plaintext:
+        """Return a plaintext with ones in the slots of the records at positions and zeros elsewhere."""
+        ...
+
+    def extract(self, encrypted: Ciphertext, position: int, galois_keys: GaloisKeys | None = None) -> Ciphertext:
+        """Zero every slot outside the record at position, rotating it to slot 0 when galois_keys are given."""
+        ...
+
+
+class CircuitNode:
+    """Handle to a value recorded in a Circuit."""
+
+    def __add__(self, other: CircuitNode) -> CircuitNode: ...
+    def __sub__(self, other: CircuitNode) -> CircuitNode: ...
+    def __mul__(self, other: CircuitNode) -> CircuitNode: ...
+    def __neg__(self) -> CircuitNode: ...
+
+    def is_plain(self) -> bool:
+        """Return True if the node is a plaintext input."""
+        ...
+
+
+class Circuit:
+    """Records Evaluator operations lazily and runs them optimized and in parallel in evaluate()."""
+
+    def __init__(self, context: SEALContext) -> None:
+        """Create an empty circuit for the given context."""
+        ...
+
+    @overload
+    def input(self, encrypted: Ciphertext) -> CircuitNode:
+        """Record a copy of a ciphertext input and return its node."""
+        ...
+
+    @overload
+    def input(self, plain: Plaintext) -> CircuitNode:
+        """Record a copy of a plaintext input and return its node."""
+        ...
+
+    def add(self, a: CircuitNode, b: CircuitNode) -> CircuitNode:
+        """Record a + b. One operand may be a plaintext."""
+        ...
+
+    def sub(self, a: CircuitNode, b: CircuitNode) -> CircuitNode:
+        """Record a - b. One operand may be a plaintext."""
+        ...
+
+    def multiply(self, a: CircuitNode, b: CircuitNode) -> CircuitNode:
+        """Record a * b. One operand may be a plaintext."""
+        ...
+
+    def square(self, a: CircuitNode) -> CircuitNode:
+        """Record a * a."""
+        ...
+
+    def negate(self, a: CircuitNode) -> CircuitNode:
+        """Record -a."""
+        ...
+
+    def rotate_vector(self, a: CircuitNode, steps: int) -> CircuitNode:
+        """Record a CKKS vector rotation of a."""
+        ...
+
+    def rotate_rows(self, a: CircuitNode, steps: int) -> CircuitNode:
+        """Record a BFV/BGV row rotation of a."""
+        ...
+
+    def rotate_columns(self, a: CircuitNode) -> CircuitNode:
+        """Record a BFV/BGV column rotation of a."""
+        ...
+
+    def rescale(self, a: CircuitNode) -> CircuitNode:
+        """Record a CKKS rescale of a to the next level."""
+        ...
+
+    @overload
+    def evaluate(self, output: CircuitNode, relin_keys: RelinKeys | None = None,
+                 galois_keys: GaloisKeys | None = None) -> Ciphertext:
+        """Run the operations output depends on and return its ciphertext."""
+        ...
+
+    @overload
+    def evaluate(self, outputs: Sequence[CircuitNode], relin_keys: RelinKeys | None = None,
+                 galois_keys: GaloisKeys | None = None) -> list[Ciphertext]:
+        """Run the operations the outputs depend on, sharing common work, and return one ciphertext per output."""
+        ...
+
+    def counts(self, outputs: Sequence[CircuitNode], relinearize: bool = True) -> dict[str, int]:
+        """Return how many operations of each kind evaluate() would run for the outputs, after optimization."""
+        ...
+
+    def __len__(self) -> int: ...
+
+
+class ManagedEvaluator:
+    """Evaluator that aligns operand levels and CKKS scales automatically and counts the RNS limbs each operation touched."""
+
+    def __init__(self, context: SEALContext, scale_tolerance: float = 0.0) -> None:
+        """Create a managed evaluator; scales within scale_tolerance of each other are treated as equal."""
+        ...
+
+    def add(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> Ciphertext:
+        """Return encrypted1 + encrypted2 at their lowest common level and a common scale."""
+        ...
+
+    def sub(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> Ciphertext:
+        """Return encrypted1 - encrypted2 at their lowest common level and a common scale."""
+        ...
+
+    def add_many(self, encrypteds: Sequence[Ciphertext]) -> Ciphertext:
+        """Return the sum of the ciphertexts at their lowest common level and a common scale."""
+        ...
+
+    def multiply(self, encrypted1: Ciphertext, encrypted2: Ciphertext, relin_keys: RelinKeys | None = None) -> Ciphertext:
+        """Return encrypted1 * encrypted2, relinearized if relin_keys is given and rescaled for CKKS."""
+        ...
+
+    @overload
+    def multiply_plain(self, encrypted: Ciphertext, plain: Plaintext) -> Ciphertext:
+        """Return encrypted * plain at their lowest common level, rescaled for CKKS."""
+        ...
+
+    @overload
+    def multiply_plain(self, encrypted: Ciphertext, values: float | NDArray[np.float64]) -> Ciphertext:
+        """Return encrypted times CKKS values encoded at its level and rescaled, keeping its scale."""
+        ...
+
+    @overload
+    def add_plain(self, encrypted: Ciphertext, plain: Plaintext) -> Ciphertext:
+        """Return encrypted + plain at their lowest common level."""
+        ...
+
+    @overload
+    def add_plain(self, encrypted: Ciphertext, values: float | NDArray[np.float64]) -> Ciphertext:
+        """Return encrypted plus CKKS values encoded at its level and scale."""
+        ...
+
+    @overload
+    def sub_plain(self, encrypted: Ciphertext, plain: Plaintext) -> Ciphertext:
+        """Return encrypted - plain at their lowest common level."""
+        ...
+
+    @overload
+    def sub_plain(self, encrypted: Ciphertext, values: float | NDArray[np.float64]) -> Ciphertext:
+        """Return encrypted minus CKKS values encoded at its level and scale."""
+        ...
+
+    def negate(self, encrypted: Ciphertext) -> Ciphertext:
+        """Return -encrypted."""
+        ...
+
+    def rotate_vector(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> Ciphertext:
+        """Return a CKKS vector rotation of encrypted."""
+        ...
+
+    def rotate_rows(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> Ciphertext:
+        """Return a BFV/BGV row rotation of encrypted."""
+        ...
+
+    def rotate_columns(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> Ciphertext:
+        """Return a BFV/BGV column rotation of encrypted."""
+        ...
+
+    def align(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> tuple[Ciphertext, Ciphertext]:
+        """Return copies of both ciphertexts at their lowest common level and, for CKKS, a common scale."""
+        ...
+
+    def stats(self) -> dict[str, tuple[int, int]]:
+        """Return {operation: (calls, limbs)} for every Evaluator call made."""
+        ...
+
+    def reset_stats(self) -> None:
+        """Clear the operation counters."""
+        ...
+
+
+class Profile:
+    """Per-method call counts, wall time histograms and memory pool growth, by ciphertext level."""
+
+    def __init__(self) -> None:
+        """Create an inactive profile."""
+        ...
+
+    def start(self) -> None:
+        """Start recording calls made from any thread."""
+        ...
+
+    def stop(self) -> None:
+        """Stop recording; the original bindings are restored once no profile is active."""
+        ...
+
+    def active(self) -> bool:
+        """Return whether the profile is recording."""
+        ...
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        ...
+
+    def to_dict(self) -> dict[str, dict[str, Any]]:
+        """Return {method: {calls, total_ns, alloc_bytes, levels}}, with per-level counters and histograms."""
+        ...
+
+    def to_prometheus(self, prefix: str = "seal") -> str:
+        """Return the counters in the Prometheus text exposition format."""
+        ...
+
+    def __enter__(self) -> Profile: ...
+    def __exit__(self, *args: Any) -> None: ...
+
+
+def profile() -> Profile:
+    """Return a new Profile; use it as a context manager to record the calls made inside the block."""
+    ...
+
+
+class AsyncExecutor:
+    """Native worker threads that run the Async* facades and complete their asyncio futures on the submitting loop."""
+
+    def __init__(self, workers: int = 0, max_pending: int = 0, max_waiting: int = 0) -> None:
+        """Start workers threads (0: one per core); max_pending 0 selects twice the worker count, max_waiting 0 four times max_pending."""
+        ...
+
+    def workers(self) -> int:
+        """Return the number of worker threads."""
+        ...
+
+    def max_pending(self) -> int:
+        """Return how many calls may be queued or running at once."""
+        ...
+
+    def max_waiting(self) -> int:
+        """Return how many calls may wait for a slot before submissions are rejected."""
+        ...
+
+    def running(self) -> int:
+        """Return the number of calls queued for or running on a worker."""
+        ...
+
+    def waiting(self) -> int:
+        """Return the number of calls waiting for a free slot."""
+        ...
+
+
+def default_async_executor() -> AsyncExecutor:
+    """Return the executor shared by Async* facades created without one."""
+    ...
+
+
+class AsyncEvaluator:
+    """Evaluator whose methods return asyncio futures and run on an AsyncExecutor."""
+
+    def __init__(self, context: SEALContext, executor: AsyncExecutor | None = None) -> None:
+        """Create an asyncio evaluator; without an executor the default_async_executor() is used."""
+        ...
+
+    def negate(self, encrypted: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def add(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def sub(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def add_many(self, encrypteds: Iterable[Ciphertext]) -> asyncio.Future[Ciphertext]: ...
+    def multiply(self, encrypted1: Ciphertext, encrypted2: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def square(self, encrypted: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def relinearize(self, encrypted: Ciphertext, relin_keys: RelinKeys) -> asyncio.Future[Ciphertext]: ...
+    def exponentiate(self, encrypted: Ciphertext, exponent: int, relin_keys: RelinKeys) -> asyncio.Future[Ciphertext]: ...
+    def add_plain(self, encrypted: Ciphertext, plain: Plaintext) -> asyncio.Future[Ciphertext]: ...
+    def sub_plain(self, encrypted: Ciphertext, plain: Plaintext) -> asyncio.Future[Ciphertext]: ...
+    def multiply_plain(self, encrypted: Ciphertext, plain: Plaintext) -> asyncio.Future[Ciphertext]: ...
+    def mod_switch_to_next(self, encrypted: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def mod_switch_to(self, encrypted: Ciphertext, parms_id: ParmsId) -> asyncio.Future[Ciphertext]: ...
+    def rescale_to_next(self, encrypted: Ciphertext) -> asyncio.Future[Ciphertext]: ...
+    def rescale_to(self, encrypted: Ciphertext, parms_id: ParmsId) -> asyncio.Future[Ciphertext]: ...
+    def rotate_rows(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> asyncio.Future[Ciphertext]: ...
+    def rotate_columns(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> asyncio.Future[Ciphertext]: ...
+    def rotate_vector(self, encrypted: Ciphertext, steps: int, galois_keys: GaloisKeys) -> asyncio.Future[Ciphertext]: ...
+    def complex_conjugate(self, encrypted: Ciphertext, galois_keys: GaloisKeys) -> asyncio.Future[Ciphertext]: ...
+
+    def executor(self) -> AsyncExecutor:
+        """Return the executor the calls run on."""
+        ...
+
+
+class AsyncEncryptor:
+    """Encryptor whose methods return asyncio futures and run on an AsyncExecutor."""
+
+    def __init__(
+        self,
+        context: SEALContext,
+        public_key: PublicKey | None = None,
+        secret_key: SecretKey | None = None,
+        executor: AsyncExecutor | None = None,
+    ) -> None:
+        """Create an asyncio encryptor from a public key, a secret key or both."""
+        ...
+
+    def encrypt(self, plain: Plaintext) -> asyncio.Future[Ciphertext]: ...
+    def encrypt_symmetric(self, plain: Plaintext) -> asyncio.Future[Ciphertext]: ...
+    def encrypt_zero(self) -> asyncio.Future[Ciphertext]: ...
+
+    def executor(self) -> AsyncExecutor:
+        """Return the executor the calls run on."""
+        ...
+
+
+class AsyncDecryptor:
+    """Decryptor whose methods return asyncio futures and run on an AsyncExecutor."""
+
+    def __init__(self, context: SEALContext, secret_key: SecretKey, executor: AsyncExecutor | None = None) -> None:
+        """Create an asyncio decryptor."""
+        ...
+
+    def decrypt(self, encrypted: Ciphertext) -> asyncio.Future[Plaintext]: ...
+    def invariant_noise_budget(self, encrypted: Ciphertext) -> asyncio.Future[int]: ...
+
+    def executor(self) -> AsyncExecutor:
+        """Return the executor the calls run on."""
+        ...
+
+
+class AsyncCKKSEncoder:
+    """CKKSEncoder whose methods return asyncio futures and run on an AsyncExecutor."""
+
+    def __init__(self, context: SEALContext, executor: AsyncExecutor | None = None) -> None:
+        """Create an asyncio CKKS encoder."""
+        ...
+
+    def encode(self, values: NDArray[np.float64] | FloatLikeArray, scale: float) -> asyncio.Future[Plaintext]: ...
+    def decode(self, plain: Plaintext) -> asyncio.Future[NDArray[np.float64]]: ...
+
+    def executor(self) -> AsyncExecutor:
+        """Return the executor the calls run on."""
+        ...
+
+
+class AsyncBatchEncoder:
+    """BatchEncoder whose methods return asyncio futures and run on an AsyncExecutor."""
+
+    def __init__(self, context: SEALContext, executor: AsyncExecutor | None = None) -> None:
+        """Create an asyncio batch encoder."""
+        ...
+
+    def encode(self, values: NDArray[np.int64] | NDArray[np.uint64]) -> asyncio.Future[Plaintext]: ...
+    def decode(self, plain: Plaintext) -> asyncio.Future[NDArray[np.int64]]: ...
+    def decode_uint64(self, plain: Plaintext) -> asyncio.Future[NDArray[np.uint64]]: ...
+
+    def executor(self) -> AsyncExecutor:
+        """Return the executor the calls run on."""
+        ...
+
+
+def plan_galois_keys(context: SEALContext, rotations: Sequence[int], max_hops: int = 2) -> GaloisKeyPlan:
+    """Choose a small set of rotation steps that composes every requested rotation in at most max_hops rotations."""
+    ...
@@ -0,0 +1,473 @@
+"""Benchmark suite for SEAL-Python.
+
+Sweeps the schemes, a range of ``poly_modulus_degree`` and coefficient
+modulus choices, and the encoder, encryptor, evaluator, key generation and
+serialization operations, timing each one individually. Batched operations
+are additionally swept over native thread counts. Results are reported as
+percentiles and throughput and can be written as JSON, then compared against
+a previously saved run to flag regressions after a SEAL or wrapper upgrade::
+
+    python -m seal_bench --output baseline.json
+    python -m seal_bench --baseline baseline.json --threshold 0.15
+
+The same entry point is installed as the ``seal-bench`` console script.
+"""
+import argparse
+import fnmatch
+import json
+import os
+import pickle
+import platform
+import statistics
+import sys
+import time
+
+import numpy as np
+
+import seal
+from seal import (
+    BatchEncoder,
+    CKKSEncoder,
+    Ciphertext,
+    CoeffModulus,
+    Decryptor,
+    EncryptionParameters,
+    Encryptor,
+    Evaluator,
+    KeyGenerator,
+    PlainModulus,
+    SEALContext,
+    compr_mode_type,
+    scheme_type,
+)
+
+__all__ = ["OPERATIONS", "compare", "main", "run"]
+
+SCHEMES = {"bfv": scheme_type.bfv, "bgv": scheme_type.bgv, "ckks": scheme_type.ckks}
+MODULI = ("min", "default")
+FORMAT_VERSION = 1
+
+DEFAULT_DEGREES = (4096, 8192, 16384)
+DEFAULT_ITERATIONS = 30
+DEFAULT_WARMUP = 3
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_THRESHOLD = 0.10
+
+ROTATION_STEPS = [1, 2, 3, 4]
+PLAIN_BITS = 20
+
+
+def coeff_modulus_bits(scheme, degree, modulus):
+    """Return the prime bit sizes for a named modulus choice.
+
+    ``min`` keeps three primes (two data levels); ``default`` uses as many
+    primes as 128-bit security allows for the degree. CKKS fixtures use
+    ``2**bits[1]`` as scale, so the outer primes are kept wider than the
+    middle ones: the first data level then holds the scale of a product.
+    """
+    if modulus not in MODULI:
+        raise ValueError(f"unknown modulus choice {modulus!r}, expected one of {', '.join(MODULI)}")
+    if scheme != "ckks" and modulus == "default":
+        return [prime.bit_count() for prime in CoeffModulus.BFVDefault(degree)]
+
+    total = CoeffModulus.MaxBitCount(degree)
+    if scheme != "ckks":
+        return [min(60, total // 3)] * 3
+    middle = min(40, total // 5)
+    outer = min(60, (total - middle) // 2)
+    count = 3 if modulus == "min" else 2 + (total - 2 * outer) // middle
+    return [outer] + [middle] * (count - 2) + [outer]
+
+
+class Fixture:
+    """Context, keys and sample operands shared by every operation of one parameter set."""
+
+    def __init__(self, scheme, degree, modulus, batch_size):
+        self.scheme = scheme
+        self.degree = degree
+        self.modulus = modulus
+        self.batch_size = batch_size
+        self.bits = coeff_modulus_bits(scheme, degree, modulus)
+
+        parms = EncryptionParameters(SCHEMES[scheme])
+        parms.set_poly_modulus_degree(degree)
+        parms.set_coeff_modulus(CoeffModulus.Create(degree, self.bits))
+        if scheme != "ckks":
+            parms.set_plain_modulus(PlainModulus.Batching(degree, PLAIN_BITS))
+        self.parms = parms
+        self.context = SEALContext(parms)
+        if not self.context.parameters_set():
+            raise ValueError(f"invalid parameters for {self.label}: {self.context.parameter_error_message()}")
+
+        self.keygen = KeyGenerator(self.context)
+        self.secret_key = self.keygen.secret_key()
+        self.public_key = self.keygen.create_public_key()
+        self.relin_keys = self.keygen.create_relin_keys()
+        self.galois_keys = self.keygen.create_galois_keys([0] + ROTATION_STEPS)
+        self.encryptor = Encryptor(self.context, self.public_key, self.secret_key)
+        self.decryptor = Decryptor(self.context, self.secret_key)
+        self.evaluator = Evaluator(self.context)
+
+        rng = np.random.default_rng(0)
+        if scheme == "ckks":
+            self.encoder = CKKSEncoder(self.context)
+            self.scale = 2.0 ** self.bits[1]
+            self.values = rng.uniform(-1, 1, self.encoder.slot_count())
+            self.encode = lambda: self.encoder.encode(self.values, self.scale)
+        else:
+            self.encoder = BatchEncoder(self.context)
+            self.scale = None
+            self.values = rng.integers(0, 1 << 10, self.encoder.slot_count(), dtype=np.uint64)
+            self.encode = lambda: self.encoder.encode(self.values)
+
+        self.plain = self.encode()
+        self.encrypted = self.encryptor.encrypt(self.plain)
+        self.other = self.encryptor.encrypt(self.plain)
+        self.product = self.evaluator.multiply(self.encrypted, self.other)
+        self.relinearized = self.evaluator.relinearize(self.product, self.relin_keys)
+        self.encrypteds = [self.encryptor.encrypt(self.plain) for _ in range(batch_size)]
+        self.plains = [self.plain] * batch_size
+        self.products = [self.product] * batch_size
+        self.blob = self.encrypted.to_string()
+        self.pickled = pickle.dumps(self.encrypted)
+        self.pickled_context = pickle.dumps(self.context)
+
+    @property
+    def label(self):
+        return f"{self.scheme}/{self.degree}/{self.modulus}"
+
+
+def _load_ciphertext(fx):
+    cipher = Ciphertext()
+    cipher.load_bytes(fx.context, fx.blob)
+    return cipher
+
+
+def _rotate(fx):
+    if fx.scheme == "ckks":
+        return fx.evaluator.rotate_vector(fx.encrypted, 1, fx.galois_keys)
+    return fx.evaluator.rotate_rows(fx.encrypted, 1, fx.galois_keys)
+
+
+def _rotate_many(fx):
+    if fx.scheme == "ckks":
+        return fx.evaluator.rotate_vector_many(fx.encrypted, ROTATION_STEPS, fx.galois_keys)
+    return fx.evaluator.rotate_rows_many(fx.encrypted, ROTATION_STEPS, fx.galois_keys)
+
+
+def _rotate_batch(fx):
+    if fx.scheme == "ckks":
+        return fx.evaluator.rotate_vector_batch(fx.encrypteds, 1, fx.galois_keys)
+    return fx.evaluator.rotate_rows_batch(fx.encrypteds, 1, fx.galois_keys)
+
+
+ALL = ("bfv", "bgv", "ckks")
+INTEGER = ("bfv", "bgv")
+
+# (name, schemes, items per call, batched, function of the fixture)
+OPERATIONS = [
+    ("encoder.encode", ALL, 1, False, lambda fx: fx.encode()),
+    ("encoder.decode", ALL, 1, False, lambda fx: fx.encoder.decode(fx.plain)),
+    ("encryptor.encrypt", ALL, 1, False, lambda fx: fx.encryptor.encrypt(fx.plain)),
+    ("encryptor.encrypt_symmetric", ALL, 1, False, lambda fx: fx.encryptor.encrypt_symmetric(fx.plain)),
+    ("decryptor.decrypt", ALL, 1, False, lambda fx: fx.decryptor.decrypt(fx.encrypted)),
+    ("decryptor.invariant_noise_budget", INTEGER, 1, False,
+        lambda fx: fx.decryptor.invariant_noise_budget(fx.encrypted)),
+    ("evaluator.negate", ALL, 1, False, lambda fx: fx.evaluator.negate(fx.encrypted)),
+    ("evaluator.add", ALL, 1, False, lambda fx: fx.evaluator.add(fx.encrypted, fx.other)),
+    ("evaluator.sub", ALL, 1, False, lambda fx: fx.evaluator.sub(fx.encrypted, fx.other)),
+    ("evaluator.add_many", ALL, 1, False, lambda fx: fx.evaluator.add_many(fx.encrypteds)),
+    ("evaluator.add_plain", ALL, 1, False, lambda fx: fx.evaluator.add_plain(fx.encrypted, fx.plain)),
+    ("evaluator.multiply_plain", ALL, 1, False, lambda fx: fx.evaluator.multiply_plain(fx.encrypted, fx.plain)),
+    ("evaluator.multiply", ALL, 1, False, lambda fx: fx.evaluator.multiply(fx.encrypted, fx.other)),
+    ("evaluator.square", ALL, 1, False, lambda fx: fx.evaluator.square(fx.encrypted)),
+    ("evaluator.relinearize", ALL, 1, False, lambda fx: fx.evaluator.relinearize(fx.product, fx.relin_keys)),
+    ("evaluator.exponentiate", INTEGER, 1, False,
+        lambda fx: fx.evaluator.exponentiate(fx.encrypted, 3, fx.relin_keys)),
+    ("evaluator.mod_switch_to_next", ALL, 1, False, lambda fx: fx.evaluator.mod_switch_to_next(fx.encrypted)),
+    ("evaluator.rescale_to_next", ("ckks",), 1, False, lambda fx: fx.evaluator.rescale_to_next(fx.relinearized)),
+    ("evaluator.rotate", ALL, 1, False, _rotate),
+    ("evaluator.rotate_many", ALL, len(ROTATION_STEPS), False, _rotate_many),
+    ("evaluator.rotate_columns", INTEGER, 1, False,
+        lambda fx: fx.evaluator.rotate_columns(fx.encrypted, fx.galois_keys)),
+    ("evaluator.complex_conjugate", ("ckks",), 1, False,
+        lambda fx: fx.evaluator.complex_conjugate(fx.encrypted, fx.galois_keys)),
+    ("evaluator.transform_to_ntt", INTEGER, 1, False,
+        lambda fx: fx.evaluator.transform_to_ntt(fx.plain, fx.context.first_parms_id())),
+    # Startup: building a context from scratch versus the process-wide SEALContext.shared cache,
+    # which unpickling also goes through.
+    ("context.create", ALL, 1, False, lambda fx: SEALContext(fx.parms)),
+    ("context.shared", ALL, 1, False, lambda fx: SEALContext.shared(fx.parms)),
+    ("context.unpickle", ALL, 1, False, lambda fx: pickle.loads(fx.pickled_context)),
+    ("keygen.create_public_key", ALL, 1, False, lambda fx: fx.keygen.create_public_key()),
+    ("keygen.create_relin_keys", ALL, 1, False, lambda fx: fx.keygen.create_relin_keys()),
+    ("keygen.create_galois_keys", ALL, 1, False, lambda fx: fx.keygen.create_galois_keys([1])),
+    ("serialization.ciphertext.save", ALL, 1, False, lambda fx: fx.encrypted.to_string()),
+    ("serialization.ciphertext.save_uncompressed", ALL, 1, False,
+        lambda fx: fx.encrypted.to_string(compr_mode_type.none)),
+    ("serialization.ciphertext.load", ALL, 1, False, _load_ciphertext),
+    ("serialization.ciphertext.pickle", ALL, 1, False, lambda fx: pickle.dumps(fx.encrypted)),
+    ("serialization.ciphertext.unpickle", ALL, 1, False, lambda fx: pickle.loads(fx.pickled)),
+    ("serialization.relin_keys.save", ALL, 1, False, lambda fx: fx.relin_keys.to_string()),
+    ("batch.multiply", ALL, None, True, lambda fx: fx.evaluator.multiply_batch(fx.encrypteds, fx.encrypteds)),
+    ("batch.multiply_plain", ALL, None, True,
+        lambda fx: fx.evaluator.multiply_plain_batch(fx.encrypteds, fx.plains)),
+    ("batch.relinearize", ALL, None, True, lambda fx: fx.evaluator.relinearize_batch(fx.products, fx.relin_keys)),
+    ("batch.rotate", ALL, None, True, _rotate_batch),
+]
+
+
+def percentile(ordered, q):
+    """Return the q-th percentile of an ascending list, interpolating linearly."""
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(fn, iterations, warmup):
+    """Time fn individually iterations times and return the sorted samples in nanoseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(iterations):
+        t0 = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - t0)
+    return sorted(samples)
+
+
+def summarize(samples, items):
+    p50 = percentile(samples, 50)
+    return {
+        "iterations": len(samples),
+        "items": items,
+        "min_ns": samples[0],
+        "p50_ns": p50,
+        "p90_ns": percentile(samples, 90),
+        "p99_ns": percentile(samples, 99),
+        "max_ns": samples[-1],
+        "mean_ns": statistics.fmean(samples),
+        "stdev_ns": statistics.pstdev(samples),
+        "throughput": items * 1e9 / p50 if p50 else float("inf"),
+    }
+
+
+def selected(name, patterns):
+    return any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def run(schemes=ALL, degrees=DEFAULT_DEGREES, moduli=MODULI, operations=("*",), threads=None,
+        iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP, batch_size=DEFAULT_BATCH_SIZE, log=None):
+    """Run the sweep and return a JSON-serialisable report.
+
+    Every result has a stable ``id`` of the form
+    ``scheme/degree/modulus/operation[@threads]`` used to match baselines.
+    A parameter set that fails is recorded under ``errors`` with the id
+    ``scheme/degree/modulus``, and the sweep goes on with the next one.
+    """
+    threads = list(threads or sorted({1, os.cpu_count() or 1}))
+    results = []
+    errors = []
+    try:
+        for scheme in schemes:
+            for degree in degrees:
+                for modulus in moduli:
+                    ops = [op for op in OPERATIONS if scheme in op[1] and selected(op[0], operations)]
+                    if not ops:
+                        continue
+                    try:
+                        fx = Fixture(scheme, degree, modulus, batch_size)
+                        for name, _, items, batched, fn in ops:
+                            for count in (threads if batched else [None]):
+                                if count is not None:
+                                    seal.set_thread_count(count)
+                                samples = measure(lambda: fn(fx), iterations, warmup)
+                                result = {
+                                    "id": f"{fx.label}/{name}" + (f"@{count}" if count is not None else ""),
+                                    "scheme": scheme,
+                                    "poly_modulus_degree": degree,
+                                    "modulus": modulus,
+                                    "coeff_modulus_bits": fx.bits,
+                                    "operation": name,
+                                    "threads": count,
+                                }
+                                result.update(summarize(samples, items or batch_size))
+                                results.append(result)
+                                if log:
+                                    log(result)
+                    except Exception as error:
+                        failure = {"id": f"{scheme}/{degree}/{modulus}", "error": f"{type(error).__name__}: {error}"}
+                        errors.append(failure)
+                        if log:
+                            log(failure)
+    finally:
+        seal.set_thread_count(0)
+
+    return {
+        "format": FORMAT_VERSION,
+        "environment": environment(),
+        "config": {
+            "schemes": list(schemes),
+            "degrees": list(degrees),
+            "moduli": list(moduli),
+            "operations": list(operations),
+            "threads": threads,
+            "iterations": iterations,
+            "warmup": warmup,
+            "batch_size": batch_size,
+        },
+        "results": results,
+        "errors": errors,
+    }
+
+
+def environment():
+    return {
+        "seal_python": getattr(seal, "__version__", None),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """Compare median timings of two reports.
+
+    Returns one entry per result present in both, with ``ratio`` = current
+    median / baseline median and ``status`` one of ``regression``,
+    ``improvement`` or ``ok`` depending on whether the ratio leaves
+    ``[1 / (1 + threshold), 1 + threshold]``.
+    """
+    reference = {result["id"]: result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        base = reference.get(result["id"])
+        if base is None or not base["p50_ns"]:
+            continue
+        ratio = result["p50_ns"] / base["p50_ns"]
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({
+            "id": result["id"],
+            "baseline_p50_ns": base["p50_ns"],
+            "p50_ns": result["p50_ns"],
+            "ratio": ratio,
+            "status": status,
+        })
+    return rows
+
+
+def format_result(result):
+    if "error" in result:
+        return f"{result['id']:<64} failed: {result['error']}"
+    return (f"{result['id']:<64} p50 {result['p50_ns'] / 1e6:9.3f} ms  "
+            f"p99 {result['p99_ns'] / 1e6:9.3f} ms  {result['throughput']:10.1f} ops/s")
+
+
+def format_comparison(row):
+    return (f"{row['id']:<64} {row['baseline_p50_ns'] / 1e6:9.3f} -> {row['p50_ns'] / 1e6:9.3f} ms  "
+            f"{row['ratio']:6.2f}x  {row['status']}")
+
+
+def _csv(convert):
+    return lambda text: [convert(item.strip()) for item in text.split(",") if item.strip()]
+
+
+def _scheme(name):
+    if name not in SCHEMES:
+        raise argparse.ArgumentTypeError(f"unknown scheme {name!r}")
+    return name
+
+
+def _modulus(name):
+    if name not in MODULI:
+        raise argparse.ArgumentTypeError(f"unknown modulus choice {name!r}")
+    return name
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="seal-bench", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--schemes", type=_csv(_scheme), default=list(ALL),
+                        help="comma separated schemes (default: bfv,bgv,ckks)")
+    parser.add_argument("--degrees", type=_csv(int), default=list(DEFAULT_DEGREES),
+                        help="comma separated poly_modulus_degree values (default: 4096,8192,16384)")
+    parser.add_argument("--moduli", type=_csv(_modulus), default=list(MODULI),
+                        help="comma separated coefficient modulus choices: min, default (default: both)")
+    parser.add_argument("--operations", type=_csv(str), default=["*"],
+                        help="comma separated glob patterns of operations to run (default: *)")
+    parser.add_argument("--threads", type=_csv(int), default=None,
+                        help="comma separated thread counts for batch.* operations (default: 1 and every core)")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--quick", action="store_true",
+                        help="shorthand for --degrees 4096,8192 --moduli default --iterations 10")
+    parser.add_argument("--output", "-o", help="write the JSON report to this path ('-' for stdout)")
+    parser.add_argument("--baseline", help="compare against a JSON report written by an earlier run")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="relative median slowdown reported as a regression (default: 0.10)")
+    parser.add_argument("--list", action="store_true", help="list the operations and exit")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.degrees, args.moduli, args.iterations = [4096, 8192], ["default"], 10
+    if args.iterations < 1:
+        parser.error("--iterations must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.list:
+        for name, schemes, _, batched, _ in OPERATIONS:
+            print(f"{name:<48} {','.join(schemes)}{'  (threads)' if batched else ''}")
+        return 0
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as stream:
+            baseline = json.load(stream)
+
+    report = run(args.schemes, args.degrees, args.moduli, args.operations, args.threads,
+                 args.iterations, args.warmup, args.batch_size,
+                 log=lambda result: print(format_result(result), file=sys.stderr, flush=True))
+
+    regressions = []
+    if baseline is not None:
+        rows = compare(report, baseline, args.threshold)
+        report["comparison"] = {
+            "baseline": args.baseline,
+            "baseline_environment": baseline.get("environment"),
+            "threshold": args.threshold,
+            "results": rows,
+        }
+        print(f"\ncompared with {args.baseline} "
+              f"(seal-python {baseline.get('environment', {}).get('seal_python')} -> "
+              f"{report['environment']['seal_python']}):", file=sys.stderr)
+        for row in rows:
+            if row["status"] != "ok":
+                print(format_comparison(row), file=sys.stderr)
+        regressions = [row for row in rows if row["status"] == "regression"]
+        print(f"{len(rows)} compared, {len(regressions)} regressions, "
+              f"{sum(row['status'] == 'improvement' for row in rows)} improvements", file=sys.stderr)
+
+    if args.output == "-":
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    elif args.output:
+        with open(args.output, "w", encoding="utf-8") as stream:
+            json.dump(report, stream, indent=2)
+    return 1 if regressions or report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,493 @@
+"""Process-pool evaluation for SEAL-Python.
+
+``ShardedEvaluator`` starts a pool of worker processes. Each worker builds
+the ``SEALContext`` and loads the relinearization and Galois keys once, when
+it starts. Lists of ciphertexts are then split into contiguous shards, one
+task per shard, so a call only ships the ciphertexts themselves::
+
+    with ShardedEvaluator(context, relin_keys, galois_keys) as sharded:
+        products = sharded.multiply_plain(ciphers, plain)
+        rotated = sharded.pipeline(ciphers, ("square",), ("relinearize",), ("rescale_to_next",))
+        total = sharded.sum(ciphers)
+
+Ciphertexts, plaintexts and keys travel as uncompressed SEAL serializations,
+which are the cheapest to write and read back. ``KeyStore`` publishes keys
+once into shared memory or a memory-mapped file, so any number of processes
+can load them from the same pages.
+"""
+import itertools
+import json
+import mmap
+import multiprocessing
+import os
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import seal
+from seal import (
+    Ciphertext,
+    Evaluator,
+    GaloisKeys,
+    Plaintext,
+    PublicKey,
+    RelinKeys,
+    compr_mode_type,
+)
+
+__all__ = ["KeyStore", "PerCiphertext", "ShardedEvaluator"]
+
+# Operations a shard may run, with the key each one needs appended to its arguments.
+OPERATIONS = {
+    "negate": None,
+    "add": None,
+    "sub": None,
+    "multiply": None,
+    "square": None,
+    "add_plain": None,
+    "sub_plain": None,
+    "multiply_plain": None,
+    "mod_switch_to_next": None,
+    "mod_switch_to": None,
+    "rescale_to_next": None,
+    "rescale_to": None,
+    "transform_to_ntt": None,
+    "transform_from_ntt": None,
+    "relinearize": "relin",
+    "exponentiate": "relin",
+    "rotate_rows": "galois",
+    "rotate_columns": "galois",
+    "rotate_vector": "galois",
+    "complex_conjugate": "galois",
+}
+
+_CIPHER, _PLAIN, _VALUE, _ROW = "c", "p", "v", "r"
+
+
+def dump(obj):
+    """Serialize a SEAL object without compression."""
+    buffer = bytearray(obj.save_size(compr_mode_type.none))
+    return bytes(memoryview(buffer)[:obj.save_into(buffer, compr_mode_type.none)])
+
+
+def load(cls, context, data):
+    obj = cls()
+    obj.load_from(context, data)
+    return obj
+
+
+def _encode(value):
+    if isinstance(value, Ciphertext):
+        return (_CIPHER, dump(value))
+    if isinstance(value, Plaintext):
+        return (_PLAIN, dump(value))
+    return (_VALUE, value)
+
+
+def _decode(context, item):
+    kind, value = item
+    if kind == _CIPHER:
+        return load(Ciphertext, context, value)
+    if kind == _PLAIN:
+        return load(Plaintext, context, value)
+    return value
+
+
+class PerCiphertext:
+    """Operand of ShardedEvaluator.map with one entry per ciphertext.
+
+    Other operands, lists and tuples included, are passed whole to every
+    call, so that e.g. a parms_id reaches mod_switch_to unchanged.
+    """
+
+    def __init__(self, values):
+        self.values = list(values)
+
+    def __len__(self):
+        return len(self.values)
+
+
+def _per_ciphertext(operand):
+    return PerCiphertext(operand) if isinstance(operand, (list, tuple)) else operand
+
+
+KEY_TYPES = {cls.__name__: cls for cls in (PublicKey, RelinKeys, GaloisKeys)}
+
+_STORE_MAGIC = b"SEALKEYS"
+_STORE_HEADER = struct.Struct("<8sQ")
+_STORE_ALIGN = 64
+
+
+def _open_shared_memory(name):
+    try:
+        # Attaching must not register the block with this process's resource tracker,
+        # which would unlink it when the process exits (Python 3.13+).
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class KeyStore:
+    """PublicKey, RelinKeys and GaloisKeys published once for many processes.
+
+    The keys are written uncompressed into a ``multiprocessing.shared_memory``
+    block, or into a file that readers memory-map. Readers attach by name or
+    path and load keys straight from the shared pages, so a multi-hundred-MB
+    GaloisKeys is neither pickled, piped nor read from disk per process. A
+    KeyStore pickles as a reference to the same block.
+    """
+
+    def __init__(self, handle, buffer, index, name=None, path=None, owner=False):
+        self._handle = handle
+        self._buffer = buffer
+        self._index = index
+        self.name = name
+        self.path = path
+        self._owner = owner
+
+    @classmethod
+    def publish(cls, keys, name=None, path=None):
+        """Write keys, a dict of name -> key object, into a new shared memory block or, with path, a file."""
+        for key_name, key in keys.items():
+            if type(key).__name__ not in KEY_TYPES:
+                raise TypeError(f"{key_name}: expected PublicKey, RelinKeys or GaloisKeys, got {type(key).__name__}")
+        sizes = {key_name: key.save_size(compr_mode_type.none) for key_name, key in keys.items()}
+        # The index records upper bounds; the actual sizes are patched in below with the same length.
+        index = {key_name: [type(key).__name__, 0, sizes[key_name]] for key_name, key in keys.items()}
+        index_size = len(json.dumps(index).encode()) + 32 * len(index)
+        offset = -(-(_STORE_HEADER.size + index_size) // _STORE_ALIGN) * _STORE_ALIGN
+        for key_name in keys:
+            index[key_name][1] = offset
+            offset += -(-sizes[key_name] // _STORE_ALIGN) * _STORE_ALIGN
+        total = max(offset, _STORE_ALIGN)
+
+        if path is None:
+            handle = shared_memory.SharedMemory(name=name, create=True, size=total)
+            buffer = handle.buf
+        else:
+            with open(path, "w+b") as file:
+                file.truncate(total)
+                handle = mmap.mmap(file.fileno(), total)
+            buffer = memoryview(handle)
+        try:
+            for key_name, key in keys.items():
+                start = index[key_name][1]
+                with buffer[start:start + sizes[key_name]] as view:
+                    index[key_name][2] = key.save_into(view, compr_mode_type.none)
+            encoded = json.dumps(index).encode().ljust(index_size)
+            _STORE_HEADER.pack_into(buffer, 0, _STORE_MAGIC, len(encoded))
+            buffer[_STORE_HEADER.size:_STORE_HEADER.size + len(encoded)] = encoded
+        except BaseException:
+            store = cls(handle, buffer, index, getattr(handle, "name", None), path, owner=True)
+            store.close()
+            store.unlink()
+            raise
+        if path is not None:
+            handle.flush()
+        return cls(handle, buffer, index, getattr(handle, "name", None), path, owner=True)
+
+    @classmethod
+    def attach(cls, name=None, path=None):
+        """Attach to a store published under name, or in the file at path."""
+        if (name is None) == (path is None):
+            raise ValueError("pass exactly one of name and path")
+        if path is None:
+            handle = _open_shared_memory(name)
+            buffer = handle.buf
+        else:
+            with open(path, "rb") as file:
+                handle = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            buffer = memoryview(handle)
+        magic, length = _STORE_HEADER.unpack_from(buffer, 0)
+        if magic != _STORE_MAGIC:
+            buffer.release()
+            handle.close()
+            raise ValueError("not a SEAL key store")
+        index = json.loads(bytes(buffer[_STORE_HEADER.size:_STORE_HEADER.size + length]))
+        return cls(handle, buffer, index, name, path)
+
+    def __reduce__(self):
+        return (_attach_store, (self.name, self.path))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __contains__(self, key_name):
+        return key_name in self._index
+
+    def names(self):
+        return list(self._index)
+
+    def nbytes(self):
+        """Total size of the serialized keys."""
+        return sum(size for _, _, size in self._index.values())
+
+    def load(self, context, key_name):
+        """Load key_name from the shared pages, validated against context."""
+        type_name, start, size = self._index[key_name]
+        key = KEY_TYPES[type_name]()
+        with self._buffer[start:start + size] as view:
+            key.load_from(context, view)
+        return key
+
+    def close(self):
+        """Detach from the store; other processes keep their attachment."""
+        if self._buffer is not None:
+            self._buffer.release()
+            self._buffer = None
+            self._handle.close()
+
+    def unlink(self):
+        """Remove the store once every process is done with it. Only the publisher may unlink."""
+        if not self._owner:
+            raise ValueError("only the publishing KeyStore can unlink")
+        self._owner = False
+        if self.path is None:
+            self._handle.unlink()
+        else:
+            os.remove(self.path)
+
+
+def _attach_store(name, path):
+    return KeyStore.attach(name=name, path=path)
+
+
+# State of a worker process, set up once by _initialize.
+_worker = {}
+# Objects a forked worker inherits from the parent instead of loading, by ShardedEvaluator token.
+_inherited = {}
+_tokens = itertools.count()
+
+
+def _initialize(token, context, store, threads):
+    if token in _inherited:
+        context, relin_keys, galois_keys = _inherited[token]
+    else:
+        relin_keys = store.load(context, "relin") if store is not None and "relin" in store else None
+        galois_keys = store.load(context, "galois") if store is not None and "galois" in store else None
+        if store is not None:
+            store.close()
+    _worker["context"] = context
+    _worker["evaluator"] = Evaluator(context)
+    _worker["relin"] = relin_keys
+    _worker["galois"] = galois_keys
+    seal.set_thread_count(threads)
+
+
+def _operation(name):
+    method = getattr(_worker["evaluator"], name)
+    key = OPERATIONS[name]
+    if key is None:
+        return lambda *args: method(*args)
+    keys = _worker[key]
+    if keys is None:
+        raise ValueError(f"{name} needs {key} keys; pass them to ShardedEvaluator")
+    return lambda *args: method(*args, keys)
+
+
+def _run_shard(rows, steps):
+    """Apply steps to every row of the shard and return the serialized results.
+
+    rows holds (ciphertext, aligned operands...) tuples; a step argument is
+    either (_ROW, i), taking operand i of the row, or a broadcast value.
+    """
+    context = _worker["context"]
+    plan = []
+    for name, args in steps:
+        decoded = [arg if arg[0] == _ROW else (_VALUE, _decode(context, arg)) for arg in args]
+        plan.append((_operation(name), decoded))
+
+    results = []
+    for row in rows:
+        values = [_decode(context, item) for item in row]
+        current = values[0]
+        for apply, args in plan:
+            current = apply(current, *(values[arg[1]] if arg[0] == _ROW else arg[1] for arg in args))
+        results.append(dump(current))
+    return results
+
+
+def _reduce_shard(items, operation):
+    context = _worker["context"]
+    evaluator = _worker["evaluator"]
+    encrypteds = [load(Ciphertext, context, item) for item in items]
+    if operation == "add":
+        return dump(evaluator.add_many(encrypteds))
+    if _worker["relin"] is None:
+        raise ValueError("product needs relin keys; pass them to ShardedEvaluator")
+    return dump(evaluator.multiply_many(encrypteds, _worker["relin"]))
+
+
+class ShardedEvaluator:
+    """Evaluator that spreads lists of ciphertexts over a pool of worker processes.
+
+    Arguments of the list methods are either a single object, sent once per
+    shard, or a list with one entry per ciphertext. Results are returned in
+    input order. The context travels to spawned workers as its pickle, which
+    keeps expand_mod_chain and sec_level and goes through SEALContext.shared.
+
+    Forked workers inherit the parent's context and keys, whose pages stay
+    shared until written, which SEAL never does to keys. Otherwise the keys
+    are published into a KeyStore that every worker loads from; pass
+    key_store, with entries named "relin" and "galois", to reuse one that
+    already exists.
+    """
+
+    def __init__(self, context, relin_keys=None, galois_keys=None, processes=None, shards_per_process=4,
+                 threads_per_process=1, mp_context=None, key_store=None):
+        self.context = context
+        self.processes = processes or os.cpu_count() or 1
+        self.shards_per_process = max(1, shards_per_process)
+        self._token = next(_tokens)
+        self._store = None
+        start_method = (mp_context or multiprocessing.get_context()).get_start_method()
+        if start_method == "fork" and key_store is None:
+            _inherited[self._token] = (context, relin_keys, galois_keys)
+        elif key_store is None:
+            keys = {"relin": relin_keys, "galois": galois_keys}
+            keys = {key_name: key for key_name, key in keys.items() if key is not None}
+            if keys:
+                self._store = key_store = KeyStore.publish(keys)
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=mp_context,
+            initializer=_initialize,
+            initargs=(self._token, context, key_store, threads_per_process),
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self, wait=True):
+        """Shut the worker processes down and remove the key store it published."""
+        self._pool.shutdown(wait=wait)
+        _inherited.pop(self._token, None)
+        if self._store is not None:
+            self._store.close()
+            self._store.unlink()
+            self._store = None
+
+    def _shards(self, count, shards):
+        shards = max(1, min(count, shards))
+        size, extra = divmod(count, shards)
+        start = 0
+        for index in range(shards):
+            stop = start + size + (index < extra)
+            yield start, stop
+            start = stop
+
+    def _run(self, encrypteds, steps, aligned):
+        encrypteds = list(encrypteds)
+        if not encrypteds:
+            return []
+        for values in aligned:
+            if len(values) != len(encrypteds):
+                raise ValueError("list arguments must have one entry per ciphertext")
+
+        rows = [tuple(_encode(value) for value in row) for row in zip(encrypteds, *aligned)]
+        futures = [self._pool.submit(_run_shard, rows[start:stop], steps) for start, stop in self._shards(len(rows), self.processes * self.shards_per_process)]
+        return [load(Ciphertext, self.context, data) for future in futures for data in future.result()]
+
+    def map(self, operation, encrypteds, *operands):
+        """Return [Evaluator.operation(encrypted, *operands) for encrypted in encrypteds], computed in the pool.
+
+        Wrap an operand in PerCiphertext to pass one entry per ciphertext;
+        every other operand is broadcast. Keys are supplied by the workers
+        and must not be passed.
+        """
+        if operation not in OPERATIONS:
+            raise ValueError(f"unsupported operation {operation!r}")
+        aligned, args = [], []
+        for operand in operands:
+            if isinstance(operand, PerCiphertext):
+                aligned.append(operand.values)
+                args.append((_ROW, len(aligned)))
+            else:
+                args.append(_encode(operand))
+        return self._run(encrypteds, [(operation, args)], aligned)
+
+    def pipeline(self, encrypteds, *steps):
+        """Apply several operations to every ciphertext in one round trip.
+
+        Each step is a tuple (operation, *operands) whose operands are
+        broadcast to every ciphertext, e.g. ("multiply_plain", plain).
+        """
+        plan = []
+        for step in steps:
+            operation, *operands = step
+            if operation not in OPERATIONS:
+                raise ValueError(f"unsupported operation {operation!r}")
+            if any(isinstance(operand, PerCiphertext) for operand in operands):
+                raise ValueError("pipeline operands are broadcast; use map for per-ciphertext operands")
+            plan.append((operation, [_encode(operand) for operand in operands]))
+        return self._run(encrypteds, plan, [])
+
+    def negate(self, encrypteds):
+        return self.map("negate", encrypteds)
+
+    def add(self, encrypteds1, encrypteds2):
+        return self.map("add", encrypteds1, PerCiphertext(encrypteds2))
+
+    def sub(self, encrypteds1, encrypteds2):
+        return self.map("sub", encrypteds1, PerCiphertext(encrypteds2))
+
+    def multiply(self, encrypteds1, encrypteds2):
+        return self.map("multiply", encrypteds1, PerCiphertext(encrypteds2))
+
+    def square(self, encrypteds):
+        return self.map("square", encrypteds)
+
+    def add_plain(self, encrypteds, plains):
+        return self.map("add_plain", encrypteds, _per_ciphertext(plains))
+
+    def sub_plain(self, encrypteds, plains):
+        return self.map("sub_plain", encrypteds, _per_ciphertext(plains))
+
+    def multiply_plain(self, encrypteds, plains):
+        return self.map("multiply_plain", encrypteds, _per_ciphertext(plains))
+
+    def relinearize(self, encrypteds):
+        return self.map("relinearize", encrypteds)
+
+    def mod_switch_to_next(self, encrypteds):
+        return self.map("mod_switch_to_next", encrypteds)
+
+    def rescale_to_next(self, encrypteds):
+        return self.map("rescale_to_next", encrypteds)
+
+    def rotate_rows(self, encrypteds, steps):
+        return self.map("rotate_rows", encrypteds, _per_ciphertext(steps))
+
+    def rotate_columns(self, encrypteds):
+        return self.map("rotate_columns", encrypteds)
+
+    def rotate_vector(self, encrypteds, steps):
+        return self.map("rotate_vector", encrypteds, _per_ciphertext(steps))
+
+    def complex_conjugate(self, encrypteds):
+        return self.map("complex_conjugate", encrypteds)
+
+    def _reduce(self, encrypteds, operation):
+        items = [dump(encrypted) for encrypted in encrypteds]
+        if not items:
+            raise ValueError("encrypteds cannot be empty")
+        # Each round reduces one shard per worker, of at least two ciphertexts, until one is left.
+        while len(items) > 1:
+            shards = self._shards(len(items), min(self.processes, len(items) // 2))
+            futures = [self._pool.submit(_reduce_shard, items[start:stop], operation) for start, stop in shards]
+            items = [future.result() for future in futures]
+        return load(Ciphertext, self.context, items[0])
+
+    def sum(self, encrypteds):
+        """Return the sum of the ciphertexts, reduced as a tree across the workers."""
+        return self._reduce(encrypteds, "add")
+
+    def product(self, encrypteds):
+        """Return the relinearized product of BFV/BGV ciphertexts, reduced as a tree across the workers."""
+        return self._reduce(encrypteds, "multiply")
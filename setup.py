@@ -88,6 +88,8 @@ setup(
     long_description=(BASE_DIR / "README.md").read_text(encoding="utf-8"),
     long_description_content_type="text/markdown",
     ext_modules=ext_modules,
+    py_modules=["seal_bench", "seal_sharded"],
+    entry_points={"console_scripts": ["seal-bench=seal_bench:main"]},
     cmdclass={"build_ext": build_ext_with_typing},
     zip_safe=False,
     license='MIT',
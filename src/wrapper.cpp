@@ -3,23 +3,4506 @@
 #include <pybind11/numpy.h>
 #include <pybind11/stl.h>
 #include "seal/seal.h"
+#include "seal/util/common.h"
+#include "seal/util/galois.h"
+#include "seal/util/hash.h"
+#include "seal/util/ntt.h"
+#include "seal/util/polyarithsmallmod.h"
+#include "seal/util/rns.h"
+#include "seal/util/uintarithsmallmod.h"
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <chrono>
+#include <cmath>
+#include <condition_variable>
+#include <cstring>
+#include <deque>
+#include <exception>
 #include <fstream>
+#include <functional>
+#include <iterator>
+#include <limits>
+#include <list>
+#include <map>
+#include <memory>
+#include <mutex>
+#include <shared_mutex>
+#include <sstream>
+#include <stdexcept>
+#include <thread>
+#include <tuple>
+#include <unordered_map>
+#ifndef _WIN32
+#include <pthread.h>
+#endif
+
+using namespace seal;
+namespace py = pybind11;
+
+#define SEAL_DOC(text) text
+
+// Drops the GIL for the duration of a native call so Python threads can run SEAL work concurrently.
+using release_gil = py::call_guard<py::gil_scoped_release>;
+
+PYBIND11_MAKE_OPAQUE(std::vector<double>);
+PYBIND11_MAKE_OPAQUE(std::vector<std::complex<double>>);
+PYBIND11_MAKE_OPAQUE(std::vector<std::uint64_t>);
+PYBIND11_MAKE_OPAQUE(std::vector<std::int64_t>);
+
+namespace
+{
+    // Fixed-size pool of native worker threads used by the *_batch bindings.
+    class ThreadPool
+    {
+    public:
+        explicit ThreadPool(std::size_t thread_count)
+        {
+            resize(thread_count);
+        }
+
+        ~ThreadPool()
+        {
+            stop();
+        }
+
+        std::size_t thread_count() const
+        {
+            std::shared_lock<std::shared_mutex> lock(resize_mutex_);
+            return workers_.size() + 1;
+        }
+
+        void resize(std::size_t thread_count)
+        {
+            if (thread_count == 0)
+                thread_count = std::max<std::size_t>(std::thread::hardware_concurrency(), 1);
+
+            std::unique_lock<std::shared_mutex> lock(resize_mutex_);
+            stop();
+            stopping_ = false;
+            // The calling thread always takes part in parallel_for, so spawn one worker less.
+            for (std::size_t i = 1; i < thread_count; i++)
+                workers_.emplace_back([this]{ worker_loop(); });
+        }
+
+        // Run fn(i) for every i in [0, count) and rethrow the first exception raised by any call.
+        // Nested calls made from inside fn run serially on the calling thread.
+        void parallel_for(std::size_t count, const std::function<void(std::size_t)> &fn)
+        {
+            if (count == 0)
+                return;
+            if (in_worker() || count == 1)
+            {
+                for (std::size_t i = 0; i < count; i++)
+                    fn(i);
+                return;
+            }
+
+            struct State
+            {
+                std::atomic<std::size_t> next{ 0 };
+                std::size_t pending = 0;
+                std::exception_ptr error;
+                std::mutex mutex;
+                std::condition_variable done;
+            } state;
+
+            auto run = [&state, &fn, count]{
+                for (std::size_t i = state.next++; i < count; i = state.next++)
+                {
+                    try
+                    {
+                        fn(i);
+                    }
+                    catch (...)
+                    {
+                        std::lock_guard<std::mutex> lock(state.mutex);
+                        if (!state.error)
+                            state.error = std::current_exception();
+                        state.next = count;
+                    }
+                }
+            };
+
+            std::shared_lock<std::shared_mutex> resize_lock(resize_mutex_);
+            std::size_t helpers = std::min(workers_.size(), count - 1);
+            state.pending = helpers;
+            {
+                std::lock_guard<std::mutex> lock(queue_mutex_);
+                for (std::size_t i = 0; i < helpers; i++)
+                    queue_.emplace_back([&state, &run]{
+                        run();
+                        std::lock_guard<std::mutex> lock(state.mutex);
+                        if (--state.pending == 0)
+                            state.done.notify_one();
+                    });
+            }
+            queue_ready_.notify_all();
+
+            in_worker() = true;
+            run();
+            in_worker() = false;
+
+            std::unique_lock<std::mutex> lock(state.mutex);
+            state.done.wait(lock, [&state]{ return state.pending == 0; });
+            if (state.error)
+                std::rethrow_exception(state.error);
+        }
+
+    private:
+        static bool &in_worker()
+        {
+            static thread_local bool flag = false;
+            return flag;
+        }
+
+        void worker_loop()
+        {
+            in_worker() = true;
+            while (true)
+            {
+                std::function<void()> task;
+                {
+                    std::unique_lock<std::mutex> lock(queue_mutex_);
+                    queue_ready_.wait(lock, [this]{ return stopping_ || !queue_.empty(); });
+                    if (queue_.empty())
+                        return;
+                    task = std::move(queue_.front());
+                    queue_.pop_front();
+                }
+                task();
+            }
+        }
+
+        void stop()
+        {
+            {
+                std::lock_guard<std::mutex> lock(queue_mutex_);
+                stopping_ = true;
+            }
+            queue_ready_.notify_all();
+            for (auto &worker : workers_)
+                worker.join();
+            workers_.clear();
+        }
+
+        bool stopping_ = false;
+        std::vector<std::thread> workers_;
+        std::deque<std::function<void()>> queue_;
+        std::mutex queue_mutex_;
+        mutable std::shared_mutex resize_mutex_;
+        std::condition_variable queue_ready_;
+    };
+
+    // The process-wide pool and the thread count set for it. A forked child inherits the pool object but none
+    // of its threads, so the child abandons it (see after_fork) and batch_pool() starts a fresh one on first use.
+    struct BatchPoolState
+    {
+        std::atomic<ThreadPool *> pool{ nullptr };
+        std::atomic<std::size_t> thread_count{ 0 };
+        std::mutex mutex;
+    };
+
+    BatchPoolState &batch_pool_state()
+    {
+        static auto *state = new BatchPoolState();
+        return *state;
+    }
+
+    // Process-wide pool; intentionally never destroyed so interpreter shutdown cannot race its workers.
+    ThreadPool &batch_pool()
+    {
+        auto &state = batch_pool_state();
+        auto *pool = state.pool.load(std::memory_order_acquire);
+        if (pool)
+            return *pool;
+        std::lock_guard<std::mutex> lock(state.mutex);
+        pool = state.pool.load(std::memory_order_relaxed);
+        if (!pool)
+        {
+            pool = new ThreadPool(state.thread_count);
+            state.pool.store(pool, std::memory_order_release);
+        }
+        return *pool;
+    }
+
+    void resize_batch_pool(std::size_t thread_count)
+    {
+        batch_pool().resize(thread_count);
+        batch_pool_state().thread_count = thread_count;
+    }
+
+    template <typename T>
+    const T &deref_item(const T *item, const char *name)
+    {
+        if (!item)
+            throw std::invalid_argument(std::string(name) + " cannot contain None");
+        return *item;
+    }
+
+    template <typename T>
+    void check_same_size(const std::vector<const T *> &first, std::size_t second_size)
+    {
+        if (first.size() != second_size)
+            throw std::invalid_argument("batch arguments must have the same length");
+    }
+
+    // Shape of the polynomial data behind Ciphertext::data(), outermost dimension first.
+    std::vector<py::ssize_t> ciphertext_shape(const Ciphertext &cipher)
+    {
+        return { static_cast<py::ssize_t>(cipher.size()), static_cast<py::ssize_t>(cipher.coeff_modulus_size()),
+                 static_cast<py::ssize_t>(cipher.poly_modulus_degree()) };
+    }
+
+    // NumPy arrays that are guaranteed to be C-contiguous, so their data can be read as one flat run.
+    template <typename T>
+    using contiguous_array = py::array_t<T, py::array::c_style | py::array::forcecast>;
+
+    // Pools made the default for the current thread by memory_pool scopes, innermost last.
+    std::vector<MemoryPoolHandle> &pool_scopes()
+    {
+        static thread_local std::vector<MemoryPoolHandle> scopes;
+        return scopes;
+    }
+
+    // The pool SEAL should allocate from on this thread: the innermost memory_pool scope, or the global pool.
+    MemoryPoolHandle default_pool()
+    {
+        auto &scopes = pool_scopes();
+        return scopes.empty() ? MemoryManager::GetPool() : scopes.back();
+    }
+
+    // The pool passed as an optional pool= argument, falling back to default_pool().
+    MemoryPoolHandle pool_or_default(const MemoryPoolHandle *pool)
+    {
+        return pool ? *pool : default_pool();
+    }
+
+    // Makes a pool the default for the thread that enters it, for use as a context manager.
+    class MemoryPoolScope
+    {
+    public:
+        explicit MemoryPoolScope(MemoryPoolHandle pool) : pool_(std::move(pool))
+        {
+            if (!pool_)
+                throw std::invalid_argument("pool is uninitialized");
+        }
+
+        void enter()
+        {
+            pool_scopes().push_back(pool_);
+            thread_ = std::this_thread::get_id();
+            depth_ = pool_scopes().size();
+        }
+
+        void exit()
+        {
+            auto &scopes = pool_scopes();
+            if (thread_ != std::this_thread::get_id() || scopes.size() != depth_)
+                throw std::logic_error("memory_pool scopes must be exited in reverse order on the thread that entered them");
+            scopes.pop_back();
+            depth_ = 0;
+        }
+
+        const MemoryPoolHandle &pool() const
+        {
+            return pool_;
+        }
+
+    private:
+        MemoryPoolHandle pool_;
+        std::thread::id thread_;
+        std::size_t depth_ = 0;
+    };
+
+    // Scratch vector reused by every encode on the current thread, so encoding does not allocate per call.
+    template <typename T>
+    std::vector<T> &staging_vector()
+    {
+        static thread_local std::vector<T> values;
+        return values;
+    }
+
+    // CKKSEncoder and BatchEncoder only accept raw pointers through gsl::span when SEAL is built with MSGSL;
+    // otherwise the values are copied into the thread's staging vector in one block.
+    // The pool is passed in rather than taken from default_pool(), since these also run on batch pool workers,
+    // which do not see the caller's memory_pool scope.
+    template <typename T>
+    void ckks_encode(const CKKSEncoder &encoder, const T *values, std::size_t count, double scale, Plaintext &destination,
+        const MemoryPoolHandle &pool)
+    {
+#ifdef SEAL_USE_MSGSL
+        encoder.encode(gsl::span<const T>(values, count), scale, destination, pool);
+#else
+        auto &staging = staging_vector<T>();
+        staging.assign(values, values + count);
+        encoder.encode(staging, scale, destination, pool);
+#endif
+    }
+
+    template <typename T>
+    void ckks_encode(const CKKSEncoder &encoder, const T *values, std::size_t count, const parms_id_type &parms_id,
+        double scale, Plaintext &destination, const MemoryPoolHandle &pool)
+    {
+#ifdef SEAL_USE_MSGSL
+        encoder.encode(gsl::span<const T>(values, count), parms_id, scale, destination, pool);
+#else
+        auto &staging = staging_vector<T>();
+        staging.assign(values, values + count);
+        encoder.encode(staging, parms_id, scale, destination, pool);
+#endif
+    }
+
+    template <typename T>
+    void batch_encode(const BatchEncoder &encoder, const T *values, std::size_t count, Plaintext &destination)
+    {
+#ifdef SEAL_USE_MSGSL
+        encoder.encode(gsl::span<const T>(values, count), destination);
+#else
+        auto &staging = staging_vector<T>();
+        staging.assign(values, values + count);
+        encoder.encode(staging, destination);
+#endif
+    }
+
+    // Decode one plaintext straight into destination, which must hold slot_count() values. Without MSGSL the
+    // encoders only decode into std::vector, so the thread's staging vector is used and copied out in one block.
+    template <typename Encoder, typename T>
+    void decode_into(const Encoder &encoder, const Plaintext &plain, T *destination, const MemoryPoolHandle &pool)
+    {
+#ifdef SEAL_USE_MSGSL
+        encoder.decode(plain, gsl::span<T>(destination, encoder.slot_count()), pool);
+#else
+        auto &staging = staging_vector<T>();
+        encoder.decode(plain, staging, pool);
+        std::copy(staging.begin(), staging.end(), destination);
+#endif
+    }
+
+    // Return out if it is a writable C-contiguous array of dtype T and the given shape, or a fresh array when
+    // out is None. Arrays are never converted, since results written to a converted copy would be lost.
+    template <typename T>
+    py::array_t<T> output_array(const py::object &out, const std::vector<py::ssize_t> &shape)
+    {
+        if (out.is_none())
+            return py::array_t<T>(shape);
+        if (!py::isinstance<py::array_t<T>>(out))
+            throw std::invalid_argument("out must be a NumPy array of dtype " + py::str(py::dtype::of<T>()).cast<std::string>());
+
+        auto array = py::reinterpret_borrow<py::array_t<T>>(out);
+        if (!array.writeable() || !(array.flags() & py::array::c_style))
+            throw std::invalid_argument("out must be writable and C-contiguous");
+        if (static_cast<std::size_t>(array.ndim()) != shape.size() || !std::equal(shape.begin(), shape.end(), array.shape()))
+        {
+            std::string expected;
+            for (auto dim : shape)
+                expected += (expected.empty() ? "" : ", ") + std::to_string(dim);
+            throw std::invalid_argument("out must have shape (" + expected + (shape.size() == 1 ? ",)" : ")"));
+        }
+        return array;
+    }
+
+    // Encode a 1-D array into one plaintext, or each row of a 2-D (batch, slots) array into a list of
+    // plaintexts on the batch pool, allocated from pool. The GIL is released while encoding.
+    template <typename T, typename EncodeRow>
+    py::object encode_rows(const contiguous_array<T> &values, const MemoryPoolHandle &pool, EncodeRow &&encode_row)
+    {
+        if (values.ndim() == 1)
+        {
+            Plaintext pt(pool);
+            {
+                py::gil_scoped_release release;
+                encode_row(values.data(), static_cast<std::size_t>(values.shape(0)), pt);
+            }
+            return py::cast(std::move(pt));
+        }
+        if (values.ndim() != 2)
+            throw std::runtime_error("E101: Number of dimensions must be one or two");
+
+        const T *data = values.data();
+        auto rows = static_cast<std::size_t>(values.shape(0));
+        auto columns = static_cast<std::size_t>(values.shape(1));
+        std::vector<Plaintext> plains;
+        plains.reserve(rows);
+        for (std::size_t i = 0; i < rows; i++)
+            plains.emplace_back(pool);
+        {
+            py::gil_scoped_release release;
+            batch_pool().parallel_for(rows, [&](std::size_t i){
+                encode_row(data + i * columns, columns, plains[i]);
+            });
+        }
+        return py::cast(std::move(plains));
+    }
+
+    // Apply fn(i, destination[i]) to every slot of a fresh result list on the batch pool. The results are
+    // allocated from pool, which callers resolve on their own thread, since the workers have no memory_pool scope.
+    template <typename Fn>
+    std::vector<Ciphertext> map_batch(std::size_t count, const MemoryPoolHandle &pool, Fn &&fn)
+    {
+        std::vector<Ciphertext> destination;
+        destination.reserve(count);
+        for (std::size_t i = 0; i < count; i++)
+            destination.emplace_back(pool);
+        batch_pool().parallel_for(count, [&](std::size_t i){
+            fn(i, destination[i]);
+        });
+        return destination;
+    }
+
+    // Process-wide index from every parms_id in a live SEALContext's modulus chain to that context,
+    // used to rebind unpickled objects. Entries are weak so contexts still die with their last owner.
+    class ContextRegistry
+    {
+    public:
+        void add(const std::shared_ptr<SEALContext> &context)
+        {
+            if (!context->parameters_set())
+                return;
+            std::lock_guard<std::mutex> lock(mutex_);
+            for (auto it = contexts_.begin(); it != contexts_.end();)
+                it = it->second.expired() ? contexts_.erase(it) : std::next(it);
+            for (auto data = context->key_context_data(); data; data = data->next_context_data())
+                contexts_[data->parms_id()] = context;
+        }
+
+        std::shared_ptr<SEALContext> find(const parms_id_type &parms_id)
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            auto it = contexts_.find(parms_id);
+            auto context = it == contexts_.end() ? nullptr : it->second.lock();
+            if (!context)
+                throw std::runtime_error("No live SEALContext matches the parms_id; "
+                    "create or unpickle the SEALContext first");
+            return context;
+        }
+
+    private:
+        std::mutex mutex_;
+        std::unordered_map<parms_id_type, std::weak_ptr<SEALContext>> contexts_;
+    };
+
+    ContextRegistry &context_registry()
+    {
+        static auto *registry = new ContextRegistry();
+        return *registry;
+    }
+
+    std::shared_ptr<SEALContext> make_context(const EncryptionParameters &parms, bool expand_mod_chain, sec_level_type sec_level)
+    {
+        auto context = std::make_shared<SEALContext>(parms, expand_mod_chain, sec_level);
+        context_registry().add(context);
+        return context;
+    }
+
+    // Process-wide cache of SEALContexts keyed by the serialized parameters and context options.
+    // Contexts are kept alive, so every lookup after the first skips prime checks and table setup.
+    class ContextCache
+    {
+    public:
+        std::shared_ptr<SEALContext> get(const EncryptionParameters &parms, bool expand_mod_chain, sec_level_type sec_level)
+        {
+            std::ostringstream stream;
+            parms.save(stream, compr_mode_type::none);
+            stream << '/' << expand_mod_chain << '/' << static_cast<int>(sec_level);
+            auto key = stream.str();
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                auto it = contexts_.find(key);
+                if (it != contexts_.end())
+                    return it->second;
+            }
+            // Build outside the lock; if another thread won the race, its context is kept.
+            auto context = make_context(parms, expand_mod_chain, sec_level);
+            std::lock_guard<std::mutex> lock(mutex_);
+            return contexts_.emplace(std::move(key), std::move(context)).first->second;
+        }
+
+        std::size_t size()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return contexts_.size();
+        }
+
+        void clear()
+        {
+            std::unordered_map<std::string, std::shared_ptr<SEALContext>> contexts;
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                contexts.swap(contexts_);
+            }
+        }
+
+    private:
+        std::mutex mutex_;
+        std::unordered_map<std::string, std::shared_ptr<SEALContext>> contexts_;
+    };
+
+    ContextCache &context_cache()
+    {
+        static auto *cache = new ContextCache();
+        return *cache;
+    }
+
+    // View of any C-contiguous buffer-protocol object as raw bytes.
+    class ByteView
+    {
+    public:
+        explicit ByteView(const py::handle &obj, bool writable = false)
+        {
+            if (PyObject_GetBuffer(obj.ptr(), &view_, PyBUF_C_CONTIGUOUS | (writable ? PyBUF_WRITABLE : 0)) != 0)
+                throw py::error_already_set();
+        }
+
+        ~ByteView()
+        {
+            PyBuffer_Release(&view_);
+        }
+
+        ByteView(const ByteView &) = delete;
+        ByteView &operator=(const ByteView &) = delete;
+
+        seal_byte *data() const
+        {
+            return static_cast<seal_byte *>(view_.buf);
+        }
+
+        std::size_t size() const
+        {
+            return static_cast<std::size_t>(view_.len);
+        }
+
+    private:
+        Py_buffer view_;
+    };
+
+    // Serialize straight into a bytes object sized by save_size(), skipping the stringstream copies.
+    template <typename T>
+    py::bytes save_bytes(const T &obj, compr_mode_type compr_mode = Serialization::compr_mode_default)
+    {
+        auto size = static_cast<std::size_t>(obj.save_size(compr_mode));
+        PyObject *bytes = PyBytes_FromStringAndSize(nullptr, static_cast<py::ssize_t>(size));
+        if (!bytes)
+            throw py::error_already_set();
+        std::streamoff written;
+        try
+        {
+            py::gil_scoped_release release;
+            written = obj.save(reinterpret_cast<seal_byte *>(PyBytes_AS_STRING(bytes)), size, compr_mode);
+        }
+        catch (...)
+        {
+            Py_DECREF(bytes);
+            throw;
+        }
+        if (_PyBytes_Resize(&bytes, static_cast<py::ssize_t>(written)) != 0)
+            throw py::error_already_set();
+        return py::reinterpret_steal<py::bytes>(bytes);
+    }
+
+    // Serialize into a caller-provided writable buffer of at least save_size(compr_mode) bytes.
+    template <typename T>
+    std::streamoff save_into(const T &obj, const py::handle &buffer, compr_mode_type compr_mode)
+    {
+        ByteView out(buffer, true);
+        auto size = static_cast<std::size_t>(obj.save_size(compr_mode));
+        if (out.size() < size)
+            throw std::invalid_argument("buffer is too small, save_size() is " + std::to_string(size) + " bytes");
+        py::gil_scoped_release release;
+        return obj.save(out.data(), out.size(), compr_mode);
+    }
+
+    template <typename T>
+    std::streamoff load_from(T &obj, const SEALContext &context, const py::handle &buffer)
+    {
+        ByteView in(buffer);
+        py::gil_scoped_release release;
+        return obj.load(context, in.data(), in.size());
+    }
+
+    std::streamoff load_from(EncryptionParameters &parms, const py::handle &buffer)
+    {
+        ByteView in(buffer);
+        py::gil_scoped_release release;
+        return parms.load(in.data(), in.size());
+    }
+
+    template <typename T>
+    T load_string(const SEALContext &context, const std::string &data)
+    {
+        T obj;
+        py::gil_scoped_release release;
+        obj.load(context, reinterpret_cast<const seal_byte *>(data.data()), data.size());
+        return obj;
+    }
+
+    // Serializable<T> wraps a freshly generated object whose serialized form replaces half of each
+    // polynomial pair with a PRNG seed. It can only be saved; the receiver loads a regular T.
+    template <typename T>
+    void bind_serializable(py::module_ &m, const char *name, const char *doc)
+    {
+        py::class_<Serializable<T>>(m, name, doc)
+            .def("save_size", &Serializable<T>::save_size, py::arg("compr_mode")=Serialization::compr_mode_default,
+                SEAL_DOC("Return an upper bound on the seed-compressed serialized size in bytes."))
+            .def("save", [](const Serializable<T> &obj, const std::string &path, compr_mode_type compr_mode){
+                std::ofstream out(path, std::ios::binary);
+                obj.save(out, compr_mode);
+                out.close();
+            }, py::arg("path"), py::arg("compr_mode")=Serialization::compr_mode_default,
+                SEAL_DOC("Serialize the seed-compressed object to a file."))
+            .def("to_bytes", &save_bytes<Serializable<T>>, py::arg("compr_mode")=Serialization::compr_mode_default,
+                SEAL_DOC("Serialize the seed-compressed object to a Python bytes object."))
+            .def("save_into", &save_into<Serializable<T>>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+                SEAL_DOC("Serialize the seed-compressed object into a writable buffer of at least save_size(compr_mode) bytes. "
+                    "Return the number of bytes written."));
+    }
+
+    // Wrap a buffer-protocol object for pickling: a PickleBuffer that can travel out-of-band under
+    // protocol 5, or a bytes copy for older protocols.
+    py::object pickle_buffer(const py::object &owner, int protocol)
+    {
+        if (protocol >= 5)
+            return py::module_::import("pickle").attr("PickleBuffer")(owner);
+        auto copy = py::reinterpret_steal<py::object>(PyBytes_FromObject(owner.ptr()));
+        if (!copy)
+            throw py::error_already_set();
+        return copy;
+    }
+
+    // Copy a pickled raw coefficient buffer into freshly allocated SEAL storage.
+    void copy_pickled_data(const py::handle &buffer, std::uint64_t *destination, std::size_t count)
+    {
+        ByteView data(buffer);
+        if (data.size() != count * sizeof(std::uint64_t))
+            throw std::runtime_error("(Pickle) Data buffer size does not match the pickled metadata");
+        std::copy_n(data.data(), data.size(), reinterpret_cast<seal_byte *>(destination));
+    }
+
+    // Pickle state for objects without a raw layout we can expose: their uncompressed SEAL
+    // serialization, written into a bytearray, next to the parms_id used to rebind on load.
+    template <typename T>
+    py::tuple pickle_state(const py::object &self, int protocol)
+    {
+        const T &obj = self.cast<const T &>();
+        auto size = static_cast<std::size_t>(obj.save_size(compr_mode_type::none));
+        auto buffer = py::reinterpret_steal<py::object>(PyByteArray_FromStringAndSize(nullptr, static_cast<py::ssize_t>(size)));
+        if (!buffer)
+            throw py::error_already_set();
+        std::streamoff written;
+        {
+            py::gil_scoped_release release;
+            written = obj.save(reinterpret_cast<seal_byte *>(PyByteArray_AS_STRING(buffer.ptr())), size, compr_mode_type::none);
+        }
+        if (PyByteArray_Resize(buffer.ptr(), static_cast<py::ssize_t>(written)) != 0)
+            throw py::error_already_set();
+        return py::make_tuple(obj.parms_id(), pickle_buffer(buffer, protocol));
+    }
+
+    template <typename T>
+    T unpickle_state(const py::tuple &state)
+    {
+        if (state.size() != 2)
+            throw std::runtime_error("(Pickle) Invalid input tuple!");
+        auto context = context_registry().find(state[0].cast<parms_id_type>());
+        ByteView data(state[1]);
+        T obj;
+        py::gil_scoped_release release;
+        obj.load(*context, data.data(), data.size());
+        return obj;
+    }
+
+    // Plaintexts pickle their raw coefficients; only NTT-form plaintexts need a context to validate.
+    template <>
+    py::tuple pickle_state<Plaintext>(const py::object &self, int protocol)
+    {
+        const Plaintext &plain = self.cast<const Plaintext &>();
+        return py::make_tuple(plain.parms_id(), plain.scale(), plain.coeff_count(), pickle_buffer(self, protocol));
+    }
+
+    template <>
+    Plaintext unpickle_state<Plaintext>(const py::tuple &state)
+    {
+        if (state.size() != 4)
+            throw std::runtime_error("(Pickle) Invalid input tuple!");
+        auto parms_id = state[0].cast<parms_id_type>();
+        Plaintext plain(state[2].cast<std::size_t>());
+        copy_pickled_data(state[3], plain.data(), plain.coeff_count());
+        plain.parms_id() = parms_id;
+        plain.scale() = state[1].cast<double>();
+        if (parms_id != parms_id_zero && !is_valid_for(plain, *context_registry().find(parms_id)))
+            throw std::runtime_error("(Pickle) Plaintext data is invalid for its SEALContext");
+        return plain;
+    }
+
+    // Ciphertexts pickle their raw polynomial data, which the buffer protocol already exposes.
+    template <>
+    py::tuple pickle_state<Ciphertext>(const py::object &self, int protocol)
+    {
+        const Ciphertext &cipher = self.cast<const Ciphertext &>();
+        return py::make_tuple(cipher.parms_id(), cipher.is_ntt_form(), cipher.size(), cipher.scale(),
+            cipher.correction_factor(), pickle_buffer(self, protocol));
+    }
+
+    template <>
+    Ciphertext unpickle_state<Ciphertext>(const py::tuple &state)
+    {
+        if (state.size() != 6)
+            throw std::runtime_error("(Pickle) Invalid input tuple!");
+        auto parms_id = state[0].cast<parms_id_type>();
+        Ciphertext cipher;
+        if (parms_id == parms_id_zero)
+            return cipher;
+        auto context = context_registry().find(parms_id);
+        cipher.resize(*context, parms_id, state[2].cast<std::size_t>());
+        copy_pickled_data(state[5], cipher.data(), cipher.dyn_array().size());
+        cipher.is_ntt_form() = state[1].cast<bool>();
+        cipher.scale() = state[3].cast<double>();
+        cipher.correction_factor() = state[4].cast<std::uint64_t>();
+        if (!is_valid_for(cipher, *context))
+            throw std::runtime_error("(Pickle) Ciphertext data is invalid for its SEALContext");
+        return cipher;
+    }
+
+    // __getstate__ keeps the state in-band; __reduce_ex__ lets protocol 5 hand the data out-of-band.
+    template <typename T>
+    py::tuple getstate(const py::object &self)
+    {
+        return pickle_state<T>(self, 4);
+    }
+
+    template <typename T>
+    py::tuple reduce_ex(const py::object &self, int protocol)
+    {
+        auto newobj = py::module_::import("copyreg").attr("__newobj__");
+        return py::make_tuple(newobj, py::make_tuple(self.get_type()), pickle_state<T>(self, protocol));
+    }
+
+    // Result of plan_galois_keys: the rotation steps to generate keys for, and how each requested
+    // rotation is composed from them.
+    class GaloisKeyPlan
+    {
+    public:
+        std::vector<int> steps;
+        std::map<int, std::vector<int>> paths;
+        std::size_t bytes_per_key = 0;
+
+        std::size_t key_bytes() const
+        {
+            return steps.size() * bytes_per_key;
+        }
+
+        const std::vector<int> &path(int rotation) const
+        {
+            auto it = paths.find(rotation);
+            if (it == paths.end())
+                throw std::invalid_argument("rotation " + std::to_string(rotation) + " is not part of the plan");
+            return it->second;
+        }
+
+        std::size_t extra_rotations() const
+        {
+            std::size_t extra = 0;
+            for (const auto &item : paths)
+                extra += item.second.size() > 1 ? item.second.size() - 1 : 0;
+            return extra;
+        }
+    };
+
+    // Breadth-first search over slot offsets modulo slots, using at most max_hops key steps.
+    // parent[v] holds the key index that last reached v, or -1 if v is unreachable.
+    std::vector<int> reachable(const std::vector<std::size_t> &keys, std::size_t slots, int max_hops)
+    {
+        std::vector<int> parent(slots, -1);
+        std::vector<std::size_t> frontier = { 0 };
+        parent[0] = static_cast<int>(keys.size());
+        for (int hop = 0; hop < max_hops && !frontier.empty(); hop++)
+        {
+            std::vector<std::size_t> next;
+            for (auto v : frontier)
+            {
+                for (std::size_t k = 0; k < keys.size(); k++)
+                {
+                    auto w = (v + keys[k]) % slots;
+                    if (parent[w] < 0)
+                    {
+                        parent[w] = static_cast<int>(k);
+                        next.push_back(w);
+                    }
+                }
+            }
+            frontier = std::move(next);
+        }
+        return parent;
+    }
+
+    // Same search as reachable(), but only counts the covered targets. The scratch marks are cleared
+    // again afterwards so one buffer serves every candidate evaluation.
+    std::size_t count_covered(const std::vector<std::size_t> &keys, std::size_t slots, int max_hops,
+        const std::vector<char> &is_target, std::vector<char> &seen)
+    {
+        std::vector<std::size_t> visited = { 0 };
+        seen[0] = 1;
+        std::size_t begin = 0, count = 0;
+        for (int hop = 0; hop < max_hops && begin < visited.size(); hop++)
+        {
+            auto end = visited.size();
+            for (auto i = begin; i < end; i++)
+            {
+                for (auto key : keys)
+                {
+                    auto w = (visited[i] + key) % slots;
+                    if (!seen[w])
+                    {
+                        seen[w] = 1;
+                        count += is_target[w] ? 1 : 0;
+                        visited.push_back(w);
+                    }
+                }
+            }
+            begin = end;
+        }
+        for (auto v : visited)
+            seen[v] = 0;
+        return count;
+    }
+
+    // Greedy set cover: candidate steps are the requested rotations, the power-of-two steps SEAL
+    // generates by default and, for up to 128 distinct rotations, their pairwise differences. Each
+    // round keeps the candidate that lets the most requested rotations be composed within max_hops
+    // key switches, with ties going to requested steps, then smaller powers.
+    GaloisKeyPlan plan_galois_keys(const SEALContext &context, const std::vector<int> &rotations, int max_hops)
+    {
+        if (!context.using_keyswitching())
+            throw std::invalid_argument("encryption parameters do not support keyswitching");
+        if (max_hops < 1)
+            throw std::invalid_argument("max_hops must be at least one");
+        auto key_data = context.key_context_data();
+        auto coeff_count = key_data->parms().poly_modulus_degree();
+        auto key_modulus_size = key_data->parms().coeff_modulus().size();
+        std::size_t slots = coeff_count / 2;
+        auto normalize = [slots](long long step){
+            auto n = static_cast<long long>(slots);
+            return static_cast<std::size_t>(((step % n) + n) % n);
+        };
+        auto signed_step = [slots](std::size_t step){
+            return step > slots / 2 ? static_cast<int>(step) - static_cast<int>(slots) : static_cast<int>(step);
+        };
+
+        std::vector<std::size_t> targets, candidates;
+        std::vector<char> is_target(slots, 0), is_candidate(slots, 0);
+        auto add_candidate = [&](std::size_t c){
+            if (c != 0 && !is_candidate[c])
+            {
+                is_candidate[c] = 1;
+                candidates.push_back(c);
+            }
+        };
+        for (int rotation : rotations)
+        {
+            auto t = normalize(rotation);
+            if (t != 0 && !is_target[t])
+            {
+                is_target[t] = 1;
+                targets.push_back(t);
+                add_candidate(t);
+            }
+        }
+        for (std::size_t power = 1; power < slots; power <<= 1)
+        {
+            add_candidate(power);
+            add_candidate(slots - power);
+        }
+        if (max_hops > 1 && targets.size() <= 128)
+        {
+            for (auto a : targets)
+            {
+                for (auto b : targets)
+                    add_candidate((a + slots - b) % slots);
+            }
+        }
+
+        std::vector<std::size_t> keys;
+        std::vector<char> seen(slots, 0), is_key(slots, 0);
+        std::size_t done = 0;
+        while (done < targets.size())
+        {
+            std::size_t best = 0, best_covered = done;
+            for (auto c : candidates)
+            {
+                if (is_key[c])
+                    continue;
+                keys.push_back(c);
+                auto count = count_covered(keys, slots, max_hops, is_target, seen);
+                keys.pop_back();
+                if (count > best_covered)
+                {
+                    best = c;
+                    best_covered = count;
+                }
+            }
+            keys.push_back(best);
+            is_key[best] = 1;
+            done = best_covered;
+        }
+
+        GaloisKeyPlan plan;
+        plan.bytes_per_key = (key_modulus_size - 1) * 2 * key_modulus_size * coeff_count * sizeof(std::uint64_t);
+        for (auto key : keys)
+            plan.steps.push_back(signed_step(key));
+        auto parent = reachable(keys, slots, max_hops);
+        for (int rotation : rotations)
+        {
+            std::vector<int> path;
+            for (auto v = normalize(rotation); v != 0; v = (v + slots - keys[parent[v]]) % slots)
+                path.push_back(signed_step(keys[parent[v]]));
+            plan.paths[rotation] = path;
+        }
+        return plan;
+    }
+
+    // Rotates one ciphertext by many steps while decomposing c1 only once. Key switching first
+    // lifts every RNS limb of c1 to all key primes in NTT form; that lift commutes with the NTT-domain
+    // Galois permutation, so each rotation only permutes the shared digits before its key inner
+    // product. The inner product and the final division by the special prime follow
+    // Evaluator::switch_key_inplace. Digits are lifted from [0, q_j) before rather than after the
+    // permutation, so results match Evaluator's up to the usual key-switching noise, not bit for bit.
+    class HoistedRotation
+    {
+    public:
+        HoistedRotation(const SEALContext &context, const Ciphertext &encrypted)
+            : context_(context), encrypted_(encrypted)
+        {
+            if (!is_metadata_valid_for(encrypted, context) || !is_buffer_valid(encrypted))
+                throw std::invalid_argument("encrypted is not valid for encryption parameters");
+            if (encrypted.size() != 2)
+                throw std::invalid_argument("encrypted size must be 2");
+            if (!context.using_keyswitching())
+                throw std::logic_error("keyswitching is not supported by the context");
+
+            auto &context_data = *context.get_context_data(encrypted.parms_id());
+            auto &key_context_data = *context.key_context_data();
+            scheme_ = context_data.parms().scheme();
+            coeff_count_ = context_data.parms().poly_modulus_degree();
+            decomp_size_ = context_data.parms().coeff_modulus().size();
+            key_modulus_ = key_context_data.parms().coeff_modulus();
+            key_ntt_tables_ = key_context_data.small_ntt_tables();
+        }
+
+        // Lift c1 once; every later rotate() reuses the digits.
+        void decompose()
+        {
+            std::size_t n = coeff_count_;
+            bool ntt_form = scheme_ != scheme_type::bfv;
+            digits_.assign(decomp_size_ * (decomp_size_ + 1) * n, 0);
+            batch_pool().parallel_for(decomp_size_, [&](std::size_t j){
+                const std::uint64_t *c1 = encrypted_.data(1) + j * n;
+                std::vector<std::uint64_t> coeffs(c1, c1 + n);
+                if (ntt_form)
+                    util::inverse_ntt_negacyclic_harvey(coeffs.data(), key_ntt_tables_[j]);
+                for (std::size_t i = 0; i <= decomp_size_; i++)
+                {
+                    std::size_t key_index = key_index_of(i);
+                    std::uint64_t *digit = this->digit(j, i);
+                    if (ntt_form && i == j)
+                    {
+                        std::copy_n(c1, n, digit);
+                        continue;
+                    }
+                    if (key_modulus_[j].value() <= key_modulus_[key_index].value())
+                        std::copy_n(coeffs.data(), n, digit);
+                    else
+                        util::modulo_poly_coeffs(coeffs.data(), n, key_modulus_[key_index], digit);
+                    util::ntt_negacyclic_harvey_lazy(digit, key_ntt_tables_[key_index]);
+                }
+            });
+        }
+
+        void rotate(std::uint32_t galois_elt, const GaloisKeys &galois_keys, Ciphertext &destination) const
+        {
+            std::size_t n = coeff_count_;
+            std::size_t key_modulus_size = key_modulus_.size();
+            auto &key_context_data = *context_.key_context_data();
+            auto galois_tool = key_context_data.galois_tool();
+            auto &key_vector = galois_keys.data()[GaloisKeys::get_index(galois_elt)];
+            if (key_vector.size() < decomp_size_)
+                throw std::invalid_argument("galois_keys is not valid for encryption parameters");
+            for (auto &each_key : key_vector)
+            {
+                if (!is_metadata_valid_for(each_key, context_) || each_key.data().size() != 2)
+                    throw std::invalid_argument("galois_keys is not valid for encryption parameters");
+            }
+
+            // Permuted c0 is the starting point; c1 comes entirely from the key switch.
+            destination = encrypted_;
+            for (std::size_t i = 0; i < decomp_size_; i++)
+            {
+                const std::uint64_t *source = encrypted_.data(0) + i * n;
+                std::uint64_t *target = destination.data(0) + i * n;
+                if (scheme_ == scheme_type::bfv)
+                    galois_tool->apply_galois(source, galois_elt, key_modulus_[i], target);
+                else
+                    galois_tool->apply_galois_ntt(source, galois_elt, target);
+            }
+            std::fill_n(destination.data(1), decomp_size_ * n, 0);
+
+            // Products < 4q^2 < 2^122 for q < 2^60, so 64 of them fit a 128-bit accumulator.
+            constexpr std::size_t lazy_summand_bound = std::size_t(1) << (128 - 2 * SEAL_USER_MOD_BIT_COUNT_MAX - 2);
+            std::vector<std::uint64_t> products(2 * (decomp_size_ + 1) * n);
+            auto product = [&](std::size_t k, std::size_t i){ return products.data() + (k * (decomp_size_ + 1) + i) * n; };
+            std::vector<std::uint64_t> permuted(n);
+            std::vector<unsigned long long> accumulator(2 * 2 * n);
+            for (std::size_t i = 0; i <= decomp_size_; i++)
+            {
+                std::size_t key_index = key_index_of(i);
+                auto &modulus = key_modulus_[key_index];
+                std::fill(accumulator.begin(), accumulator.end(), 0);
+                std::size_t summands = 0;
+                for (std::size_t j = 0; j < decomp_size_; j++)
+                {
+                    galois_tool->apply_galois_ntt(digit(j, i), galois_elt, permuted.data());
+                    bool reduce = ++summands == lazy_summand_bound;
+                    for (std::size_t k = 0; k < 2; k++)
+                    {
+                        const std::uint64_t *key = key_vector[j].data().data(k) + key_index * n;
+                        unsigned long long *acc = accumulator.data() + k * 2 * n;
+                        for (std::size_t l = 0; l < n; l++)
+                        {
+                            unsigned long long qword[2];
+                            util::multiply_uint64(permuted[l], key[l], qword);
+                            util::add_uint128(qword, acc + 2 * l, acc + 2 * l);
+                            if (reduce)
+                            {
+                                acc[2 * l] = util::barrett_reduce_128(acc + 2 * l, modulus);
+                                acc[2 * l + 1] = 0;
+                            }
+                        }
+                    }
+                    if (reduce)
+                        summands = 0;
+                }
+                for (std::size_t k = 0; k < 2; k++)
+                {
+                    const unsigned long long *acc = accumulator.data() + k * 2 * n;
+                    std::uint64_t *target = product(k, i);
+                    for (std::size_t l = 0; l < n; l++)
+                        target[l] = util::barrett_reduce_128(acc + 2 * l, modulus);
+                }
+            }
+
+            auto modswitch_factors = key_context_data.rns_tool()->inv_q_last_mod_q();
+            auto &special_modulus = key_modulus_[key_modulus_size - 1];
+            std::vector<std::uint64_t> scratch(2 * n);
+            std::uint64_t *t_ntt = scratch.data();
+            std::uint64_t *t_extra = scratch.data() + n;
+            for (std::size_t k = 0; k < 2; k++)
+            {
+                std::uint64_t *t_last = product(k, decomp_size_);
+                if (scheme_ == scheme_type::bgv)
+                {
+                    auto &plain_modulus = context_.first_context_data()->parms().plain_modulus();
+                    std::uint64_t qk = special_modulus.value();
+                    std::uint64_t qk_inv_qp = key_context_data.rns_tool()->inv_q_last_mod_t();
+                    util::inverse_ntt_negacyclic_harvey(t_last, key_ntt_tables_[key_modulus_size - 1]);
+                    std::vector<std::uint64_t> correction(n);
+                    util::modulo_poly_coeffs(t_last, n, plain_modulus, correction.data());
+                    util::negate_poly_coeffmod(correction.data(), n, plain_modulus, correction.data());
+                    if (qk_inv_qp != 1)
+                        util::multiply_poly_scalar_coeffmod(correction.data(), n, qk_inv_qp, plain_modulus, correction.data());
+                    for (std::size_t j = 0; j < decomp_size_; j++)
+                    {
+                        auto &qi = key_modulus_[j];
+                        util::modulo_poly_coeffs(correction.data(), n, qi, t_ntt);
+                        util::multiply_poly_scalar_coeffmod(t_ntt, n, qk, qi, t_ntt);
+                        util::modulo_poly_coeffs(t_last, n, qi, t_extra);
+                        for (std::size_t l = 0; l < n; l++)
+                            t_ntt[l] = util::add_uint_mod(t_ntt[l], t_extra[l], qi);
+                        util::ntt_negacyclic_harvey(t_ntt, key_ntt_tables_[j]);
+                        std::uint64_t *target = product(k, j);
+                        for (std::size_t l = 0; l < n; l++)
+                            target[l] = util::sub_uint_mod(target[l], t_ntt[l], qi);
+                        util::multiply_poly_scalar_coeffmod(target, n, modswitch_factors[j], qi, target);
+                        std::uint64_t *result = destination.data(k) + j * n;
+                        util::add_poly_coeffmod(target, result, n, qi, result);
+                    }
+                }
+                else
+                {
+                    util::inverse_ntt_negacyclic_harvey_lazy(t_last, key_ntt_tables_[key_modulus_size - 1]);
+                    std::uint64_t qk_half = special_modulus.value() >> 1;
+                    for (std::size_t l = 0; l < n; l++)
+                        t_last[l] = util::barrett_reduce_64(t_last[l] + qk_half, special_modulus);
+                    for (std::size_t j = 0; j < decomp_size_; j++)
+                    {
+                        auto &qi = key_modulus_[j];
+                        if (special_modulus.value() > qi.value())
+                            util::modulo_poly_coeffs(t_last, n, qi, t_ntt);
+                        else
+                            std::copy_n(t_last, n, t_ntt);
+                        std::uint64_t fix = qi.value() - util::barrett_reduce_64(qk_half, qi);
+                        for (std::size_t l = 0; l < n; l++)
+                            t_ntt[l] += fix;
+
+                        std::uint64_t *target = product(k, j);
+                        std::uint64_t qi_lazy = qi.value() << 1;
+                        if (scheme_ == scheme_type::ckks)
+                        {
+                            util::ntt_negacyclic_harvey_lazy(t_ntt, key_ntt_tables_[j]);
+#if SEAL_USER_MOD_BIT_COUNT_MAX > 60
+                            for (std::size_t l = 0; l < n; l++)
+                                t_ntt[l] -= t_ntt[l] >= qi_lazy ? qi_lazy : 0;
+#else
+                            qi_lazy = qi.value() << 2;
+#endif
+                        }
+                        else
+                        {
+                            util::inverse_ntt_negacyclic_harvey_lazy(target, key_ntt_tables_[j]);
+                        }
+                        for (std::size_t l = 0; l < n; l++)
+                            target[l] += qi_lazy - t_ntt[l];
+                        util::multiply_poly_scalar_coeffmod(target, n, modswitch_factors[j], qi, target);
+                        std::uint64_t *result = destination.data(k) + j * n;
+                        util::add_poly_coeffmod(target, result, n, qi, result);
+                    }
+                }
+            }
+        }
+
+    private:
+        std::size_t key_index_of(std::size_t i) const
+        {
+            return i == decomp_size_ ? key_modulus_.size() - 1 : i;
+        }
+
+        std::uint64_t *digit(std::size_t j, std::size_t i)
+        {
+            return digits_.data() + (j * (decomp_size_ + 1) + i) * coeff_count_;
+        }
+
+        const std::uint64_t *digit(std::size_t j, std::size_t i) const
+        {
+            return digits_.data() + (j * (decomp_size_ + 1) + i) * coeff_count_;
+        }
+
+        const SEALContext &context_;
+        const Ciphertext &encrypted_;
+        scheme_type scheme_;
+        std::size_t coeff_count_;
+        std::size_t decomp_size_;
+        std::vector<Modulus> key_modulus_;
+        const util::NTTTables *key_ntt_tables_;
+        std::vector<std::uint64_t> digits_;
+    };
+
+    // Shared body of rotate_vector_many and rotate_rows_many. Steps without their own Galois key are
+    // delegated to evaluator, which composes them from the available keys as usual. context must be the
+    // one evaluator was created with.
+    std::vector<Ciphertext> rotate_many(const SEALContext &context, const Evaluator &evaluator, const Ciphertext &encrypted,
+        const std::vector<int> &steps, const GaloisKeys &galois_keys, bool rows, const MemoryPoolHandle &pool)
+    {
+        auto context_data = context.get_context_data(encrypted.parms_id());
+        if (!context_data)
+            throw std::invalid_argument("encrypted is not valid for encryption parameters");
+        auto scheme = context_data->parms().scheme();
+        if (rows ? scheme == scheme_type::ckks : scheme != scheme_type::ckks)
+            throw std::logic_error("unsupported scheme");
+        if (!context_data->qualifiers().using_batching)
+            throw std::logic_error("encryption parameters do not support batching");
+        if (galois_keys.parms_id() != context.key_parms_id())
+            throw std::invalid_argument("galois_keys is not valid for encryption parameters");
+
+        auto galois_tool = context_data->galois_tool();
+        std::vector<std::uint32_t> elts(steps.size());
+        bool any_direct = false;
+        for (std::size_t i = 0; i < steps.size(); i++)
+        {
+            elts[i] = steps[i] == 0 ? 1 : galois_tool->get_elt_from_step(steps[i]);
+            any_direct = any_direct || (elts[i] != 1 && galois_keys.has_key(elts[i]));
+        }
+
+        HoistedRotation hoisted(*context, encrypted);
+        if (any_direct)
+            hoisted.decompose();
+        return map_batch(steps.size(), pool, [&](std::size_t i, Ciphertext &destination){
+            if (elts[i] == 1)
+                destination = encrypted;
+            else if (galois_keys.has_key(elts[i]))
+                hoisted.rotate(elts[i], galois_keys, destination);
+            else if (rows)
+                evaluator.rotate_rows(encrypted, steps[i], galois_keys, destination, pool);
+            else
+                evaluator.rotate_vector(encrypted, steps[i], galois_keys, destination, pool);
+        });
+    }
+
+    struct MatrixEntry
+    {
+        std::size_t row;
+        std::size_t column;
+        double value;
+    };
+
+    // Nonzero entries of a dense two-dimensional matrix in row-major order.
+    std::vector<MatrixEntry> matrix_entries(const contiguous_array<double> &matrix)
+    {
+        if (matrix.ndim() != 2)
+            throw std::invalid_argument("matrix must be two-dimensional");
+        auto rows = static_cast<std::size_t>(matrix.shape(0));
+        auto columns = static_cast<std::size_t>(matrix.shape(1));
+        const double *data = matrix.data();
+        std::vector<MatrixEntry> entries;
+        for (std::size_t t = 0; t < rows; t++)
+            for (std::size_t c = 0; c < columns; c++)
+                if (data[t * columns + c] != 0.0)
+                    entries.push_back({ t, c, data[t * columns + c] });
+        return entries;
+    }
+
+    // Matrix-vector product y = M x on a CKKS ciphertext holding x in its first columns slots, zeros after.
+    // M is zero-padded to a d x d matrix with d the next power of two, so either d fills the slots or
+    // x can be replicated once with a rotation by -d to make rotations wrap modulo d. The product is
+    // the generalized diagonal method in baby-step giant-step form,
+    //   M x = sum_j rot(sum_i rot(diag_{j n1 + i}, -j n1) * rot(x, i), j n1),
+    // which takes about 2 sqrt(d) rotations instead of d; the baby steps share one hoisted
+    // decomposition. All-zero diagonals are skipped. Diagonals are encoded at the scale given to the
+    // constructor, once per level, on first use.
+    class LinearTransform
+    {
+    public:
+        LinearTransform(const SEALContext &context, std::size_t rows, std::size_t columns,
+            const std::vector<MatrixEntry> &entries, double scale, const parms_id_type &parms_id, std::size_t baby_steps)
+            : context_(context), encoder_(context), evaluator_(context), scale_(scale), rows_(rows), columns_(columns)
+        {
+            auto context_data = context.get_context_data(parms_id);
+            if (!context_data)
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            if (context_data->parms().scheme() != scheme_type::ckks)
+                throw std::invalid_argument("LinearTransform requires the CKKS scheme");
+            slots_ = encoder_.slot_count();
+            if (!rows_ || !columns_)
+                throw std::invalid_argument("matrix cannot be empty");
+            if (rows_ > slots_ || columns_ > slots_)
+                throw std::invalid_argument("matrix dimensions cannot exceed slot_count()");
+            for (dim_ = 1; dim_ < std::max(rows_, columns_); dim_ <<= 1);
+
+            if (!baby_steps)
+                for (baby_steps = 1; baby_steps * baby_steps < dim_; baby_steps <<= 1);
+            if (baby_steps > dim_)
+                throw std::invalid_argument("baby_steps cannot exceed the padded matrix dimension");
+            baby_steps_ = baby_steps;
+
+            // diag_k[t] = M[t, (t + k) mod d], pre-rotated by -j n1 over the full slot vector.
+            std::map<std::size_t, std::vector<double>> diagonals;
+            for (auto &entry : entries)
+            {
+                if (entry.row >= rows_ || entry.column >= columns_)
+                    throw std::invalid_argument("matrix entry is out of range");
+                if (entry.value == 0.0)
+                    continue;
+                std::size_t k = (entry.column + dim_ - entry.row) % dim_;
+                std::size_t shift = (k / baby_steps_) * baby_steps_;
+                auto &diagonal = diagonals[k];
+                if (diagonal.empty())
+                    diagonal.resize(slots_, 0.0);
+                diagonal[(entry.row + shift) % slots_] = entry.value;
+            }
+            if (diagonals.empty())
+                throw std::invalid_argument("matrix cannot be all zeros");
+            for (auto &diagonal : diagonals)
+            {
+                indices_.push_back(diagonal.first);
+                diagonals_.push_back(std::move(diagonal.second));
+            }
+        }
+
+        std::vector<int> galois_steps() const
+        {
+            std::vector<int> steps;
+            if (dim_ < slots_)
+                steps.push_back(-static_cast<int>(dim_));
+            for (std::size_t i : baby_indices())
+                if (i)
+                    steps.push_back(static_cast<int>(i));
+            for (std::size_t j : giant_indices())
+                if (j)
+                    steps.push_back(static_cast<int>(j * baby_steps_));
+            return steps;
+        }
+
+        std::size_t rotation_count() const
+        {
+            return galois_steps().size();
+        }
+
+        Ciphertext apply(const Ciphertext &encrypted, const GaloisKeys &galois_keys) const
+        {
+            auto &plains = encoded(encrypted.parms_id());
+            auto pool = default_pool();
+            Ciphertext replicated = encrypted;
+            if (dim_ < slots_)
+            {
+                Ciphertext rotated(pool);
+                evaluator_.rotate_vector(encrypted, -static_cast<int>(dim_), galois_keys, rotated, pool);
+                evaluator_.add_inplace(replicated, rotated);
+            }
+
+            auto baby = baby_indices();
+            std::vector<int> baby_rotations(baby.begin(), baby.end());
+            auto rotated = rotate_many(context_, evaluator_, replicated, baby_rotations, galois_keys, false, pool);
+            std::vector<std::size_t> slot_of(baby_steps_, 0);
+            for (std::size_t b = 0; b < baby.size(); b++)
+                slot_of[baby[b]] = b;
+
+            auto giant = giant_indices();
+            auto partials = map_batch(giant.size(), pool, [&](std::size_t g, Ciphertext &destination){
+                Ciphertext product(pool);
+                bool first = true;
+                for (std::size_t d = 0; d < indices_.size(); d++)
+                {
+                    if (indices_[d] / baby_steps_ != giant[g])
+                        continue;
+                    auto &source = rotated[slot_of[indices_[d] % baby_steps_]];
+                    if (first)
+                        evaluator_.multiply_plain(source, plains[d], destination, pool);
+                    else
+                    {
+                        evaluator_.multiply_plain(source, plains[d], product, pool);
+                        evaluator_.add_inplace(destination, product);
+                    }
+                    first = false;
+                }
+                if (giant[g])
+                    evaluator_.rotate_vector_inplace(destination, static_cast<int>(giant[g] * baby_steps_), galois_keys, pool);
+            });
+            Ciphertext destination(pool);
+            evaluator_.add_many(partials, destination);
+            return destination;
+        }
+
+        std::size_t rows() const { return rows_; }
+        std::size_t columns() const { return columns_; }
+        std::size_t baby_steps() const { return baby_steps_; }
+        std::size_t diagonal_count() const { return indices_.size(); }
+        double scale() const { return scale_; }
+
+        // Encoded diagonals for parms_id, encoded on the batch pool the first time the level is used.
+        const std::vector<Plaintext> &encoded(const parms_id_type &parms_id) const
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            auto it = plains_.find(parms_id);
+            if (it != plains_.end())
+                return it->second;
+            if (!context_.get_context_data(parms_id))
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            std::vector<Plaintext> plains(diagonals_.size());
+            batch_pool().parallel_for(diagonals_.size(), [&](std::size_t d){
+                encoder_.encode(diagonals_[d], parms_id, scale_, plains[d]);
+            });
+            return plains_.emplace(parms_id, std::move(plains)).first->second;
+        }
+
+        // Install diagonals encoded elsewhere, e.g. loaded from a cache file, in diagonal_count() order.
+        void set_encoded(const parms_id_type &parms_id, std::vector<Plaintext> plains)
+        {
+            if (plains.size() != diagonals_.size())
+                throw std::invalid_argument("plains must hold one plaintext per nonzero diagonal");
+            for (auto &plain : plains)
+                if (plain.parms_id() != parms_id)
+                    throw std::invalid_argument("plains must be encoded at parms_id");
+            std::lock_guard<std::mutex> lock(mutex_);
+            plains_[parms_id] = std::move(plains);
+        }
+
+    private:
+
+        std::vector<std::size_t> baby_indices() const
+        {
+            std::vector<bool> used(baby_steps_, false);
+            for (std::size_t k : indices_)
+                used[k % baby_steps_] = true;
+            std::vector<std::size_t> result;
+            for (std::size_t i = 0; i < baby_steps_; i++)
+                if (used[i])
+                    result.push_back(i);
+            return result;
+        }
+
+        std::vector<std::size_t> giant_indices() const
+        {
+            std::vector<std::size_t> result;
+            for (std::size_t k : indices_)
+                if (result.empty() || result.back() != k / baby_steps_)
+                    result.push_back(k / baby_steps_);
+            return result;
+        }
+
+        SEALContext context_;
+        CKKSEncoder encoder_;
+        Evaluator evaluator_;
+        double scale_;
+        std::size_t rows_;
+        std::size_t columns_;
+        std::size_t slots_;
+        std::size_t dim_;
+        std::size_t baby_steps_;
+        std::vector<std::size_t> indices_;
+        std::vector<std::vector<double>> diagonals_;
+        mutable std::mutex mutex_;
+        mutable std::unordered_map<parms_id_type, std::vector<Plaintext>> plains_;
+    };
+
+    // Container files hold many SEAL-serialized ciphertexts and plaintexts behind one header and an
+    // offset index, all integers in host byte order like SEAL's own serialization:
+    //   header  : magic, reserved u64, key-level parms_id of the writing context
+    //   records : Ciphertext/Plaintext::save output, back to back
+    //   index   : one ContainerEntry per record
+    //   trailer : index offset u64, record count u64, magic
+    constexpr char container_magic[8] = { 'S', 'E', 'A', 'L', 'C', 'T', 'R', '1' };
+
+    enum class RecordKind : std::uint64_t
+    {
+        ciphertext = 0,
+        plaintext = 1
+    };
+
+    struct ContainerHeader
+    {
+        char magic[8];
+        std::uint64_t reserved;
+        parms_id_type parms_id;
+    };
+
+    struct ContainerEntry
+    {
+        std::uint64_t offset;
+        std::uint64_t size;
+        RecordKind kind;
+    };
+
+    struct ContainerTrailer
+    {
+        std::uint64_t index_offset;
+        std::uint64_t count;
+        char magic[8];
+    };
+
+    class ContainerWriter
+    {
+    public:
+        ContainerWriter(const std::string &path, std::shared_ptr<SEALContext> context)
+            : context_(std::move(context))
+        {
+            out_.exceptions(std::ios::badbit | std::ios::failbit);
+            out_.open(path, std::ios::binary | std::ios::trunc);
+            ContainerHeader header{};
+            std::copy_n(container_magic, sizeof(header.magic), header.magic);
+            header.parms_id = context_->key_parms_id();
+            write_raw(header);
+        }
+
+        ~ContainerWriter()
+        {
+            try
+            {
+                close();
+            }
+            catch (...)
+            {
+            }
+        }
+
+        ContainerWriter(const ContainerWriter &) = delete;
+        ContainerWriter &operator=(const ContainerWriter &) = delete;
+
+        std::size_t append(const Ciphertext &cipher, compr_mode_type compr_mode)
+        {
+            return append_record(cipher, RecordKind::ciphertext, compr_mode);
+        }
+
+        std::size_t append(const Plaintext &plain, compr_mode_type compr_mode)
+        {
+            return append_record(plain, RecordKind::plaintext, compr_mode);
+        }
+
+        void close()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (!out_.is_open())
+                return;
+            ContainerTrailer trailer{ static_cast<std::uint64_t>(out_.tellp()), index_.size(), {} };
+            std::copy_n(container_magic, sizeof(trailer.magic), trailer.magic);
+            out_.write(reinterpret_cast<const char *>(index_.data()), static_cast<std::streamsize>(index_.size() * sizeof(ContainerEntry)));
+            write_raw(trailer);
+            out_.close();
+        }
+
+        std::size_t size()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return index_.size();
+        }
+
+    private:
+        template <typename T>
+        std::size_t append_record(const T &obj, RecordKind kind, compr_mode_type compr_mode)
+        {
+            if (obj.parms_id() != parms_id_zero && !context_->get_context_data(obj.parms_id()))
+                throw std::invalid_argument("record parms_id does not belong to the container's SEALContext");
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (!out_.is_open())
+                throw std::invalid_argument("I/O operation on closed container");
+            ContainerEntry entry{ static_cast<std::uint64_t>(out_.tellp()), 0, kind };
+            entry.size = static_cast<std::uint64_t>(obj.save(out_, compr_mode));
+            index_.push_back(entry);
+            return index_.size() - 1;
+        }
+
+        template <typename T>
+        void write_raw(const T &value)
+        {
+            out_.write(reinterpret_cast<const char *>(&value), sizeof(T));
+        }
+
+        std::shared_ptr<SEALContext> context_;
+        std::ofstream out_;
+        std::vector<ContainerEntry> index_;
+        std::mutex mutex_;
+    };
+
+    // Memory-maps a container file and deserializes records on demand; only the touched pages are read.
+    class ContainerReader
+    {
+    public:
+        ContainerReader(const std::string &path, std::shared_ptr<SEALContext> context)
+        {
+            file_ = py::module_::import("builtins").attr("open")(path, "rb");
+            auto mmap = py::module_::import("mmap");
+            map_ = mmap.attr("mmap")(file_.attr("fileno")(), 0, py::arg("access")=mmap.attr("ACCESS_READ"));
+            view_ = std::make_unique<ByteView>(map_);
+
+            ContainerHeader header;
+            ContainerTrailer trailer;
+            auto size = view_->size();
+            if (size < sizeof(header) + sizeof(trailer))
+                throw std::runtime_error(path + " is not a SEAL container file");
+            std::copy_n(view_->data(), sizeof(header), reinterpret_cast<seal_byte *>(&header));
+            std::copy_n(view_->data() + size - sizeof(trailer), sizeof(trailer), reinterpret_cast<seal_byte *>(&trailer));
+            if (!std::equal(container_magic, container_magic + 8, header.magic) || !std::equal(container_magic, container_magic + 8, trailer.magic)
+                || trailer.index_offset < sizeof(header) || trailer.index_offset > size - sizeof(trailer)
+                || trailer.count != (size - sizeof(trailer) - trailer.index_offset) / sizeof(ContainerEntry))
+                throw std::runtime_error(path + " is not a SEAL container file or is truncated");
+            parms_id_ = header.parms_id;
+            index_offset_ = trailer.index_offset;
+            count_ = static_cast<std::size_t>(trailer.count);
+
+            if (!context)
+                context = context_registry().find(parms_id_);
+            else if (!context->get_context_data(parms_id_))
+                throw std::invalid_argument("container was written with different encryption parameters");
+            context_ = std::move(context);
+        }
+
+        ContainerReader(const ContainerReader &) = delete;
+        ContainerReader &operator=(const ContainerReader &) = delete;
+
+        std::size_t size() const
+        {
+            return count_;
+        }
+
+        const parms_id_type &parms_id() const
+        {
+            return parms_id_;
+        }
+
+        py::object get(py::ssize_t index)
+        {
+            check_open();
+            auto count = static_cast<py::ssize_t>(count_);
+            if (index < 0)
+                index += count;
+            if (index < 0 || index >= count)
+                throw py::index_error("container index out of range");
+            std::vector<std::size_t> indices = { static_cast<std::size_t>(index) };
+            return load(indices)[0];
+        }
+
+        py::list get(const py::slice &slice)
+        {
+            check_open();
+            std::size_t start, stop, step, length;
+            if (!slice.compute(count_, &start, &stop, &step, &length))
+                throw py::error_already_set();
+            std::vector<std::size_t> indices(length);
+            for (std::size_t i = 0; i < length; i++)
+                indices[i] = start + i * step;
+            return load(indices);
+        }
+
+        void close()
+        {
+            if (!view_)
+                return;
+            view_.reset();
+            map_.attr("close")();
+            file_.attr("close")();
+        }
+
+    private:
+        void check_open() const
+        {
+            if (!view_)
+                throw std::invalid_argument("I/O operation on closed container");
+        }
+
+        ContainerEntry entry(std::size_t i) const
+        {
+            ContainerEntry entry;
+            std::copy_n(view_->data() + index_offset_ + i * sizeof(ContainerEntry), sizeof(entry), reinterpret_cast<seal_byte *>(&entry));
+            if (entry.offset > index_offset_ || entry.size > index_offset_ - entry.offset)
+                throw std::runtime_error("container index entry points outside the record area");
+            return entry;
+        }
+
+        // Deserialize the given records on the batch pool without the GIL.
+        py::list load(const std::vector<std::size_t> &indices)
+        {
+            std::vector<ContainerEntry> entries(indices.size());
+            for (std::size_t i = 0; i < indices.size(); i++)
+                entries[i] = entry(indices[i]);
+            std::vector<Ciphertext> ciphers(indices.size());
+            std::vector<Plaintext> plains(indices.size());
+            {
+                py::gil_scoped_release release;
+                batch_pool().parallel_for(entries.size(), [&](std::size_t i){
+                    const seal_byte *record = view_->data() + entries[i].offset;
+                    auto size = static_cast<std::size_t>(entries[i].size);
+                    if (entries[i].kind == RecordKind::ciphertext)
+                        ciphers[i].load(*context_, record, size);
+                    else
+                        plains[i].load(*context_, record, size);
+                });
+            }
+            py::list records;
+            for (std::size_t i = 0; i < entries.size(); i++)
+            {
+                if (entries[i].kind == RecordKind::ciphertext)
+                    records.append(py::cast(std::move(ciphers[i])));
+                else
+                    records.append(py::cast(std::move(plains[i])));
+            }
+            return records;
+        }
+
+        std::shared_ptr<SEALContext> context_;
+        py::object file_;
+        py::object map_;
+        std::unique_ptr<ByteView> view_;
+        parms_id_type parms_id_;
+        std::uint64_t index_offset_ = 0;
+        std::size_t count_ = 0;
+    };
+    // Object streams reuse the container header with their own magic, followed by frames of a
+    // RecordKind and one SEAL-serialized object. SEAL's own header carries the object size.
+    constexpr char stream_magic[8] = { 'S', 'E', 'A', 'L', 'S', 'T', 'R', '1' };
+
+    // Fill buffer[start:] from a binary stream. Returns false on a clean EOF before the first byte.
+    bool read_exact(const py::object &stream, const py::object &buffer, std::size_t start)
+    {
+        auto view = py::reinterpret_steal<py::object>(PyMemoryView_FromObject(buffer.ptr()));
+        if (!view)
+            throw py::error_already_set();
+        auto size = py::len(view);
+        auto got = start;
+        while (got < size)
+        {
+            py::object read = stream.attr("readinto")(view[py::slice(static_cast<py::ssize_t>(got), static_cast<py::ssize_t>(size), 1)]);
+            if (read.is_none())
+                throw std::runtime_error("non-blocking streams are not supported");
+            auto count = read.cast<std::size_t>();
+            if (count == 0)
+            {
+                if (got == start)
+                    return false;
+                throw std::runtime_error("stream ended in the middle of a frame");
+            }
+            got += count;
+        }
+        return true;
+    }
+
+    py::object new_bytearray(std::size_t size)
+    {
+        auto buffer = py::reinterpret_steal<py::object>(PyByteArray_FromStringAndSize(nullptr, static_cast<py::ssize_t>(size)));
+        if (!buffer)
+            throw py::error_already_set();
+        return buffer;
+    }
+
+    class CiphertextWriter
+    {
+    public:
+        CiphertextWriter(py::object stream, std::shared_ptr<SEALContext> context)
+            : stream_(std::move(stream)), context_(std::move(context))
+        {
+            ContainerHeader header{};
+            std::copy_n(stream_magic, sizeof(header.magic), header.magic);
+            header.parms_id = context_->key_parms_id();
+            stream_.attr("write")(py::bytes(reinterpret_cast<const char *>(&header), sizeof(header)));
+        }
+
+        void write(const Ciphertext &cipher, compr_mode_type compr_mode)
+        {
+            write_frame(cipher, RecordKind::ciphertext, compr_mode);
+        }
+
+        void write(const Plaintext &plain, compr_mode_type compr_mode)
+        {
+            write_frame(plain, RecordKind::plaintext, compr_mode);
+        }
+
+        void flush()
+        {
+            stream_.attr("flush")();
+        }
+
+    private:
+        // Serialize the kind and the object into one bytearray so each frame is a single write() call.
+        template <typename T>
+        void write_frame(const T &obj, RecordKind kind, compr_mode_type compr_mode)
+        {
+            if (obj.parms_id() != parms_id_zero && !context_->get_context_data(obj.parms_id()))
+                throw std::invalid_argument("object parms_id does not belong to the writer's SEALContext");
+            auto size = static_cast<std::size_t>(obj.save_size(compr_mode));
+            auto frame = new_bytearray(sizeof(kind) + size);
+            auto *data = reinterpret_cast<seal_byte *>(PyByteArray_AS_STRING(frame.ptr()));
+            std::copy_n(reinterpret_cast<const seal_byte *>(&kind), sizeof(kind), data);
+            std::streamoff written;
+            {
+                py::gil_scoped_release release;
+                written = obj.save(data + sizeof(kind), size, compr_mode);
+            }
+            if (PyByteArray_Resize(frame.ptr(), static_cast<py::ssize_t>(sizeof(kind) + written)) != 0)
+                throw py::error_already_set();
+            stream_.attr("write")(frame);
+        }
+
+        py::object stream_;
+        std::shared_ptr<SEALContext> context_;
+    };
+
+    // Reads one frame at a time, so memory stays bounded by the largest object in the stream.
+    class CiphertextReader
+    {
+    public:
+        CiphertextReader(py::object stream, std::shared_ptr<SEALContext> context, std::size_t max_frame_bytes)
+            : stream_(std::move(stream))
+        {
+            ContainerHeader header;
+            auto buffer = new_bytearray(sizeof(header));
+            if (!read_exact(stream_, buffer, 0))
+                throw std::runtime_error("stream is empty");
+            std::copy_n(PyByteArray_AS_STRING(buffer.ptr()), sizeof(header), reinterpret_cast<char *>(&header));
+            if (!std::equal(stream_magic, stream_magic + 8, header.magic))
+                throw std::runtime_error("stream is not a SEAL object stream");
+            if (!context)
+                context = context_registry().find(header.parms_id);
+            else if (!context->get_context_data(header.parms_id))
+                throw std::invalid_argument("stream was written with different encryption parameters");
+            context_ = std::move(context);
+
+            // By default a frame may be as large as an uncompressed ciphertext of the maximum size at the key level,
+            // plus room for the serialized metadata.
+            if (!max_frame_bytes)
+            {
+                auto &parms = context_->key_context_data()->parms();
+                max_frame_bytes = util::mul_safe(parms.poly_modulus_degree(), parms.coeff_modulus().size(),
+                    std::size_t(SEAL_CIPHERTEXT_SIZE_MAX), sizeof(std::uint64_t)) + 4096;
+            }
+            max_frame_bytes_ = max_frame_bytes;
+        }
+
+        py::object next()
+        {
+            RecordKind kind;
+            Serialization::SEALHeader header;
+            auto prefix = new_bytearray(sizeof(kind) + sizeof(header));
+            if (!read_exact(stream_, prefix, 0))
+                throw py::stop_iteration();
+            const char *raw = PyByteArray_AS_STRING(prefix.ptr());
+            std::copy_n(raw, sizeof(kind), reinterpret_cast<char *>(&kind));
+            std::copy_n(raw + sizeof(kind), sizeof(header), reinterpret_cast<char *>(&header));
+            // IsValidHeader does not check size, which comes straight from the stream: a frame smaller than its
+            // own header would overflow the copy below, and an oversized one would allocate without bound.
+            if ((kind != RecordKind::ciphertext && kind != RecordKind::plaintext) || !Serialization::IsValidHeader(header)
+                || header.size < sizeof(header) || header.size > max_frame_bytes_)
+                throw std::runtime_error("stream frame is corrupted");
+
+            auto record = new_bytearray(static_cast<std::size_t>(header.size));
+            std::copy_n(reinterpret_cast<const char *>(&header), sizeof(header), PyByteArray_AS_STRING(record.ptr()));
+            if (!read_exact(stream_, record, sizeof(header)))
+                throw std::runtime_error("stream ended in the middle of a frame");
+
+            ByteView data(record);
+            if (kind == RecordKind::ciphertext)
+            {
+                Ciphertext cipher;
+                {
+                    py::gil_scoped_release release;
+                    cipher.load(*context_, data.data(), data.size());
+                }
+                return py::cast(std::move(cipher));
+            }
+            Plaintext plain;
+            {
+                py::gil_scoped_release release;
+                plain.load(*context_, data.data(), data.size());
+            }
+            return py::cast(std::move(plain));
+        }
+
+    private:
+        py::object stream_;
+        std::shared_ptr<SEALContext> context_;
+        std::size_t max_frame_bytes_;
+    };
+
+    // Encrypted d x d matrix product on CKKS ciphertexts holding each matrix row-major in its first d^2
+    // slots, zeros after. Following Jiang et al. (CCS 2018),
+    //   A B = sum_k phi^k(sigma(A)) * psi^k(tau(B)),
+    // with sigma(A)[i, j] = A[i, i + j], tau(B)[i, j] = B[i + j, j], and phi, psi shifting columns and
+    // rows by one. sigma and tau are LinearTransforms; each phi^k and psi^k is two masked rotations, and
+    // all shifts of one operand share one hoisted decomposition. Every plaintext is encoded at the value
+    // of the prime the following rescale drops, so each stage hands back its input scale and all d
+    // products meet at the same level and scale. multiply() consumes three levels.
+    class EncryptedMatMul
+    {
+    public:
+        EncryptedMatMul(std::shared_ptr<SEALContext> context, std::size_t dimension, const parms_id_type &parms_id,
+            const std::string &cache_path)
+            : context_(std::move(context)), encoder_(*context_), evaluator_(*context_), dimension_(dimension)
+        {
+            auto context_data = context_->get_context_data(parms_id);
+            if (!context_data)
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            if (context_data->parms().scheme() != scheme_type::ckks)
+                throw std::invalid_argument("EncryptedMatMul requires the CKKS scheme");
+            if (!dimension_ || dimension_ * dimension_ > encoder_.slot_count())
+                throw std::invalid_argument("dimension squared must be between 1 and slot_count()");
+            auto next_data = context_data->next_context_data();
+            if (!next_data || !next_data->next_context_data() || !next_data->next_context_data()->next_context_data())
+                throw std::invalid_argument("parms_id must have at least three levels below it");
+            parms_id_ = parms_id;
+            next_parms_id_ = next_data->parms_id();
+            double first_scale = static_cast<double>(context_data->parms().coeff_modulus().back().value());
+            double next_scale = static_cast<double>(next_data->parms().coeff_modulus().back().value());
+
+            std::size_t d = dimension_;
+            std::size_t size = d * d;
+            std::vector<MatrixEntry> sigma, tau;
+            for (std::size_t i = 0; i < d; i++)
+                for (std::size_t j = 0; j < d; j++)
+                {
+                    sigma.push_back({ i * d + j, i * d + (i + j) % d, 1.0 });
+                    tau.push_back({ i * d + j, ((i + j) % d) * d + j, 1.0 });
+                }
+            sigma_ = std::make_unique<LinearTransform>(*context_, size, size, sigma, first_scale, parms_id_, 0);
+            tau_ = std::make_unique<LinearTransform>(*context_, size, size, tau, first_scale, parms_id_, 0);
+
+            // phi^k takes slot i d + j from i d + j + k when j < d - k and from i d + j + k - d otherwise;
+            // psi^k takes it from (i + k) d + j when i < d - k and from (i + k - d) d + j otherwise.
+            std::vector<std::vector<double>> masks;
+            for (bool rows : { false, true })
+                for (std::size_t k = 1; k < d; k++)
+                {
+                    int step = static_cast<int>(rows ? k * d : k);
+                    int wrap = static_cast<int>(rows ? size : d);
+                    (rows ? row_steps_ : column_steps_).push_back(step);
+                    (rows ? row_steps_ : column_steps_).push_back(step - wrap);
+                    std::vector<double> direct(size, 0.0), wrapped(size, 0.0);
+                    for (std::size_t t = 0; t < size; t++)
+                        ((rows ? t / d : t % d) < d - k ? direct : wrapped)[t] = 1.0;
+                    masks.push_back(std::move(direct));
+                    masks.push_back(std::move(wrapped));
+                }
+
+            if (!cache_path.empty() && load_cache(cache_path, masks.size(), next_scale))
+                return;
+            masks_.resize(masks.size());
+            {
+                py::gil_scoped_release release;
+                sigma_->encoded(parms_id_);
+                tau_->encoded(parms_id_);
+                batch_pool().parallel_for(masks.size(), [&](std::size_t i){
+                    encoder_.encode(masks[i], next_parms_id_, next_scale, masks_[i]);
+                });
+            }
+            if (!cache_path.empty())
+                save_cache(cache_path, next_scale);
+        }
+
+        Ciphertext multiply(const Ciphertext &encrypted1, const Ciphertext &encrypted2,
+            const RelinKeys &relin_keys, const GaloisKeys &galois_keys) const
+        {
+            std::size_t d = dimension_;
+            Ciphertext a = sigma_->apply(aligned(encrypted1), galois_keys);
+            Ciphertext b = tau_->apply(aligned(encrypted2), galois_keys);
+            evaluator_.rescale_to_next_inplace(a);
+            evaluator_.rescale_to_next_inplace(b);
+
+            auto pool = default_pool();
+            auto column_shifts = rotate_many(*context_, evaluator_, a, column_steps_, galois_keys, false, pool);
+            auto row_shifts = rotate_many(*context_, evaluator_, b, row_steps_, galois_keys, false, pool);
+            std::vector<Ciphertext> shifted(2 * d);
+            batch_pool().parallel_for(2 * d, [&](std::size_t t){
+                bool rows = t >= d;
+                std::size_t k = t % d;
+                if (!k)
+                {
+                    evaluator_.mod_switch_to_next(rows ? b : a, shifted[t]);
+                    return;
+                }
+                auto &rotated = rows ? row_shifts : column_shifts;
+                std::size_t mask = 2 * ((rows ? d - 1 : 0) + k - 1);
+                Ciphertext wrapped;
+                evaluator_.multiply_plain(rotated[2 * (k - 1)], masks_[mask], shifted[t]);
+                evaluator_.multiply_plain(rotated[2 * (k - 1) + 1], masks_[mask + 1], wrapped);
+                evaluator_.add_inplace(shifted[t], wrapped);
+                evaluator_.rescale_to_next_inplace(shifted[t]);
+            });
+
+            auto products = map_batch(d, pool, [&](std::size_t k, Ciphertext &destination){
+                evaluator_.multiply(shifted[k], shifted[d + k], destination, pool);
+            });
+            Ciphertext destination;
+            evaluator_.add_many(products, destination);
+            evaluator_.relinearize_inplace(destination, relin_keys);
+            evaluator_.rescale_to_next_inplace(destination);
+            return destination;
+        }
+
+        std::vector<int> galois_steps() const
+        {
+            std::vector<int> steps = sigma_->galois_steps();
+            for (auto &more : { tau_->galois_steps(), column_steps_, row_steps_ })
+                steps.insert(steps.end(), more.begin(), more.end());
+            std::sort(steps.begin(), steps.end());
+            steps.erase(std::unique(steps.begin(), steps.end()), steps.end());
+            return steps;
+        }
+
+        std::size_t dimension() const
+        {
+            return dimension_;
+        }
+
+        const parms_id_type &parms_id() const
+        {
+            return parms_id_;
+        }
+
+    private:
+        // Bring an operand down to parms_id_; operands already below it cannot be used.
+        Ciphertext aligned(const Ciphertext &encrypted) const
+        {
+            auto context_data = context_->get_context_data(encrypted.parms_id());
+            if (!context_data)
+                throw std::invalid_argument("encrypted is not valid for encryption parameters");
+            if (context_data->chain_index() < context_->get_context_data(parms_id_)->chain_index())
+                throw std::invalid_argument("encrypted is at a lower level than the EncryptedMatMul parms_id");
+            Ciphertext result;
+            evaluator_.mod_switch_to(encrypted, parms_id_, result);
+            return result;
+        }
+
+        // The cache is a container file holding a header record, the sigma diagonals, the tau diagonals and the
+        // shift masks. The header identifies what the file was built for: the format version, the dimension, the
+        // record counts, a digest of the rotation layout, levels and scales, and a digest of the cached plaintexts.
+        // The cache is only used if the header matches this object and the plaintexts match their digest.
+        static constexpr std::uint64_t cache_version = 1;
+        static constexpr std::size_t cache_header_words = 13;
+
+        std::vector<std::uint64_t> cache_header(std::size_t mask_count, double mask_scale, const parms_id_type &content) const
+        {
+            std::vector<std::uint64_t> layout = { dimension_, sigma_->diagonal_count(), tau_->diagonal_count(), mask_count,
+                double_bits(sigma_->scale()), double_bits(mask_scale) };
+            for (auto *steps : { &column_steps_, &row_steps_ })
+            {
+                layout.push_back(steps->size());
+                for (int step : *steps)
+                    layout.push_back(static_cast<std::uint64_t>(static_cast<std::int64_t>(step)));
+            }
+            for (auto &steps : { sigma_->galois_steps(), tau_->galois_steps() })
+            {
+                layout.push_back(steps.size());
+                for (int step : steps)
+                    layout.push_back(static_cast<std::uint64_t>(static_cast<std::int64_t>(step)));
+            }
+            layout.insert(layout.end(), parms_id_.begin(), parms_id_.end());
+            layout.insert(layout.end(), next_parms_id_.begin(), next_parms_id_.end());
+            parms_id_type layout_digest;
+            util::HashFunction::hash(layout.data(), layout.size(), layout_digest);
+
+            std::vector<std::uint64_t> header = { cache_version, dimension_, sigma_->diagonal_count(), tau_->diagonal_count(), mask_count };
+            header.insert(header.end(), layout_digest.begin(), layout_digest.end());
+            header.insert(header.end(), content.begin(), content.end());
+            return header;
+        }
+
+        static std::uint64_t double_bits(double value)
+        {
+            std::uint64_t bits;
+            std::memcpy(&bits, &value, sizeof(bits));
+            return bits;
+        }
+
+        static parms_id_type content_digest(const std::vector<const Plaintext *> &plains)
+        {
+            std::vector<std::uint64_t> digests;
+            for (auto *plain : plains)
+            {
+                parms_id_type digest;
+                util::HashFunction::hash(plain->data(), plain->coeff_count(), digest);
+                digests.push_back(double_bits(plain->scale()));
+                digests.insert(digests.end(), plain->parms_id().begin(), plain->parms_id().end());
+                digests.insert(digests.end(), digest.begin(), digest.end());
+            }
+            parms_id_type digest;
+            util::HashFunction::hash(digests.data(), digests.size(), digest);
+            return digest;
+        }
+
+        // The header is stored as an NTT-form plaintext at parms_id_ with one byte per coefficient, which is
+        // below every prime and so passes SEAL's validity checks when the container is read back.
+        Plaintext header_plain(const std::vector<std::uint64_t> &words) const
+        {
+            auto &parms = context_->get_context_data(parms_id_)->parms();
+            Plaintext plain(parms.poly_modulus_degree() * parms.coeff_modulus().size());
+            for (std::size_t i = 0; i < words.size() * 8; i++)
+                plain[i] = (words[i / 8] >> (8 * (i % 8))) & 0xff;
+            plain.parms_id() = parms_id_;
+            plain.scale() = 1.0;
+            return plain;
+        }
+
+        static std::vector<std::uint64_t> header_words(const Plaintext &plain)
+        {
+            std::vector<std::uint64_t> words(cache_header_words, 0);
+            if (plain.coeff_count() < words.size() * 8)
+                return {};
+            for (std::size_t i = 0; i < words.size() * 8; i++)
+            {
+                if (plain[i] > 0xff)
+                    return {};
+                words[i / 8] |= plain[i] << (8 * (i % 8));
+            }
+            return words;
+        }
+
+        bool load_cache(const std::string &path, std::size_t mask_count, double mask_scale)
+        {
+            if (!std::ifstream(path, std::ios::binary))
+                return false;
+            std::size_t sigma_count = sigma_->diagonal_count();
+            std::size_t tau_count = tau_->diagonal_count();
+            Plaintext header;
+            std::vector<Plaintext> plains;
+            try
+            {
+                ContainerReader reader(path, context_);
+                if (reader.size() != 1 + sigma_count + tau_count + mask_count)
+                    return false;
+                auto records = reader.get(py::slice(0, static_cast<py::ssize_t>(reader.size()), 1));
+                reader.close();
+                header = records[0].cast<Plaintext>();
+                for (std::size_t i = 1; i < records.size(); i++)
+                    plains.push_back(records[i].cast<Plaintext>());
+            }
+            catch (const std::exception &)
+            {
+                return false;
+            }
+            double sigma_scale = sigma_->scale();
+            std::vector<const Plaintext *> pointers;
+            for (std::size_t i = 0; i < plains.size(); i++)
+            {
+                bool mask = i >= sigma_count + tau_count;
+                if (plains[i].parms_id() != (mask ? next_parms_id_ : parms_id_)
+                    || plains[i].scale() != (mask ? mask_scale : sigma_scale))
+                    return false;
+                pointers.push_back(&plains[i]);
+            }
+            if (header_words(header) != cache_header(mask_count, mask_scale, content_digest(pointers)))
+                return false;
+            auto begin = std::make_move_iterator(plains.begin());
+            sigma_->set_encoded(parms_id_, std::vector<Plaintext>(begin, begin + sigma_count));
+            tau_->set_encoded(parms_id_, std::vector<Plaintext>(begin + sigma_count, begin + sigma_count + tau_count));
+            masks_.assign(begin + sigma_count + tau_count, std::make_move_iterator(plains.end()));
+            return true;
+        }
+
+        void save_cache(const std::string &path, double mask_scale) const
+        {
+            py::gil_scoped_release release;
+            std::vector<const Plaintext *> plains;
+            for (auto *group : { &sigma_->encoded(parms_id_), &tau_->encoded(parms_id_), &masks_ })
+                for (auto &plain : *group)
+                    plains.push_back(&plain);
+            ContainerWriter writer(path, context_);
+            writer.append(header_plain(cache_header(masks_.size(), mask_scale, content_digest(plains))), Serialization::compr_mode_default);
+            for (auto *plain : plains)
+                writer.append(*plain, Serialization::compr_mode_default);
+            writer.close();
+        }
+
+        std::shared_ptr<SEALContext> context_;
+        CKKSEncoder encoder_;
+        Evaluator evaluator_;
+        std::size_t dimension_;
+        parms_id_type parms_id_;
+        parms_id_type next_parms_id_;
+        std::unique_ptr<LinearTransform> sigma_;
+        std::unique_ptr<LinearTransform> tau_;
+        std::vector<int> column_steps_;
+        std::vector<int> row_steps_;
+        std::vector<Plaintext> masks_;
+    };
+
+    // LRU cache of encoded plaintexts for values that are encoded again and again, such as model weights.
+    // Entries are keyed by a BLAKE2b digest of the values together with their element type, the scale and
+    // the target parms_id, and are evicted least recently used first once max_bytes is exceeded. CKKS
+    // values are encoded straight at the target level; BFV/BGV values given a parms_id are transformed to
+    // NTT form at that level, ready for multiply_plain with NTT-form ciphertexts.
+    class PlaintextCache
+    {
+    public:
+        PlaintextCache(const SEALContext &context, std::size_t max_bytes)
+            : context_(context), evaluator_(context), max_bytes_(max_bytes)
+        {
+            auto context_data = context.first_context_data();
+            if (!context_data)
+                throw std::invalid_argument("encryption parameters are not set correctly");
+            if (context_data->parms().scheme() == scheme_type::ckks)
+                ckks_encoder_ = std::make_unique<CKKSEncoder>(context);
+            else if (context_data->qualifiers().using_batching)
+                batch_encoder_ = std::make_unique<BatchEncoder>(context);
+            else
+                throw std::invalid_argument("encryption parameters do not support batching");
+        }
+
+        // CKKS values at parms_id, or at the first data level for parms_id_zero.
+        template <typename T>
+        Plaintext encode(const contiguous_array<T> &values, double scale, const parms_id_type &parms_id)
+        {
+            if (!ckks_encoder_)
+                throw std::logic_error("unsupported scheme");
+            auto level = parms_id == parms_id_zero ? context_.first_parms_id() : parms_id;
+            if (!context_.get_context_data(level))
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            auto pool = default_pool();
+            return lookup(values, scale, level, [&](const T *data, std::size_t count, Plaintext &destination){
+                ckks_encode(*ckks_encoder_, data, count, level, scale, destination, pool);
+            });
+        }
+
+        // BFV/BGV values in coefficient form for parms_id_zero, or in NTT form at parms_id otherwise.
+        template <typename T>
+        Plaintext encode(const contiguous_array<T> &values, const parms_id_type &parms_id)
+        {
+            if (!batch_encoder_)
+                throw std::logic_error("unsupported scheme");
+            if (parms_id != parms_id_zero && !context_.get_context_data(parms_id))
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            return lookup(values, 0.0, parms_id, [&](const T *data, std::size_t count, Plaintext &destination){
+                batch_encode(*batch_encoder_, data, count, destination);
+                if (parms_id != parms_id_zero)
+                    evaluator_.transform_to_ntt_inplace(destination, parms_id);
+            });
+        }
+
+        void clear()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            entries_.clear();
+            index_.clear();
+            bytes_ = 0;
+        }
+
+        std::size_t size()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return entries_.size();
+        }
+
+        std::size_t bytes()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return bytes_;
+        }
+
+        std::size_t max_bytes() const
+        {
+            return max_bytes_;
+        }
+
+        std::size_t hits() const
+        {
+            return hits_;
+        }
+
+        std::size_t misses() const
+        {
+            return misses_;
+        }
+
+        std::size_t evictions() const
+        {
+            return evictions_;
+        }
+
+    private:
+        struct Entry
+        {
+            parms_id_type key;
+            Plaintext plain;
+            std::size_t bytes;
+        };
+
+        // Return a copy of the cached plaintext for values, encoding and inserting it on a miss. Encoding
+        // runs outside the lock, so concurrent misses on the same key may both encode; the first insert wins.
+        template <typename T, typename Encode>
+        Plaintext lookup(const contiguous_array<T> &values, double scale, const parms_id_type &parms_id, Encode &&encode)
+        {
+            if (values.ndim() != 1)
+                throw std::invalid_argument("values must be one-dimensional");
+            const T *data = values.data();
+            auto count = static_cast<std::size_t>(values.shape(0));
+            auto key = digest(data, count, scale, parms_id);
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                auto it = index_.find(key);
+                if (it != index_.end())
+                {
+                    hits_++;
+                    entries_.splice(entries_.begin(), entries_, it->second);
+                    return it->second->plain;
+                }
+                misses_++;
+            }
+
+            Plaintext plain;
+            encode(data, count, plain);
+            std::size_t bytes = plain.coeff_count() * sizeof(std::uint64_t);
+            if (bytes > max_bytes_)
+                return plain;
+
+            std::lock_guard<std::mutex> lock(mutex_);
+            if (index_.count(key))
+                return plain;
+            entries_.push_front({ key, plain, bytes });
+            index_.emplace(key, entries_.begin());
+            bytes_ += bytes;
+            while (bytes_ > max_bytes_)
+            {
+                bytes_ -= entries_.back().bytes;
+                index_.erase(entries_.back().key);
+                entries_.pop_back();
+                evictions_++;
+            }
+            return plain;
+        }
+
+        template <typename T>
+        static parms_id_type digest(const T *data, std::size_t count, double scale, const parms_id_type &parms_id)
+        {
+            static_assert(sizeof(T) % sizeof(std::uint64_t) == 0, "values must be a whole number of 64-bit words");
+            parms_id_type values_digest;
+            util::HashFunction::hash(reinterpret_cast<const std::uint64_t *>(data), count * sizeof(T) / sizeof(std::uint64_t), values_digest);
+
+            std::uint64_t scale_bits;
+            std::memcpy(&scale_bits, &scale, sizeof(scale));
+            std::vector<std::uint64_t> header = { sizeof(T), std::is_floating_point<T>::value, std::is_signed<T>::value, count, scale_bits };
+            header.insert(header.end(), parms_id.begin(), parms_id.end());
+            header.insert(header.end(), values_digest.begin(), values_digest.end());
+            parms_id_type key;
+            util::HashFunction::hash(header.data(), header.size(), key);
+            return key;
+        }
+
+        SEALContext context_;
+        Evaluator evaluator_;
+        std::unique_ptr<CKKSEncoder> ckks_encoder_;
+        std::unique_ptr<BatchEncoder> batch_encoder_;
+        std::size_t max_bytes_;
+        std::list<Entry> entries_;
+        std::unordered_map<parms_id_type, std::list<Entry>::iterator> index_;
+        std::size_t bytes_ = 0;
+        std::atomic<std::size_t> hits_{ 0 };
+        std::atomic<std::size_t> misses_{ 0 };
+        std::atomic<std::size_t> evictions_{ 0 };
+        std::mutex mutex_;
+    };
+
+    // Lays fixed-width records side by side in the slots of batched plaintexts, so one ciphertext holds
+    // capacity() records instead of one. Record i goes to plaintext i / capacity() at slot offset(i % capacity()).
+    // BatchEncoder slots form two rows that rotate_rows cycles separately, so records never straddle them.
+    class SlotPacker
+    {
+    public:
+        SlotPacker(const SEALContext &context, std::size_t width)
+            : context_(context), evaluator_(context), width_(width)
+        {
+            auto context_data = context.first_context_data();
+            if (!context_data)
+                throw std::invalid_argument("encryption parameters are not set correctly");
+            if (context_data->parms().scheme() == scheme_type::ckks)
+            {
+                ckks_encoder_ = std::make_unique<CKKSEncoder>(context);
+                slots_ = row_size_ = ckks_encoder_->slot_count();
+            }
+            else if (context_data->qualifiers().using_batching)
+            {
+                batch_encoder_ = std::make_unique<BatchEncoder>(context);
+                slots_ = batch_encoder_->slot_count();
+                row_size_ = slots_ / 2;
+            }
+            else
+                throw std::invalid_argument("encryption parameters do not support batching");
+            if (width_ == 0 || width_ > row_size_)
+                throw std::invalid_argument("width must be between 1 and " + std::to_string(row_size_));
+            per_row_ = row_size_ / width_;
+            capacity_ = per_row_ * (slots_ / row_size_);
+        }
+
+        bool is_ckks() const
+        {
+            return static_cast<bool>(ckks_encoder_);
+        }
+
+        std::size_t width() const
+        {
+            return width_;
+        }
+
+        std::size_t capacity() const
+        {
+            return capacity_;
+        }
+
+        std::size_t slot_count() const
+        {
+            return slots_;
+        }
+
+        std::size_t plain_count(std::size_t records) const
+        {
+            return (records + capacity_ - 1) / capacity_;
+        }
+
+        std::size_t offset(std::size_t position) const
+        {
+            if (position >= capacity_)
+                throw std::out_of_range("position must be less than capacity()");
+            return position / per_row_ * row_size_ + position % per_row_ * width_;
+        }
+
+        // (plaintext index, slot offset) of a record.
+        std::pair<std::size_t, std::size_t> locate(std::size_t record) const
+        {
+            return { record / capacity_, offset(record % capacity_) };
+        }
+
+        // CKKS records at scale and parms_id, the first data level for parms_id_zero.
+        std::vector<Plaintext> pack(const double *records, std::size_t count, double scale, const parms_id_type &parms_id) const
+        {
+            if (!ckks_encoder_)
+                throw std::logic_error("unsupported scheme");
+            auto level = parms_id == parms_id_zero ? context_.first_parms_id() : parms_id;
+            if (!context_.get_context_data(level))
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            auto pool = default_pool();
+            return scatter(records, count, pool, [&](const double *slots, Plaintext &destination){
+                ckks_encode(*ckks_encoder_, slots, slots_, level, scale, destination, pool);
+            });
+        }
+
+        // BFV/BGV records in coefficient form for parms_id_zero, or in NTT form at parms_id otherwise.
+        template <typename T>
+        std::vector<Plaintext> pack(const T *records, std::size_t count, const parms_id_type &parms_id) const
+        {
+            if (!batch_encoder_)
+                throw std::logic_error("unsupported scheme");
+            if (parms_id != parms_id_zero && !context_.get_context_data(parms_id))
+                throw std::invalid_argument("parms_id is not valid for encryption parameters");
+            auto pool = default_pool();
+            return scatter(records, count, pool, [&](const T *slots, Plaintext &destination){
+                batch_encode(*batch_encoder_, slots, slots_, destination);
+                if (parms_id != parms_id_zero)
+                    evaluator_.transform_to_ntt_inplace(destination, parms_id, pool);
+            });
+        }
+
+        // Decode the first count records of plains into records, a (count, width) row-major buffer.
+        template <typename T>
+        void unpack(const std::vector<const Plaintext *> &plains, std::size_t count, T *records) const
+        {
+            if (std::is_same<T, double>::value ? !ckks_encoder_ : !batch_encoder_)
+                throw std::logic_error("unsupported scheme");
+            if (count > plains.size() * capacity_)
+                throw std::invalid_argument("count exceeds the records held by plains");
+            auto pool = default_pool();
+            batch_pool().parallel_for(plain_count(count), [&](std::size_t p){
+                std::vector<T> slots(slots_);
+                auto &plain = deref_item(plains[p], "plains");
+                if constexpr (std::is_same<T, double>::value)
+                    decode_into(*ckks_encoder_, plain, slots.data(), pool);
+                else
+                    decode_into(*batch_encoder_, plain, slots.data(), pool);
+                auto first = p * capacity_;
+                auto last = std::min(count, first + capacity_);
+                for (auto i = first; i < last; i++)
+                    std::copy_n(slots.data() + offset(i - first), width_, records + i * width_);
+            });
+        }
+
+        // Plaintext with ones in the slots of the records at positions and zeros elsewhere. CKKS masks are
+        // encoded at parms_id with the given scale, or, for scale 0, the last prime of that level, so that
+        // rescale_to_next after multiply_plain restores the ciphertext's scale. BFV/BGV masks are in
+        // coefficient form for parms_id_zero and in NTT form at parms_id otherwise.
+        Plaintext mask(const std::vector<std::size_t> &positions, const parms_id_type &parms_id, double scale) const
+        {
+            Plaintext destination;
+            if (ckks_encoder_)
+            {
+                auto level = parms_id == parms_id_zero ? context_.first_parms_id() : parms_id;
+                auto context_data = context_.get_context_data(level);
+                if (!context_data)
+                    throw std::invalid_argument("parms_id is not valid for encryption parameters");
+                if (scale == 0.0)
+                    scale = static_cast<double>(context_data->parms().coeff_modulus().back().value());
+                auto ones = indicator<double>(positions);
+                ckks_encode(*ckks_encoder_, ones.data(), slots_, level, scale, destination, default_pool());
+            }
+            else
+            {
+                if (parms_id != parms_id_zero && !context_.get_context_data(parms_id))
+                    throw std::invalid_argument("parms_id is not valid for encryption parameters");
+                auto ones = indicator<std::uint64_t>(positions);
+                batch_encode(*batch_encoder_, ones.data(), slots_, destination);
+                if (parms_id != parms_id_zero)
+                    evaluator_.transform_to_ntt_inplace(destination, parms_id);
+            }
+            return destination;
+        }
+
+        // Zero every slot of encrypted outside the record at position and, given Galois keys, rotate the record
+        // to slot 0. CKKS results carry the mask's scale and are ready for rescale_to_next.
+        Ciphertext extract(const Ciphertext &encrypted, std::size_t position, const GaloisKeys *galois_keys) const
+        {
+            auto slot = offset(position);
+            auto pool = default_pool();
+            Plaintext plain;
+            if (ckks_encoder_)
+                plain = mask({ position }, encrypted.parms_id(), 0.0);
+            else
+                plain = mask({ position }, encrypted.is_ntt_form() ? encrypted.parms_id() : parms_id_zero, 0.0);
+
+            Ciphertext destination(pool);
+            evaluator_.multiply_plain(encrypted, plain, destination, pool);
+            if (!galois_keys)
+                return destination;
+            if (ckks_encoder_)
+            {
+                if (slot)
+                    evaluator_.rotate_vector_inplace(destination, static_cast<int>(slot), *galois_keys, pool);
+                return destination;
+            }
+            if (slot >= row_size_)
+            {
+                evaluator_.rotate_columns_inplace(destination, *galois_keys, pool);
+                slot -= row_size_;
+            }
+            if (slot)
+                evaluator_.rotate_rows_inplace(destination, static_cast<int>(slot), *galois_keys, pool);
+            return destination;
+        }
+
+    private:
+        // Copy each plaintext's records into a zeroed slot vector and encode it, one plaintext per task on the batch pool.
+        template <typename T, typename Encode>
+        std::vector<Plaintext> scatter(const T *records, std::size_t count, const MemoryPoolHandle &pool, Encode &&encode) const
+        {
+            std::vector<Plaintext> plains;
+            plains.reserve(plain_count(count));
+            for (std::size_t p = 0; p < plain_count(count); p++)
+                plains.emplace_back(pool);
+            batch_pool().parallel_for(plains.size(), [&](std::size_t p){
+                std::vector<T> slots(slots_, T(0));
+                auto first = p * capacity_;
+                auto last = std::min(count, first + capacity_);
+                for (auto i = first; i < last; i++)
+                    std::copy_n(records + i * width_, width_, slots.data() + offset(i - first));
+                encode(slots.data(), plains[p]);
+            });
+            return plains;
+        }
+
+        template <typename T>
+        std::vector<T> indicator(const std::vector<std::size_t> &positions) const
+        {
+            std::vector<T> ones(slots_, T(0));
+            for (auto position : positions)
+                std::fill_n(ones.begin() + static_cast<std::ptrdiff_t>(offset(position)), width_, T(1));
+            return ones;
+        }
+
+        SEALContext context_;
+        Evaluator evaluator_;
+        std::unique_ptr<CKKSEncoder> ckks_encoder_;
+        std::unique_ptr<BatchEncoder> batch_encoder_;
+        std::size_t width_;
+        std::size_t slots_ = 0;
+        std::size_t row_size_ = 0;
+        std::size_t per_row_ = 0;
+        std::size_t capacity_ = 0;
+    };
+
+    // Lazy circuits record Evaluator operations into a DAG and only run them in evaluate(), after a few
+    // rewrites: identical operations are shared when they are recorded; every value is computed at the
+    // lowest level any of its uses needs, so inputs are mod-switched down before the work on them rather
+    // than right before they meet a deeper operand; products stay unrelinearized through additions,
+    // negations, plaintext products and rescales, and are relinearized once, at the lowest level they are
+    // used at, when they reach a multiplication, a rotation or an output; and chains of additions whose
+    // intermediate sums are not used elsewhere become one add_many. Operations that do not depend on each
+    // other run in parallel on the batch pool, one dependency wave at a time.
+    enum class CircuitOp
+    {
+        input,
+        add,
+        sub,
+        multiply,
+        negate,
+        rotate_vector,
+        rotate_rows,
+        rotate_columns,
+        rescale
+    };
+
+    class Circuit
+    {
+    public:
+        explicit Circuit(const SEALContext &context)
+            : context_(context), evaluator_(context)
+        {
+            if (!context.parameters_set())
+                throw std::invalid_argument("encryption parameters are not set correctly");
+            for (auto context_data = context.key_context_data(); context_data; context_data = context_data->next_context_data())
+                parms_ids_.push_back(context_data->parms_id());
+            std::reverse(parms_ids_.begin(), parms_ids_.end());
+        }
+
+        std::size_t input(const Ciphertext &encrypted)
+        {
+            auto context_data = context_.get_context_data(encrypted.parms_id());
+            if (!context_data)
+                throw std::invalid_argument("encrypted is not valid for encryption parameters");
+            nodes_.push_back({ CircuitOp::input, {}, 0, false, context_data->chain_index(), encrypted, Plaintext() });
+            return nodes_.size() - 1;
+        }
+
+        // Plaintexts in NTT form are switched to the level of the ciphertext they meet; others fit any level.
+        std::size_t input(const Plaintext &plain)
+        {
+            std::size_t level = std::numeric_limits<std::size_t>::max();
+            if (plain.is_ntt_form())
+            {
+                auto context_data = context_.get_context_data(plain.parms_id());
+                if (!context_data)
+                    throw std::invalid_argument("plain is not valid for encryption parameters");
+                level = context_data->chain_index();
+            }
+            nodes_.push_back({ CircuitOp::input, {}, 0, true, level, Ciphertext(), plain });
+            return nodes_.size() - 1;
+        }
+
+        std::size_t binary(CircuitOp op, std::size_t a, std::size_t b)
+        {
+            check(a);
+            check(b);
+            if (nodes_[a].plain && nodes_[b].plain)
+                throw std::invalid_argument("at least one operand must be a ciphertext");
+            if (op == CircuitOp::sub && nodes_[a].plain)
+                return unary(CircuitOp::negate, binary(CircuitOp::sub, b, a), 0);
+            if (op != CircuitOp::sub && (nodes_[a].plain || (!nodes_[b].plain && b < a)))
+                std::swap(a, b);
+            return record(op, { a, b }, 0, std::min(nodes_[a].level, nodes_[b].level));
+        }
+
+        std::size_t unary(CircuitOp op, std::size_t a, int step)
+        {
+            check(a);
+            if (nodes_[a].plain)
+                throw std::invalid_argument("operand must be a ciphertext");
+            std::size_t level = nodes_[a].level;
+            if (op == CircuitOp::rescale)
+            {
+                if (context_.first_context_data()->parms().scheme() != scheme_type::ckks)
+                    throw std::invalid_argument("rescale requires the CKKS scheme");
+                if (!level)
+                    throw std::invalid_argument("end of modulus switching chain reached");
+                level--;
+            }
+            return record(op, { a }, step, level);
+        }
+
+        bool is_plain(std::size_t id) const
+        {
+            check(id);
+            return nodes_[id].plain;
+        }
+
+        std::size_t size() const
+        {
+            return nodes_.size();
+        }
+
+        std::vector<Ciphertext> evaluate(const std::vector<std::size_t> &outputs, const RelinKeys *relin_keys,
+            const GaloisKeys *galois_keys) const
+        {
+            return Plan(*this, outputs, relin_keys != nullptr).run(relin_keys, galois_keys);
+        }
+
+        std::map<std::string, std::size_t> counts(const std::vector<std::size_t> &outputs, bool relinearize) const
+        {
+            return Plan(*this, outputs, relinearize).counts();
+        }
+
+    private:
+        struct Node
+        {
+            CircuitOp op;
+            std::vector<std::size_t> args;
+            int step;
+            bool plain;
+            std::size_t level;
+            Ciphertext cipher;
+            Plaintext plaintext;
+        };
+
+        void check(std::size_t id) const
+        {
+            if (id >= nodes_.size())
+                throw std::invalid_argument("node does not belong to this circuit");
+        }
+
+        std::size_t record(CircuitOp op, std::vector<std::size_t> args, int step, std::size_t level)
+        {
+            auto key = std::make_tuple(static_cast<int>(op), args, step);
+            auto it = shared_.find(key);
+            if (it != shared_.end())
+                return it->second;
+            nodes_.push_back({ op, std::move(args), step, false, level, Ciphertext(), Plaintext() });
+            shared_.emplace(std::move(key), nodes_.size() - 1);
+            return nodes_.size() - 1;
+        }
+
+        // One evaluation: a list of tasks, each writing one ciphertext or plaintext slot from input nodes
+        // and earlier slots. Tasks are built in dependency order, so every reference points backwards.
+        class Plan
+        {
+        public:
+            Plan(const Circuit &circuit, const std::vector<std::size_t> &outputs, bool relinearize)
+                : circuit_(circuit), nodes_(circuit.nodes_), relinearize_(relinearize)
+            {
+                std::size_t count = nodes_.size();
+                live_.assign(count, false);
+                output_.assign(count, false);
+                need_.assign(count, 0);
+                uses_.assign(count, 0);
+                user_.assign(count, 0);
+                size_.assign(count, 2);
+                values_.assign(count, Ref{});
+
+                std::vector<std::size_t> stack;
+                for (auto id : outputs)
+                {
+                    circuit.check(id);
+                    if (nodes_[id].plain)
+                        throw std::invalid_argument("outputs must be ciphertexts");
+                    output_[id] = true;
+                    need_[id] = nodes_[id].level;
+                    stack.push_back(id);
+                }
+                while (!stack.empty())
+                {
+                    auto id = stack.back();
+                    stack.pop_back();
+                    if (live_[id])
+                        continue;
+                    live_[id] = true;
+                    stack.insert(stack.end(), nodes_[id].args.begin(), nodes_[id].args.end());
+                }
+
+                // Users are recorded after their operands, so one backward sweep settles every level.
+                for (std::size_t id = count; id-- > 0;)
+                {
+                    if (!live_[id])
+                        continue;
+                    for (auto arg : nodes_[id].args)
+                    {
+                        uses_[arg]++;
+                        user_[arg] = id;
+                        if (!nodes_[arg].plain)
+                            need_[arg] = std::max(need_[arg], need_[id] + (nodes_[id].op == CircuitOp::rescale ? 1 : 0));
+                    }
+                }
+
+                for (std::size_t id = 0; id < count; id++)
+                {
+                    if (!live_[id] || nodes_[id].plain)
+                        continue;
+                    auto &node = nodes_[id];
+                    bool with_plain = node.args.size() == 2 && nodes_[node.args[1]].plain;
+                    switch (node.op)
+                    {
+                    case CircuitOp::input:
+                        size_[id] = node.cipher.size();
+                        break;
+                    case CircuitOp::add:
+                    case CircuitOp::sub:
+                        size_[id] = with_plain ? size_[node.args[0]] : std::max(size_[node.args[0]], size_[node.args[1]]);
+                        break;
+                    case CircuitOp::multiply:
+                        if (with_plain)
+                            size_[id] = size_[node.args[0]];
+                        else if (relinearize_)
+                            size_[id] = 3;
+                        else
+                            size_[id] = size_[node.args[0]] + size_[node.args[1]] - 1;
+                        break;
+                    case CircuitOp::rotate_vector:
+                    case CircuitOp::rotate_rows:
+                    case CircuitOp::rotate_columns:
+                        size_[id] = 2;
+                        break;
+                    default:
+                        size_[id] = size_[node.args[0]];
+                    }
+                }
+
+                for (std::size_t id = 0; id < count; id++)
+                    if (live_[id] && !nodes_[id].plain && !merged(id))
+                        values_[id] = build(id);
+                for (auto id : outputs)
+                    results_.push_back(cipher_operand(id, need_[id], relinearize_));
+            }
+
+            std::vector<Ciphertext> run(const RelinKeys *relin_keys, const GaloisKeys *galois_keys)
+            {
+                if (rotates_ && !galois_keys)
+                    throw std::invalid_argument("galois_keys are required for rotations");
+                relin_keys_ = relin_keys;
+                galois_keys_ = galois_keys;
+                ciphers_.resize(tasks_.size());
+                plains_.resize(tasks_.size());
+
+                // A task runs in the wave after its last input; its slot is freed after the wave of its last user.
+                std::vector<std::size_t> wave(tasks_.size(), 0), last_use(tasks_.size(), 0);
+                std::vector<std::vector<std::size_t>> waves;
+                for (std::size_t t = 0; t < tasks_.size(); t++)
+                {
+                    for (auto dep : tasks_[t].deps)
+                        wave[t] = std::max(wave[t], wave[dep] + 1);
+                    for (auto dep : tasks_[t].deps)
+                        last_use[dep] = std::max(last_use[dep], wave[t]);
+                    if (waves.size() <= wave[t])
+                        waves.resize(wave[t] + 1);
+                    waves[wave[t]].push_back(t);
+                }
+                std::vector<bool> kept(tasks_.size(), false);
+                for (auto &ref : results_)
+                    if (ref.task != npos)
+                        kept[ref.task] = true;
+                std::vector<std::vector<std::size_t>> released(waves.size());
+                for (std::size_t t = 0; t < tasks_.size(); t++)
+                    if (last_use[t] > wave[t] && !kept[t])
+                        released[last_use[t]].push_back(t);
+
+                for (std::size_t w = 0; w < waves.size(); w++)
+                {
+                    batch_pool().parallel_for(waves[w].size(), [&](std::size_t i){
+                        tasks_[waves[w][i]].run(waves[w][i]);
+                    });
+                    for (auto t : released[w])
+                    {
+                        ciphers_[t].release();
+                        plains_[t].release();
+                    }
+                }
+
+                std::vector<Ciphertext> results;
+                for (auto &ref : results_)
+                    results.push_back(cipher(ref));
+                return results;
+            }
+
+            std::map<std::string, std::size_t> counts() const
+            {
+                std::map<std::string, std::size_t> result;
+                for (auto &task : tasks_)
+                    result[task.kind]++;
+                return result;
+            }
+
+        private:
+            static constexpr std::size_t npos = std::numeric_limits<std::size_t>::max();
+
+            // A slot written by a task, or the ciphertext or plaintext of an input node when task is npos.
+            struct Ref
+            {
+                std::size_t task = npos;
+                std::size_t node = npos;
+            };
+
+            struct Task
+            {
+                const char *kind;
+                std::vector<std::size_t> deps;
+                std::function<void(std::size_t)> run;
+            };
+
+            const Ciphertext &cipher(const Ref &ref) const
+            {
+                return ref.task == npos ? nodes_[ref.node].cipher : ciphers_[ref.task];
+            }
+
+            const Plaintext &plain(const Ref &ref) const
+            {
+                return ref.task == npos ? nodes_[ref.node].plaintext : plains_[ref.task];
+            }
+
+            const parms_id_type &parms_id(std::size_t level) const
+            {
+                return circuit_.parms_ids_[level];
+            }
+
+            Ref task(const char *kind, const std::vector<Ref> &inputs, std::function<void(std::size_t)> run)
+            {
+                std::vector<std::size_t> deps;
+                for (auto &ref : inputs)
+                    if (ref.task != npos)
+                        deps.push_back(ref.task);
+                tasks_.push_back({ kind, std::move(deps), std::move(run) });
+                return { tasks_.size() - 1, npos };
+            }
+
+            // An addition folded into the addition that uses it.
+            bool merged(std::size_t id) const
+            {
+                auto is_sum = [this](std::size_t node){
+                    return nodes_[node].op == CircuitOp::add && !nodes_[nodes_[node].args[1]].plain;
+                };
+                return is_sum(id) && !output_[id] && uses_[id] == 1 && is_sum(user_[id]) && need_[user_[id]] == need_[id];
+            }
+
+            std::vector<std::size_t> terms(std::size_t id) const
+            {
+                std::vector<std::size_t> result, stack = { id };
+                while (!stack.empty())
+                {
+                    auto node = stack.back();
+                    stack.pop_back();
+                    if (node != id && !merged(node))
+                        result.push_back(node);
+                    else
+                        stack.insert(stack.end(), nodes_[node].args.rbegin(), nodes_[node].args.rend());
+                }
+                return result;
+            }
+
+            // Node id switched down to level and, if relinearize is set and it has grown, relinearized.
+            Ref cipher_operand(std::size_t id, std::size_t level, bool relinearize)
+            {
+                relinearize = relinearize && size_[id] > 2;
+                auto key = std::make_tuple(id, level, relinearize);
+                auto it = operands_.find(key);
+                if (it != operands_.end())
+                    return it->second;
+                Ref ref = values_[id];
+                if (level < need_[id])
+                    ref = task("mod_switch", { ref }, [this, ref, level](std::size_t self){
+                        circuit_.evaluator_.mod_switch_to(cipher(ref), parms_id(level), ciphers_[self]);
+                    });
+                if (relinearize)
+                    ref = task("relinearize", { ref }, [this, ref](std::size_t self){
+                        circuit_.evaluator_.relinearize(cipher(ref), *relin_keys_, ciphers_[self]);
+                    });
+                return operands_.emplace(key, ref).first->second;
+            }
+
+            Ref plain_operand(std::size_t id, std::size_t level)
+            {
+                auto &node = nodes_[id];
+                Ref ref{ npos, id };
+                if (!node.plaintext.is_ntt_form() || node.level == level)
+                    return ref;
+                auto key = std::make_tuple(id, level, false);
+                auto it = operands_.find(key);
+                if (it != operands_.end())
+                    return it->second;
+                ref = task("mod_switch", { ref }, [this, ref, level](std::size_t self){
+                    circuit_.evaluator_.mod_switch_to(plain(ref), parms_id(level), plains_[self]);
+                });
+                return operands_.emplace(key, ref).first->second;
+            }
+
+            Ref build(std::size_t id)
+            {
+                auto &node = nodes_[id];
+                auto &evaluator = circuit_.evaluator_;
+                std::size_t level = need_[id];
+                if (node.op == CircuitOp::input)
+                {
+                    if (level == node.level)
+                        return { npos, id };
+                    Ref ref{ npos, id };
+                    return task("mod_switch", {}, [this, ref, level](std::size_t self){
+                        circuit_.evaluator_.mod_switch_to(cipher(ref), parms_id(level), ciphers_[self]);
+                    });
+                }
+
+                int step = node.step;
+                bool rotation = node.op == CircuitOp::rotate_vector || node.op == CircuitOp::rotate_rows
+                    || node.op == CircuitOp::rotate_columns;
+                if (rotation)
+                {
+                    if (size_[node.args[0]] > 2 && !relinearize_)
+                        throw std::invalid_argument("relin_keys are required to rotate a product");
+                    rotates_ = true;
+                }
+                bool with_plain = node.args.size() == 2 && nodes_[node.args[1]].plain;
+                Ref a;
+                if (node.op == CircuitOp::rescale)
+                    a = cipher_operand(node.args[0], level + 1, false);
+                else if (node.op != CircuitOp::add || with_plain)
+                    a = cipher_operand(node.args[0], level, rotation || (node.op == CircuitOp::multiply && !with_plain && relinearize_));
+                Ref p;
+                if (with_plain)
+                    p = plain_operand(node.args[1], level);
+
+                switch (node.op)
+                {
+                case CircuitOp::add:
+                    if (with_plain)
+                        return task("add_plain", { a, p }, [this, a, p, &evaluator](std::size_t self){
+                            evaluator.add_plain(cipher(a), plain(p), ciphers_[self]);
+                        });
+                    else
+                    {
+                        std::vector<Ref> refs;
+                        for (auto term : terms(id))
+                            refs.push_back(cipher_operand(term, level, false));
+                        return task(refs.size() > 2 ? "add_many" : "add", refs, [this, refs, &evaluator](std::size_t self){
+                            evaluator.add(cipher(refs[0]), cipher(refs[1]), ciphers_[self]);
+                            for (std::size_t i = 2; i < refs.size(); i++)
+                                evaluator.add_inplace(ciphers_[self], cipher(refs[i]));
+                        });
+                    }
+                case CircuitOp::sub:
+                    if (with_plain)
+                        return task("sub_plain", { a, p }, [this, a, p, &evaluator](std::size_t self){
+                            evaluator.sub_plain(cipher(a), plain(p), ciphers_[self]);
+                        });
+                    else
+                    {
+                        Ref b = cipher_operand(node.args[1], level, false);
+                        return task("sub", { a, b }, [this, a, b, &evaluator](std::size_t self){
+                            evaluator.sub(cipher(a), cipher(b), ciphers_[self]);
+                        });
+                    }
+                case CircuitOp::multiply:
+                    if (with_plain)
+                        return task("multiply_plain", { a, p }, [this, a, p, &evaluator](std::size_t self){
+                            evaluator.multiply_plain(cipher(a), plain(p), ciphers_[self]);
+                        });
+                    else if (node.args[0] == node.args[1])
+                        return task("square", { a }, [this, a, &evaluator](std::size_t self){
+                            evaluator.square(cipher(a), ciphers_[self]);
+                        });
+                    else
+                    {
+                        Ref b = cipher_operand(node.args[1], level, relinearize_);
+                        return task("multiply", { a, b }, [this, a, b, &evaluator](std::size_t self){
+                            evaluator.multiply(cipher(a), cipher(b), ciphers_[self]);
+                        });
+                    }
+                case CircuitOp::negate:
+                    return task("negate", { a }, [this, a, &evaluator](std::size_t self){
+                        evaluator.negate(cipher(a), ciphers_[self]);
+                    });
+                case CircuitOp::rotate_vector:
+                    return task("rotate_vector", { a }, [this, a, step, &evaluator](std::size_t self){
+                        evaluator.rotate_vector(cipher(a), step, *galois_keys_, ciphers_[self]);
+                    });
+                case CircuitOp::rotate_rows:
+                    return task("rotate_rows", { a }, [this, a, step, &evaluator](std::size_t self){
+                        evaluator.rotate_rows(cipher(a), step, *galois_keys_, ciphers_[self]);
+                    });
+                case CircuitOp::rotate_columns:
+                    return task("rotate_columns", { a }, [this, a, &evaluator](std::size_t self){
+                        evaluator.rotate_columns(cipher(a), *galois_keys_, ciphers_[self]);
+                    });
+                default:
+                    return task("rescale", { a }, [this, a, &evaluator](std::size_t self){
+                        evaluator.rescale_to_next(cipher(a), ciphers_[self]);
+                    });
+                }
+            }
+
+            const Circuit &circuit_;
+            const std::vector<Node> &nodes_;
+            bool relinearize_;
+            bool rotates_ = false;
+            const RelinKeys *relin_keys_ = nullptr;
+            const GaloisKeys *galois_keys_ = nullptr;
+            std::vector<bool> live_;
+            std::vector<bool> output_;
+            std::vector<std::size_t> need_;
+            std::vector<std::size_t> uses_;
+            std::vector<std::size_t> user_;
+            std::vector<std::size_t> size_;
+            std::vector<Ref> values_;
+            std::map<std::tuple<std::size_t, std::size_t, bool>, Ref> operands_;
+            std::vector<Task> tasks_;
+            std::vector<Ref> results_;
+            std::vector<Ciphertext> ciphers_;
+            std::vector<Plaintext> plains_;
+        };
+
+        SEALContext context_;
+        Evaluator evaluator_;
+        std::vector<parms_id_type> parms_ids_;
+        std::vector<Node> nodes_;
+        std::map<std::tuple<int, std::vector<std::size_t>, int>, std::size_t> shared_;
+    };
+
+    // Python handle for a node; keeps its circuit alive.
+    struct CircuitNode
+    {
+        std::shared_ptr<Circuit> circuit;
+        std::size_t id;
+    };
+
+    // Opt-in managed evaluation on top of Evaluator. Operands are always brought down to their lowest
+    // common level before an operation, never the other way round. CKKS products are rescaled right away,
+    // and plaintext values are encoded at the ciphertext's level, at its scale for additions and at the
+    // value of the prime the rescale drops for products, so scales stay put. Where two CKKS scales still
+    // differ, the operand above the common level is multiplied by 1 encoded at the correcting scale and
+    // rescaled on its way down, which costs no level; only operands that both start at the common level
+    // lose one. Every Evaluator call is counted together with the RNS limbs of the ciphertext it ran on.
+    class ManagedEvaluator
+    {
+    public:
+        ManagedEvaluator(const SEALContext &context, double scale_tolerance)
+            : context_(context), evaluator_(context), scale_tolerance_(scale_tolerance)
+        {
+            auto context_data = context.first_context_data();
+            if (!context_data)
+                throw std::invalid_argument("encryption parameters are not set correctly");
+            if (scale_tolerance < 0.0)
+                throw std::invalid_argument("scale_tolerance cannot be negative");
+            ckks_ = context_data->parms().scheme() == scheme_type::ckks;
+            if (ckks_)
+                encoder_ = std::make_unique<CKKSEncoder>(context);
+            for (auto data = context.key_context_data(); data; data = data->next_context_data())
+                parms_ids_.push_back(data->parms_id());
+            std::reverse(parms_ids_.begin(), parms_ids_.end());
+        }
+
+        Ciphertext add_many(const std::vector<const Ciphertext *> &encrypteds)
+        {
+            if (encrypteds.empty())
+                throw std::invalid_argument("encrypteds cannot be empty");
+            std::vector<std::unique_ptr<Operand>> operands;
+            for (auto *encrypted : encrypteds)
+                operands.push_back(std::make_unique<Operand>(deref_item(encrypted, "encrypteds")));
+            align(operands);
+            Ciphertext destination = operands[0]->get();
+            for (std::size_t i = 1; i < operands.size(); i++)
+            {
+                record("add", destination);
+                evaluator_.add_inplace(destination, operands[i]->get());
+            }
+            return destination;
+        }
+
+        Ciphertext add(const Ciphertext &encrypted1, const Ciphertext &encrypted2)
+        {
+            return add_many({ &encrypted1, &encrypted2 });
+        }
+
+        Ciphertext sub(const Ciphertext &encrypted1, const Ciphertext &encrypted2)
+        {
+            std::vector<std::unique_ptr<Operand>> operands;
+            operands.push_back(std::make_unique<Operand>(encrypted1));
+            operands.push_back(std::make_unique<Operand>(encrypted2));
+            align(operands);
+            Ciphertext destination;
+            record("sub", operands[0]->get());
+            evaluator_.sub(operands[0]->get(), operands[1]->get(), destination);
+            return destination;
+        }
+
+        Ciphertext multiply(const Ciphertext &encrypted1, const Ciphertext &encrypted2, const RelinKeys *relin_keys)
+        {
+            Operand x(encrypted1), y(encrypted2);
+            std::size_t target = std::min(level(encrypted1), level(encrypted2));
+            bool square = &encrypted1 == &encrypted2;
+            lower(x, target);
+            if (!square)
+                lower(y, target);
+            Ciphertext destination;
+            record(square ? "square" : "multiply", x.get());
+            if (square)
+                evaluator_.square(x.get(), destination);
+            else
+                evaluator_.multiply(x.get(), y.get(), destination);
+            finish_product(destination, relin_keys);
+            return destination;
+        }
+
+        Ciphertext multiply_plain(const Ciphertext &encrypted, const Plaintext &plain)
+        {
+            Operand x(encrypted);
+            Plaintext lowered;
+            const Plaintext &p = align_plain(x, plain, lowered, false);
+            Ciphertext destination;
+            record("multiply_plain", x.get());
+            evaluator_.multiply_plain(x.get(), p, destination);
+            finish_product(destination, nullptr);
+            return destination;
+        }
+
+        Ciphertext multiply_plain(const Ciphertext &encrypted, const contiguous_array<double> &values)
+        {
+            auto context_data = context_.get_context_data(encrypted.parms_id());
+            Plaintext plain = encode(values, encrypted.parms_id(),
+                static_cast<double>(checked(context_data)->parms().coeff_modulus().back().value()));
+            return multiply_plain(encrypted, plain);
+        }
+
+        Ciphertext add_plain(const Ciphertext &encrypted, const Plaintext &plain)
+        {
+            Operand x(encrypted);
+            Plaintext lowered;
+            const Plaintext &p = align_plain(x, plain, lowered, true);
+            Ciphertext destination;
+            record("add_plain", x.get());
+            evaluator_.add_plain(x.get(), p, destination);
+            return destination;
+        }
+
+        Ciphertext add_plain(const Ciphertext &encrypted, const contiguous_array<double> &values)
+        {
+            return add_plain(encrypted, encode(values, encrypted.parms_id(), encrypted.scale()));
+        }
+
+        Ciphertext sub_plain(const Ciphertext &encrypted, const Plaintext &plain)
+        {
+            Operand x(encrypted);
+            Plaintext lowered;
+            const Plaintext &p = align_plain(x, plain, lowered, true);
+            Ciphertext destination;
+            record("sub_plain", x.get());
+            evaluator_.sub_plain(x.get(), p, destination);
+            return destination;
+        }
+
+        Ciphertext sub_plain(const Ciphertext &encrypted, const contiguous_array<double> &values)
+        {
+            return sub_plain(encrypted, encode(values, encrypted.parms_id(), encrypted.scale()));
+        }
+
+        Ciphertext negate(const Ciphertext &encrypted)
+        {
+            Ciphertext destination;
+            record("negate", encrypted);
+            evaluator_.negate(encrypted, destination);
+            return destination;
+        }
+
+        Ciphertext rotate_vector(const Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys)
+        {
+            Ciphertext destination;
+            record("rotate_vector", encrypted);
+            evaluator_.rotate_vector(encrypted, steps, galois_keys, destination);
+            return destination;
+        }
+
+        Ciphertext rotate_rows(const Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys)
+        {
+            Ciphertext destination;
+            record("rotate_rows", encrypted);
+            evaluator_.rotate_rows(encrypted, steps, galois_keys, destination);
+            return destination;
+        }
+
+        Ciphertext rotate_columns(const Ciphertext &encrypted, const GaloisKeys &galois_keys)
+        {
+            Ciphertext destination;
+            record("rotate_columns", encrypted);
+            evaluator_.rotate_columns(encrypted, galois_keys, destination);
+            return destination;
+        }
+
+        std::pair<Ciphertext, Ciphertext> align(const Ciphertext &encrypted1, const Ciphertext &encrypted2)
+        {
+            std::vector<std::unique_ptr<Operand>> operands;
+            operands.push_back(std::make_unique<Operand>(encrypted1));
+            operands.push_back(std::make_unique<Operand>(encrypted2));
+            align(operands);
+            return { operands[0]->get(), operands[1]->get() };
+        }
+
+        std::map<std::string, std::pair<std::size_t, std::size_t>> stats()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return stats_;
+        }
+
+        void reset_stats()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            stats_.clear();
+        }
+
+    private:
+        // The caller's ciphertext, or a copy of it once it has to change.
+        class Operand
+        {
+        public:
+            explicit Operand(const Ciphertext &encrypted) : ptr_(&encrypted)
+            {
+            }
+
+            Operand(const Operand &) = delete;
+            Operand &operator=(const Operand &) = delete;
+
+            const Ciphertext &get() const
+            {
+                return *ptr_;
+            }
+
+            Ciphertext &modify()
+            {
+                if (ptr_ != &owned_)
+                {
+                    owned_ = *ptr_;
+                    ptr_ = &owned_;
+                }
+                return owned_;
+            }
+
+        private:
+            const Ciphertext *ptr_;
+            Ciphertext owned_;
+        };
+
+        template <typename T>
+        const T &checked(const T &context_data) const
+        {
+            if (!context_data)
+                throw std::invalid_argument("encrypted is not valid for encryption parameters");
+            return context_data;
+        }
+
+        std::size_t level(const Ciphertext &encrypted) const
+        {
+            return checked(context_.get_context_data(encrypted.parms_id()))->chain_index();
+        }
+
+        void record(const char *name, std::size_t limbs)
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            auto &entry = stats_[name];
+            entry.first++;
+            entry.second += limbs;
+        }
+
+        void record(const char *name, const Ciphertext &encrypted)
+        {
+            record(name, encrypted.coeff_modulus_size());
+        }
+
+        void lower(Operand &operand, std::size_t target)
+        {
+            if (level(operand.get()) <= target)
+                return;
+            record("mod_switch", operand.get());
+            evaluator_.mod_switch_to_inplace(operand.modify(), parms_ids_[target]);
+        }
+
+        // Multiply by 1 at scale * prime / current scale and rescale, landing at target_level with scale.
+        // The constant is exact up to 1 / (that encoding scale), which is about the prime itself.
+        void rescale_to(Operand &operand, double scale, std::size_t target_level)
+        {
+            lower(operand, target_level + 1);
+            auto &encrypted = operand.modify();
+            auto prime = context_.get_context_data(encrypted.parms_id())->parms().coeff_modulus().back().value();
+            double factor = scale * static_cast<double>(prime) / encrypted.scale();
+            if (factor < 1.0)
+                throw std::invalid_argument("scale of encrypted is too large to align; rescale it first");
+            Plaintext one;
+            encoder_->encode(1.0, encrypted.parms_id(), factor, one);
+            record("multiply_plain", encrypted);
+            evaluator_.multiply_plain_inplace(encrypted, one);
+            record("rescale", encrypted);
+            evaluator_.rescale_to_next_inplace(encrypted);
+            encrypted.scale() = scale;
+        }
+
+        bool close_scales(double scale1, double scale2) const
+        {
+            return util::are_close(scale1, scale2) || std::abs(scale1 / scale2 - 1.0) <= scale_tolerance_;
+        }
+
+        // Bring every operand to one level and, for CKKS, one scale: that of the first operand at the lowest level.
+        void align(std::vector<std::unique_ptr<Operand>> &operands)
+        {
+            std::vector<std::size_t> levels;
+            for (auto &operand : operands)
+                levels.push_back(level(operand->get()));
+            auto fixed = static_cast<std::size_t>(std::min_element(levels.begin(), levels.end()) - levels.begin());
+            std::size_t target = levels[fixed];
+            if (ckks_)
+            {
+                double scale = operands[fixed]->get().scale();
+                bool costs_level = false;
+                for (std::size_t i = 0; i < operands.size(); i++)
+                    costs_level = costs_level || (levels[i] == target && !close_scales(operands[i]->get().scale(), scale));
+                if (costs_level && !target)
+                    throw std::invalid_argument("scales cannot be aligned at the last level");
+                target -= costs_level ? 1 : 0;
+                for (auto &operand : operands)
+                {
+                    if (close_scales(operand->get().scale(), scale))
+                    {
+                        if (operand->get().scale() != scale)
+                            operand->modify().scale() = scale;
+                    }
+                    else
+                        rescale_to(*operand, scale, target);
+                }
+            }
+            for (auto &operand : operands)
+                lower(*operand, target);
+        }
+
+        // Bring encrypted and plain to one level; NTT-form plaintexts above it are switched into lowered.
+        // With match_scale, scales within the tolerance are made equal and others are rejected.
+        const Plaintext &align_plain(Operand &operand, const Plaintext &plain, Plaintext &lowered, bool match_scale)
+        {
+            if (!plain.is_ntt_form())
+                return plain;
+            auto plain_data = context_.get_context_data(plain.parms_id());
+            if (!plain_data)
+                throw std::invalid_argument("plain is not valid for encryption parameters");
+            std::size_t target = std::min(level(operand.get()), plain_data->chain_index());
+            lower(operand, target);
+            const Plaintext *result = &plain;
+            if (plain_data->chain_index() > target)
+            {
+                record("mod_switch", plain_data->parms().coeff_modulus().size());
+                evaluator_.mod_switch_to(plain, parms_ids_[target], lowered);
+                result = &lowered;
+            }
+            if (match_scale && ckks_ && result->scale() != operand.get().scale())
+            {
+                if (!close_scales(operand.get().scale(), result->scale()))
+                    throw std::invalid_argument("scale mismatch; pass the values instead to encode them at the scale of encrypted");
+                operand.modify().scale() = result->scale();
+            }
+            return *result;
+        }
+
+        Plaintext encode(const contiguous_array<double> &values, const parms_id_type &parms_id, double scale)
+        {
+            if (!ckks_)
+                throw std::logic_error("unsupported scheme");
+            checked(context_.get_context_data(parms_id));
+            Plaintext plain;
+            if (values.ndim() == 0)
+                encoder_->encode(*values.data(), parms_id, scale, plain);
+            else if (values.ndim() == 1)
+                ckks_encode(*encoder_, values.data(), static_cast<std::size_t>(values.shape(0)), parms_id, scale, plain,
+                    default_pool());
+            else
+                throw std::invalid_argument("values must be a scalar or one-dimensional");
+            return plain;
+        }
+
+        void finish_product(Ciphertext &destination, const RelinKeys *relin_keys)
+        {
+            if (relin_keys)
+            {
+                record("relinearize", destination);
+                evaluator_.relinearize_inplace(destination, *relin_keys);
+            }
+            if (ckks_)
+            {
+                record("rescale", destination);
+                evaluator_.rescale_to_next_inplace(destination);
+            }
+        }
+
+        SEALContext context_;
+        Evaluator evaluator_;
+        std::unique_ptr<CKKSEncoder> encoder_;
+        double scale_tolerance_;
+        bool ckks_ = false;
+        std::vector<parms_id_type> parms_ids_;
+        std::map<std::string, std::pair<std::size_t, std::size_t>> stats_;
+        std::mutex mutex_;
+    };
+
+    // Upper bounds of the profile wall time histogram buckets, in seconds; a last
+    // implicit bucket catches everything slower.
+    constexpr std::array<double, 12> profile_bounds = {
+        1e-5, 5e-5, 1e-4, 5e-4, 1e-3, 5e-3, 1e-2, 5e-2, 1e-1, 5e-1, 1.0, 5.0};
+
+    // Per-method call statistics gathered while a profile is active. Keyed by
+    // (qualified method name, chain index of the operand, -1 when unknown).
+    class Profile
+    {
+    public:
+        struct Entry
+        {
+            std::size_t calls = 0;
+            std::uint64_t total_ns = 0;
+            std::uint64_t alloc_bytes = 0;
+            std::array<std::size_t, profile_bounds.size() + 1> buckets{};
+        };
+
+        Profile() = default;
+        Profile(const Profile &) = delete;
+        Profile &operator=(const Profile &) = delete;
+        ~Profile();
+
+        void start();
+        void stop();
+
+        bool active() const
+        {
+            return active_;
+        }
+
+        void record(const std::string &method, int level, std::uint64_t ns, std::uint64_t alloc_bytes)
+        {
+            auto &entry = entries_[{method, level}];
+            entry.calls++;
+            entry.total_ns += ns;
+            entry.alloc_bytes += alloc_bytes;
+            double seconds = static_cast<double>(ns) * 1e-9;
+            auto bucket = std::lower_bound(profile_bounds.begin(), profile_bounds.end(), seconds) - profile_bounds.begin();
+            entry.buckets[static_cast<std::size_t>(bucket)]++;
+        }
+
+        void reset()
+        {
+            entries_.clear();
+        }
+
+        py::dict to_dict() const
+        {
+            py::dict methods;
+            for (const auto &[key, entry] : entries_)
+            {
+                const auto &[method, level] = key;
+                py::str name(method);
+                if (!methods.contains(name))
+                {
+                    py::dict summary;
+                    summary["calls"] = 0;
+                    summary["total_ns"] = 0;
+                    summary["alloc_bytes"] = 0;
+                    summary["levels"] = py::dict();
+                    methods[name] = summary;
+                }
+                auto summary = methods[name].cast<py::dict>();
+                summary["calls"] = summary["calls"].cast<std::size_t>() + entry.calls;
+                summary["total_ns"] = summary["total_ns"].cast<std::uint64_t>() + entry.total_ns;
+                summary["alloc_bytes"] = summary["alloc_bytes"].cast<std::uint64_t>() + entry.alloc_bytes;
+
+                py::list histogram;
+                for (std::size_t i = 0; i < entry.buckets.size(); i++)
+                {
+                    double bound = i < profile_bounds.size() ? profile_bounds[i] : std::numeric_limits<double>::infinity();
+                    histogram.append(py::make_tuple(bound, entry.buckets[i]));
+                }
+                py::dict stats;
+                stats["calls"] = entry.calls;
+                stats["total_ns"] = entry.total_ns;
+                stats["alloc_bytes"] = entry.alloc_bytes;
+                stats["histogram"] = histogram;
+                auto levels = summary["levels"].cast<py::dict>();
+                levels[level < 0 ? py::object(py::none()) : py::object(py::int_(level))] = stats;
+            }
+            return methods;
+        }
+
+        std::string to_prometheus(const std::string &prefix) const
+        {
+            std::ostringstream out;
+            out.precision(9);
+            auto labels = [](const std::string &method, int level){
+                std::string text = "method=\"" + method + "\"";
+                if (level >= 0)
+                    text += ",level=\"" + std::to_string(level) + "\"";
+                return text;
+            };
+
+            out << "# HELP " << prefix << "_call_duration_seconds Wall time of profiled SEAL calls.\n"
+                << "# TYPE " << prefix << "_call_duration_seconds histogram\n";
+            for (const auto &[key, entry] : entries_)
+            {
+                auto label = labels(key.first, key.second);
+                std::size_t cumulative = 0;
+                for (std::size_t i = 0; i < entry.buckets.size(); i++)
+                {
+                    cumulative += entry.buckets[i];
+                    out << prefix << "_call_duration_seconds_bucket{" << label << ",le=\"";
+                    if (i < profile_bounds.size())
+                        out << profile_bounds[i];
+                    else
+                        out << "+Inf";
+                    out << "\"} " << cumulative << "\n";
+                }
+                out << prefix << "_call_duration_seconds_sum{" << label << "} "
+                    << static_cast<double>(entry.total_ns) * 1e-9 << "\n"
+                    << prefix << "_call_duration_seconds_count{" << label << "} " << entry.calls << "\n";
+            }
+
+            out << "# HELP " << prefix << "_alloc_bytes_total Bytes newly allocated from the memory pool of each profiled call.\n"
+                << "# TYPE " << prefix << "_alloc_bytes_total counter\n";
+            for (const auto &[key, entry] : entries_)
+                out << prefix << "_alloc_bytes_total{" << labels(key.first, key.second) << "} " << entry.alloc_bytes << "\n";
+            return out.str();
+        }
+
+    private:
+        bool active_ = false;
+        std::map<std::pair<std::string, int>, Entry> entries_;
+    };
+
+    // Swaps the instrumented methods for recording wrappers while any profile
+    // is active and puts the original bindings back when the last one stops,
+    // so unprofiled calls go straight to the bindings. All state is guarded by
+    // the GIL.
+    class ProfileHooks
+    {
+    public:
+        void attach(Profile *profile)
+        {
+            if (profiles_.empty())
+                install();
+            profiles_.push_back(profile);
+        }
+
+        void detach(Profile *profile)
+        {
+            profiles_.erase(std::remove(profiles_.begin(), profiles_.end(), profile), profiles_.end());
+            if (profiles_.empty())
+                uninstall();
+        }
+
+    private:
+        // Chain index of the ciphertext or plaintext (or first list element) in object, or -1.
+        static int chain_index_of(py::handle object)
+        {
+            if (py::isinstance<py::list>(object))
+            {
+                auto list = py::reinterpret_borrow<py::list>(object);
+                return list.empty() ? -1 : chain_index_of(py::object(list[0]));
+            }
+            parms_id_type parms_id = parms_id_zero;
+            if (py::isinstance<Ciphertext>(object))
+                parms_id = object.cast<const Ciphertext &>().parms_id();
+            else if (py::isinstance<Plaintext>(object))
+                parms_id = object.cast<const Plaintext &>().parms_id();
+            if (parms_id == parms_id_zero)
+                return -1;
+            try
+            {
+                auto data = context_registry().find(parms_id)->get_context_data(parms_id);
+                return data ? static_cast<int>(data->chain_index()) : -1;
+            }
+            catch (const std::runtime_error &)
+            {
+                return -1;
+            }
+        }
+
+        void instrument(py::handle cls, const std::vector<std::string> &only)
+        {
+            std::string prefix = py::str(cls.attr("__name__"));
+            for (auto item : py::dict(cls.attr("__dict__")))
+            {
+                std::string name = py::str(item.first);
+                if (!PyInstanceMethod_Check(item.second.ptr()))
+                    continue;
+                if (only.empty() ? name.front() == '_' : std::find(only.begin(), only.end(), name) == only.end())
+                    continue;
+
+                auto original = py::reinterpret_borrow<py::object>(item.second);
+                auto method = prefix + "." + name;
+                py::cpp_function wrapper([this, original, method](py::args args, py::kwargs kwargs) -> py::object {
+                    int level = -1;
+                    for (std::size_t i = 1; i < args.size() && level < 0; i++)
+                        level = chain_index_of(py::object(args[i]));
+                    auto pool = kwargs.contains("pool") && !kwargs["pool"].is_none()
+                        ? kwargs["pool"].cast<MemoryPoolHandle>() : default_pool();
+                    auto allocated = pool.alloc_byte_count();
+                    auto begin = std::chrono::steady_clock::now();
+                    py::object result = original(*args, **kwargs);
+                    auto ns = std::chrono::duration_cast<std::chrono::nanoseconds>(std::chrono::steady_clock::now() - begin).count();
+                    if (level < 0)
+                        level = chain_index_of(result);
+                    auto grown = pool.alloc_byte_count() - allocated;
+                    for (auto *profile : profiles_)
+                        profile->record(method, level, static_cast<std::uint64_t>(ns), grown);
+                    return result;
+                }, py::name(name.c_str()), py::is_method(cls));
+                originals_.emplace_back(py::reinterpret_borrow<py::object>(cls), name, original);
+                py::setattr(cls, name.c_str(), wrapper);
+            }
+        }
+
+        void install()
+        {
+            const std::vector<std::string> serialization = {
+                "save", "load", "load_bytes", "load_from", "save_into", "to_bytes", "to_string", "__reduce_ex__"};
+            instrument(py::type::of<Evaluator>(), {});
+            instrument(py::type::of<Encryptor>(), {});
+            instrument(py::type::of<Decryptor>(), {});
+            instrument(py::type::of<CKKSEncoder>(), {});
+            instrument(py::type::of<BatchEncoder>(), {});
+            instrument(py::type::of<Ciphertext>(), serialization);
+            instrument(py::type::of<Plaintext>(), serialization);
+            instrument(py::type::of<PublicKey>(), serialization);
+            instrument(py::type::of<SecretKey>(), serialization);
+            instrument(py::type::of<RelinKeys>(), serialization);
+            instrument(py::type::of<GaloisKeys>(), serialization);
+        }
+
+        void uninstall()
+        {
+            for (auto &[cls, name, original] : originals_)
+                py::setattr(cls, name.c_str(), original);
+            originals_.clear();
+        }
+
+        std::vector<Profile *> profiles_;
+        std::vector<std::tuple<py::object, std::string, py::object>> originals_;
+    };
+
+    ProfileHooks &profile_hooks()
+    {
+        static auto *hooks = new ProfileHooks();
+        return *hooks;
+    }
+
+    Profile::~Profile()
+    {
+        stop();
+    }
+
+    void Profile::start()
+    {
+        if (!active_)
+            profile_hooks().attach(this);
+        active_ = true;
+    }
+
+    void Profile::stop()
+    {
+        if (active_)
+            profile_hooks().detach(this);
+        active_ = false;
+    }
+
+    // Runs the native work of the Async* facades on dedicated threads and completes asyncio futures on
+    // the loop that submitted them. At most max_pending jobs are queued or running at once; later
+    // submissions wait in order and are dropped without reaching a worker if their future is cancelled.
+    class AsyncExecutor : public std::enable_shared_from_this<AsyncExecutor>
+    {
+    public:
+        AsyncExecutor(std::size_t workers, std::size_t max_pending, std::size_t max_waiting)
+        {
+            if (workers == 0)
+                workers = std::max<std::size_t>(std::thread::hardware_concurrency(), 1);
+            worker_count_ = workers;
+            max_pending_ = max_pending ? max_pending : 2 * workers;
+            max_waiting_ = max_waiting ? max_waiting : 4 * max_pending_;
+            start();
+            std::lock_guard<std::mutex> lock(registry_mutex());
+            registry().push_back(this);
+        }
+
+        AsyncExecutor(const AsyncExecutor &) = delete;
+        AsyncExecutor &operator=(const AsyncExecutor &) = delete;
+
+        // Called with the GIL held, on a worker thread if a finished job held the last reference; jobs that
+        // never started are cancelled, running ones are finished.
+        ~AsyncExecutor()
+        {
+            {
+                std::lock_guard<std::mutex> lock(registry_mutex());
+                auto &executors = registry();
+                executors.erase(std::find(executors.begin(), executors.end(), this));
+            }
+
+            std::deque<std::shared_ptr<Job>> waiting;
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                stopping_ = true;
+                waiting.swap(waiting_);
+            }
+            ready_.notify_all();
+            for (auto &job : waiting)
+                schedule(job, true);
+            waiting.clear();
+
+            py::gil_scoped_release release;
+            for (auto &worker : workers_)
+            {
+                if (worker.get_id() == std::this_thread::get_id())
+                    worker.detach();
+                else
+                    worker.join();
+            }
+        }
+
+        std::size_t workers() const
+        {
+            return worker_count_;
+        }
+
+        std::size_t max_pending() const
+        {
+            return max_pending_;
+        }
+
+        std::size_t max_waiting() const
+        {
+            return max_waiting_;
+        }
+
+        // Jobs queued for or running on a worker.
+        std::size_t running()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return in_flight_;
+        }
+
+        // Jobs waiting for one of the max_pending slots.
+        std::size_t waiting()
+        {
+            std::lock_guard<std::mutex> lock(mutex_);
+            return waiting_.size();
+        }
+
+        // Submit work from the running loop (called with the GIL held) and return an asyncio future of that loop
+        // that resolves to finish() (also called on the loop). work runs on a worker without the GIL; keepalive
+        // holds the Python objects it reads. Throws once max_waiting calls are already waiting for a slot.
+        py::object submit(std::vector<py::object> keepalive, std::function<void()> work, std::function<py::object()> finish)
+        {
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                if (stopping_)
+                    throw std::logic_error("AsyncExecutor is shutting down");
+                if (in_flight_ >= max_pending_ && waiting_.size() >= max_waiting_)
+                    throw std::runtime_error("AsyncExecutor queue is full");
+            }
+
+            auto job = std::make_shared<Job>();
+            job->loop = py::module_::import("asyncio").attr("get_running_loop")();
+            job->future = job->loop.attr("create_future")();
+            job->keepalive = std::move(keepalive);
+            job->work = std::move(work);
+            job->finish = std::move(finish);
+
+            std::weak_ptr<AsyncExecutor> self = shared_from_this();
+            std::weak_ptr<Job> weak_job = job;
+            job->future.attr("add_done_callback")(py::cpp_function([self, weak_job](py::object future){
+                if (!future.attr("cancelled")().cast<bool>())
+                    return;
+                auto executor = self.lock();
+                auto job = weak_job.lock();
+                if (executor && job)
+                    executor->cancel(job);
+            }));
 
-using namespace seal;
-namespace py = pybind11;
+            bool admitted = false;
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                if (stopping_)
+                    throw std::logic_error("AsyncExecutor is shutting down");
+                if (workers_.empty())
+                    start();
+                if (in_flight_ < max_pending_)
+                {
+                    queue_.push_back(job);
+                    in_flight_++;
+                    admitted = true;
+                }
+                else
+                    waiting_.push_back(job);
+            }
+            if (admitted)
+                ready_.notify_one();
+            return job->future;
+        }
 
-#define SEAL_DOC(text) text
+        // pthread_atfork handlers: no executor may be mid-update while the process forks.
+        static void before_fork()
+        {
+            registry_mutex().lock();
+            for (auto *executor : registry())
+                executor->mutex_.lock();
+        }
 
-PYBIND11_MAKE_OPAQUE(std::vector<double>);
-PYBIND11_MAKE_OPAQUE(std::vector<std::complex<double>>);
-PYBIND11_MAKE_OPAQUE(std::vector<std::uint64_t>);
-PYBIND11_MAKE_OPAQUE(std::vector<std::int64_t>);
+        static void after_fork(bool child)
+        {
+            for (auto *executor : registry())
+            {
+                if (child)
+                    executor->abandon_workers();
+                executor->mutex_.unlock();
+            }
+            registry_mutex().unlock();
+        }
+
+    private:
+        struct Job
+        {
+            std::function<void()> work;
+            std::function<py::object()> finish;
+            py::object loop;
+            py::object future;
+            std::vector<py::object> keepalive;
+            std::exception_ptr error;
+            std::atomic<bool> cancelled{ false };
+        };
+
+        // Executors alive in this process, so that fork handlers can reach them.
+        static std::mutex &registry_mutex()
+        {
+            static auto *mutex = new std::mutex();
+            return *mutex;
+        }
+
+        static std::vector<AsyncExecutor *> &registry()
+        {
+            static auto *executors = new std::vector<AsyncExecutor *>();
+            return *executors;
+        }
+
+        // Requires mutex_ unless called from the constructor.
+        void start()
+        {
+            for (std::size_t i = 0; i < worker_count_; i++)
+                workers_.emplace_back([this]{ worker_loop(); });
+        }
+
+        // In a forked child, with mutex_ held: the workers and the jobs handed to them stayed in the parent.
+        // Their objects can be neither joined nor safely destroyed here, so they are leaked, and submit()
+        // starts new workers on first use. Waiters of the parent's threads are still recorded in ready_.
+        void abandon_workers()
+        {
+            new std::vector<std::thread>(std::move(workers_));
+            new std::deque<std::shared_ptr<Job>>(std::move(queue_));
+            new std::deque<std::shared_ptr<Job>>(std::move(waiting_));
+            workers_.clear();
+            queue_.clear();
+            waiting_.clear();
+            in_flight_ = 0;
+            new (&ready_) std::condition_variable();
+        }
+
+        // Called on the loop with the GIL held once the future was cancelled.
+        void cancel(const std::shared_ptr<Job> &job)
+        {
+            job->cancelled = true;
+            std::shared_ptr<Job> dropped;
+            {
+                std::lock_guard<std::mutex> lock(mutex_);
+                auto it = std::find(waiting_.begin(), waiting_.end(), job);
+                if (it != waiting_.end())
+                {
+                    dropped = std::move(*it);
+                    waiting_.erase(it);
+                }
+            }
+        }
+
+        // The Python exception a native error translates to.
+        static py::object exception_object(const std::exception_ptr &error)
+        {
+            try
+            {
+                py::cpp_function([error]{ std::rethrow_exception(error); })();
+            }
+            catch (py::error_already_set &e)
+            {
+                return e.value();
+            }
+            return py::none();
+        }
+
+        // Called on the loop with the GIL held.
+        static void settle(const std::shared_ptr<Job> &job, bool cancel)
+        {
+            if (job->future.attr("done")().cast<bool>())
+                return;
+            if (cancel)
+            {
+                job->future.attr("cancel")();
+                return;
+            }
+            try
+            {
+                if (job->error)
+                    job->future.attr("set_exception")(exception_object(job->error));
+                else
+                    job->future.attr("set_result")(job->finish());
+            }
+            catch (py::error_already_set &e)
+            {
+                job->future.attr("set_exception")(e.value());
+            }
+        }
+
+        // Hand the job back to its loop; requires the GIL. A closed loop has nobody left to notify.
+        static void schedule(const std::shared_ptr<Job> &job, bool cancel)
+        {
+            try
+            {
+                job->loop.attr("call_soon_threadsafe")(py::cpp_function([job, cancel]{ settle(job, cancel); }));
+            }
+            catch (py::error_already_set &)
+            {
+            }
+        }
+
+        void worker_loop()
+        {
+            while (true)
+            {
+                std::shared_ptr<Job> job;
+                {
+                    std::unique_lock<std::mutex> lock(mutex_);
+                    ready_.wait(lock, [this]{ return stopping_ || !queue_.empty(); });
+                    if (queue_.empty())
+                        return;
+                    job = std::move(queue_.front());
+                    queue_.pop_front();
+                }
+
+                if (!job->cancelled)
+                {
+                    try
+                    {
+                        job->work();
+                    }
+                    catch (...)
+                    {
+                        job->error = std::current_exception();
+                    }
+                }
+
+                bool admitted = false;
+                {
+                    std::lock_guard<std::mutex> lock(mutex_);
+                    in_flight_--;
+                    if (!waiting_.empty() && !stopping_)
+                    {
+                        queue_.push_back(std::move(waiting_.front()));
+                        waiting_.pop_front();
+                        in_flight_++;
+                        admitted = true;
+                    }
+                }
+                if (admitted)
+                    ready_.notify_one();
+
+                // Python objects held by the job must be released with the GIL. Its keepalive may hold the last
+                // reference to this executor, which is then destroyed right here, on this thread: keep it alive past
+                // the reset and leave without touching any member if that happened. All references are dropped with
+                // the GIL held, so the count cannot change in between.
+                py::gil_scoped_acquire acquire;
+                if (!job->cancelled)
+                    schedule(job, false);
+                auto self = weak_from_this().lock();
+                job.reset();
+                if (self && self.use_count() == 1)
+                {
+                    self.reset();
+                    return;
+                }
+            }
+        }
+
+        std::size_t worker_count_ = 0;
+        std::size_t max_pending_ = 0;
+        std::size_t max_waiting_ = 0;
+        std::size_t in_flight_ = 0;
+        bool stopping_ = false;
+        std::vector<std::thread> workers_;
+        std::deque<std::shared_ptr<Job>> queue_;
+        std::deque<std::shared_ptr<Job>> waiting_;
+        std::mutex mutex_;
+        std::condition_variable ready_;
+    };
+
+#ifndef _WIN32
+    // Threads do not survive fork(), so the child drops the batch pool and restarts executor workers lazily.
+    void before_fork()
+    {
+        batch_pool_state().mutex.lock();
+        AsyncExecutor::before_fork();
+    }
+
+    void after_fork_in_parent()
+    {
+        AsyncExecutor::after_fork(false);
+        batch_pool_state().mutex.unlock();
+    }
+
+    void after_fork_in_child()
+    {
+        AsyncExecutor::after_fork(true);
+        auto &state = batch_pool_state();
+        // Leaked: its threads are gone, and its locks may have been held by them.
+        state.pool.store(nullptr);
+        state.mutex.unlock();
+    }
+#endif
+
+    // Shared by facades created without an executor; intentionally never destroyed, like batch_pool().
+    std::shared_ptr<AsyncExecutor> default_async_executor()
+    {
+        static auto *executor = new std::shared_ptr<AsyncExecutor>(std::make_shared<AsyncExecutor>(0, 0, 0));
+        return *executor;
+    }
+
+    // Base of the asyncio facades: runs fn(result) on the executor and resolves the returned future to
+    // the result, converted by convert on the event loop.
+    class AsyncFacade
+    {
+    public:
+        explicit AsyncFacade(std::shared_ptr<AsyncExecutor> executor)
+            : executor_(executor ? std::move(executor) : default_async_executor())
+        {
+        }
+
+        // Virtual so py::cast(this) resolves to the Python object of the derived facade.
+        virtual ~AsyncFacade() = default;
+
+        const std::shared_ptr<AsyncExecutor> &executor() const
+        {
+            return executor_;
+        }
+
+    protected:
+        template <typename Result, typename Fn, typename Convert>
+        py::object submit(std::vector<py::object> keepalive, Fn fn, Convert convert)
+        {
+            keepalive.push_back(py::cast(this, py::return_value_policy::reference));
+            auto result = std::make_shared<Result>();
+            return executor_->submit(std::move(keepalive),
+                [result, fn = std::move(fn)]{ fn(*result); },
+                [result, convert = std::move(convert)]{ return convert(std::move(*result)); });
+        }
+
+        template <typename Result, typename Fn>
+        py::object submit(std::vector<py::object> keepalive, Fn fn)
+        {
+            return submit<Result>(std::move(keepalive), std::move(fn), [](Result &&result){
+                return py::cast(std::move(result));
+            });
+        }
+
+        template <typename T>
+        static const T &as(const py::object &object)
+        {
+            return object.cast<const T &>();
+        }
+
+    private:
+        std::shared_ptr<AsyncExecutor> executor_;
+    };
+
+    class AsyncEvaluator : public AsyncFacade
+    {
+    public:
+        AsyncEvaluator(const SEALContext &context, std::shared_ptr<AsyncExecutor> executor)
+            : AsyncFacade(std::move(executor)), evaluator_(context)
+        {
+        }
+
+        py::object negate(py::object encrypted)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Ciphertext>({ encrypted }, [this, &input](Ciphertext &destination){
+                evaluator_.negate(input, destination);
+            });
+        }
+
+        py::object add(py::object encrypted1, py::object encrypted2)
+        {
+            const auto &a = as<Ciphertext>(encrypted1), &b = as<Ciphertext>(encrypted2);
+            return submit<Ciphertext>({ encrypted1, encrypted2 }, [this, &a, &b](Ciphertext &destination){
+                evaluator_.add(a, b, destination);
+            });
+        }
+
+        py::object sub(py::object encrypted1, py::object encrypted2)
+        {
+            const auto &a = as<Ciphertext>(encrypted1), &b = as<Ciphertext>(encrypted2);
+            return submit<Ciphertext>({ encrypted1, encrypted2 }, [this, &a, &b](Ciphertext &destination){
+                evaluator_.sub(a, b, destination);
+            });
+        }
+
+        py::object add_many(py::iterable encrypteds)
+        {
+            std::vector<py::object> items;
+            std::vector<const Ciphertext *> inputs;
+            for (auto item : encrypteds)
+            {
+                items.push_back(py::reinterpret_borrow<py::object>(item));
+                inputs.push_back(&as<Ciphertext>(items.back()));
+            }
+            return submit<Ciphertext>(std::move(items), [this, inputs = std::move(inputs)](Ciphertext &destination){
+                // Evaluator::add_many takes a vector of ciphertexts, so sum pairwise to avoid copying the inputs.
+                if (inputs.empty())
+                    throw std::invalid_argument("encrypteds cannot be empty");
+                destination = *inputs[0];
+                for (std::size_t i = 1; i < inputs.size(); i++)
+                    evaluator_.add_inplace(destination, *inputs[i]);
+            });
+        }
+
+        py::object multiply(py::object encrypted1, py::object encrypted2)
+        {
+            const auto &a = as<Ciphertext>(encrypted1), &b = as<Ciphertext>(encrypted2);
+            return submit<Ciphertext>({ encrypted1, encrypted2 }, [this, &a, &b](Ciphertext &destination){
+                evaluator_.multiply(a, b, destination);
+            });
+        }
+
+        py::object square(py::object encrypted)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Ciphertext>({ encrypted }, [this, &input](Ciphertext &destination){
+                evaluator_.square(input, destination);
+            });
+        }
+
+        py::object relinearize(py::object encrypted, py::object relin_keys)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &keys = as<RelinKeys>(relin_keys);
+            return submit<Ciphertext>({ encrypted, relin_keys }, [this, &input, &keys](Ciphertext &destination){
+                evaluator_.relinearize(input, keys, destination);
+            });
+        }
+
+        py::object exponentiate(py::object encrypted, std::uint64_t exponent, py::object relin_keys)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &keys = as<RelinKeys>(relin_keys);
+            return submit<Ciphertext>({ encrypted, relin_keys }, [this, &input, exponent, &keys](Ciphertext &destination){
+                evaluator_.exponentiate(input, exponent, keys, destination);
+            });
+        }
+
+        py::object add_plain(py::object encrypted, py::object plain)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &operand = as<Plaintext>(plain);
+            return submit<Ciphertext>({ encrypted, plain }, [this, &input, &operand](Ciphertext &destination){
+                evaluator_.add_plain(input, operand, destination);
+            });
+        }
+
+        py::object sub_plain(py::object encrypted, py::object plain)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &operand = as<Plaintext>(plain);
+            return submit<Ciphertext>({ encrypted, plain }, [this, &input, &operand](Ciphertext &destination){
+                evaluator_.sub_plain(input, operand, destination);
+            });
+        }
+
+        py::object multiply_plain(py::object encrypted, py::object plain)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &operand = as<Plaintext>(plain);
+            return submit<Ciphertext>({ encrypted, plain }, [this, &input, &operand](Ciphertext &destination){
+                evaluator_.multiply_plain(input, operand, destination);
+            });
+        }
+
+        py::object mod_switch_to_next(py::object encrypted)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Ciphertext>({ encrypted }, [this, &input](Ciphertext &destination){
+                evaluator_.mod_switch_to_next(input, destination);
+            });
+        }
+
+        py::object mod_switch_to(py::object encrypted, parms_id_type parms_id)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Ciphertext>({ encrypted }, [this, &input, parms_id](Ciphertext &destination){
+                evaluator_.mod_switch_to(input, parms_id, destination);
+            });
+        }
+
+        py::object rescale_to_next(py::object encrypted)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Ciphertext>({ encrypted }, [this, &input](Ciphertext &destination){
+                evaluator_.rescale_to_next(input, destination);
+            });
+        }
+
+        py::object rescale_to(py::object encrypted, parms_id_type parms_id)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Ciphertext>({ encrypted }, [this, &input, parms_id](Ciphertext &destination){
+                evaluator_.rescale_to(input, parms_id, destination);
+            });
+        }
+
+        py::object rotate_rows(py::object encrypted, int steps, py::object galois_keys)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &keys = as<GaloisKeys>(galois_keys);
+            return submit<Ciphertext>({ encrypted, galois_keys }, [this, &input, steps, &keys](Ciphertext &destination){
+                evaluator_.rotate_rows(input, steps, keys, destination);
+            });
+        }
+
+        py::object rotate_columns(py::object encrypted, py::object galois_keys)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &keys = as<GaloisKeys>(galois_keys);
+            return submit<Ciphertext>({ encrypted, galois_keys }, [this, &input, &keys](Ciphertext &destination){
+                evaluator_.rotate_columns(input, keys, destination);
+            });
+        }
+
+        py::object rotate_vector(py::object encrypted, int steps, py::object galois_keys)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &keys = as<GaloisKeys>(galois_keys);
+            return submit<Ciphertext>({ encrypted, galois_keys }, [this, &input, steps, &keys](Ciphertext &destination){
+                evaluator_.rotate_vector(input, steps, keys, destination);
+            });
+        }
+
+        py::object complex_conjugate(py::object encrypted, py::object galois_keys)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            const auto &keys = as<GaloisKeys>(galois_keys);
+            return submit<Ciphertext>({ encrypted, galois_keys }, [this, &input, &keys](Ciphertext &destination){
+                evaluator_.complex_conjugate(input, keys, destination);
+            });
+        }
+
+    private:
+        Evaluator evaluator_;
+    };
+
+    class AsyncEncryptor : public AsyncFacade
+    {
+    public:
+        AsyncEncryptor(const SEALContext &context, const PublicKey *public_key, const SecretKey *secret_key,
+            std::shared_ptr<AsyncExecutor> executor)
+            : AsyncFacade(std::move(executor)), encryptor_(make_encryptor(context, public_key, secret_key))
+        {
+        }
+
+        py::object encrypt(py::object plain)
+        {
+            const auto &input = as<Plaintext>(plain);
+            return submit<Ciphertext>({ plain }, [this, &input](Ciphertext &destination){
+                encryptor_.encrypt(input, destination);
+            });
+        }
+
+        py::object encrypt_symmetric(py::object plain)
+        {
+            const auto &input = as<Plaintext>(plain);
+            return submit<Ciphertext>({ plain }, [this, &input](Ciphertext &destination){
+                encryptor_.encrypt_symmetric(input, destination);
+            });
+        }
+
+        py::object encrypt_zero()
+        {
+            return submit<Ciphertext>({}, [this](Ciphertext &destination){
+                encryptor_.encrypt_zero(destination);
+            });
+        }
+
+    private:
+        static Encryptor make_encryptor(const SEALContext &context, const PublicKey *public_key, const SecretKey *secret_key)
+        {
+            if (public_key && secret_key)
+                return Encryptor(context, *public_key, *secret_key);
+            if (public_key)
+                return Encryptor(context, *public_key);
+            if (secret_key)
+                return Encryptor(context, *secret_key);
+            throw std::invalid_argument("AsyncEncryptor needs a public_key, a secret_key or both");
+        }
+
+        Encryptor encryptor_;
+    };
+
+    class AsyncDecryptor : public AsyncFacade
+    {
+    public:
+        AsyncDecryptor(const SEALContext &context, const SecretKey &secret_key, std::shared_ptr<AsyncExecutor> executor)
+            : AsyncFacade(std::move(executor)), decryptor_(context, secret_key)
+        {
+        }
+
+        py::object decrypt(py::object encrypted)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<Plaintext>({ encrypted }, [this, &input](Plaintext &destination){
+                decryptor_.decrypt(input, destination);
+            });
+        }
+
+        py::object invariant_noise_budget(py::object encrypted)
+        {
+            const auto &input = as<Ciphertext>(encrypted);
+            return submit<int>({ encrypted }, [this, &input](int &budget){
+                budget = decryptor_.invariant_noise_budget(input);
+            });
+        }
+
+    private:
+        Decryptor decryptor_;
+    };
+
+    // Decoded slots are returned as a fresh 1-D NumPy array.
+    template <typename T>
+    py::object slots_array(std::vector<T> &&values)
+    {
+        return py::array_t<T>(static_cast<py::ssize_t>(values.size()), values.data());
+    }
+
+    class AsyncCKKSEncoder : public AsyncFacade
+    {
+    public:
+        AsyncCKKSEncoder(const SEALContext &context, std::shared_ptr<AsyncExecutor> executor)
+            : AsyncFacade(std::move(executor)), encoder_(context)
+        {
+        }
+
+        // The values are copied on submission, so the array may be reused while the encode runs.
+        py::object encode(const contiguous_array<double> &values, double scale)
+        {
+            if (values.ndim() != 1)
+                throw std::runtime_error("E101: Number of dimensions must be one");
+            std::vector<double> copy(values.data(), values.data() + values.size());
+            return submit<Plaintext>({}, [this, copy = std::move(copy), scale](Plaintext &destination){
+                encoder_.encode(copy, scale, destination);
+            });
+        }
+
+        py::object decode(py::object plain)
+        {
+            const auto &input = as<Plaintext>(plain);
+            return submit<std::vector<double>>({ plain }, [this, &input](std::vector<double> &destination){
+                encoder_.decode(input, destination);
+            }, slots_array<double>);
+        }
+
+    private:
+        CKKSEncoder encoder_;
+    };
+
+    class AsyncBatchEncoder : public AsyncFacade
+    {
+    public:
+        AsyncBatchEncoder(const SEALContext &context, std::shared_ptr<AsyncExecutor> executor)
+            : AsyncFacade(std::move(executor)), encoder_(context)
+        {
+        }
+
+        // uint64 arrays are encoded as unsigned values, everything else as signed 64-bit integers.
+        py::object encode(py::array array)
+        {
+            if (py::isinstance<py::array_t<std::uint64_t>>(array))
+                return encode_copy(contiguous_array<std::uint64_t>(array));
+            return encode_copy(contiguous_array<std::int64_t>(array));
+        }
+
+        py::object decode(py::object plain)
+        {
+            const auto &input = as<Plaintext>(plain);
+            return submit<std::vector<std::int64_t>>({ plain }, [this, &input](std::vector<std::int64_t> &destination){
+                encoder_.decode(input, destination);
+            }, slots_array<std::int64_t>);
+        }
+
+        py::object decode_uint64(py::object plain)
+        {
+            const auto &input = as<Plaintext>(plain);
+            return submit<std::vector<std::uint64_t>>({ plain }, [this, &input](std::vector<std::uint64_t> &destination){
+                encoder_.decode(input, destination);
+            }, slots_array<std::uint64_t>);
+        }
+
+    private:
+        template <typename T>
+        py::object encode_copy(const contiguous_array<T> &values)
+        {
+            if (values.ndim() != 1)
+                throw std::runtime_error("E101: Number of dimensions must be one");
+            std::vector<T> copy(values.data(), values.data() + values.size());
+            return submit<Plaintext>({}, [this, copy = std::move(copy)](Plaintext &destination){
+                encoder_.encode(copy, destination);
+            });
+        }
+
+        BatchEncoder encoder_;
+    };
+}
 
 PYBIND11_MODULE(seal, m)
+
 {
     m.doc() = "Microsoft SEAL for Python, from https://github.com/Huelse/SEAL-Python";
     m.attr("__version__")  = "4.1.2.1";
 
+#ifndef _WIN32
+    pthread_atfork(before_fork, after_fork_in_parent, after_fork_in_child);
+#endif
+
+    m.def("set_thread_count", &resize_batch_pool, py::arg("thread_count"), release_gil(),
+        SEAL_DOC("Resize the native thread pool used by batched operations. Zero selects one thread per hardware core."));
+    m.def("thread_count", [](){
+        return batch_pool().thread_count();
+    }, SEAL_DOC("Return the number of threads used by batched operations."));
+
     py::bind_vector<std::vector<double>>(
         m, "VectorDouble", py::buffer_protocol(),
         SEAL_DOC("Vector container for double values used by SEAL encoders."));
@@ -75,6 +4558,25 @@ PYBIND11_MODULE(seal, m)
             return MemoryManager::GetPool();
         }, SEAL_DOC("Return the default memory pool handle."));
 
+    py::class_<MemoryPoolScope>(m, "MemoryPoolScope",
+        SEAL_DOC("Context manager returned by memory_pool() that makes a pool the default for the current thread."))
+        .def("pool", &MemoryPoolScope::pool, SEAL_DOC("Return the pool this scope installs."))
+        .def("__enter__", [](MemoryPoolScope &scope){
+            scope.enter();
+            return scope.pool();
+        })
+        .def("__exit__", [](MemoryPoolScope &scope, py::args){
+            scope.exit();
+        });
+
+    m.def("memory_pool", [](MemoryPoolHandle pool){
+        return MemoryPoolScope(std::move(pool));
+    }, py::arg("pool"),
+        SEAL_DOC("Return a context manager that makes pool the default for Evaluator, Encryptor and encoder calls made on this "
+            "thread inside the block, unless a call passes its own pool=. Scopes nest and must be exited on the thread that entered them."));
+    m.def("current_pool", &default_pool,
+        SEAL_DOC("Return the pool calls on this thread allocate from: the innermost memory_pool scope, or the global pool."));
+
     // encryptionparams.h
     py::class_<EncryptionParameters>(
         m, "EncryptionParameters",
@@ -116,33 +4618,31 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("path"),
             SEAL_DOC("Load serialized encryption parameters from a file."))
         .def("load_bytes", [](EncryptionParameters &parms, py::bytes data){
-            std::string raw = data;
-            parms.load(reinterpret_cast<const seal_byte *>(raw.data()), raw.size());
+            load_from(parms, data);
         }, py::arg("data"),
             SEAL_DOC("Load serialized encryption parameters from a bytes object."))
+        .def("load_from", [](EncryptionParameters &parms, const py::handle &buffer){
+            return load_from(parms, buffer);
+        }, py::arg("buffer"),
+            SEAL_DOC("Load serialized encryption parameters from any C-contiguous buffer-protocol object without copying it. "
+                "Return the number of bytes read."))
         .def("save_size", py::overload_cast<compr_mode_type>(&EncryptionParameters::save_size, py::const_),
             py::arg("compr_mode")=Serialization::compr_mode_default,
             SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
-        .def("to_bytes", [](const EncryptionParameters &parms, compr_mode_type compr_mode){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            parms.save(out, compr_mode);
-            return py::bytes(out.str());
-        }, py::arg("compr_mode")=Serialization::compr_mode_default,
+        .def("to_bytes", &save_bytes<EncryptionParameters>, py::arg("compr_mode")=Serialization::compr_mode_default,
             SEAL_DOC("Serialize the encryption parameters to a Python bytes object."))
+        .def("save_into", &save_into<EncryptionParameters>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the encryption parameters into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
         .def(py::pickle(
             [](const EncryptionParameters &parms){
-                std::stringstream out(std::ios::binary | std::ios::out);
-                parms.save(out);
-                return py::make_tuple(py::bytes(out.str()));
+                return py::make_tuple(save_bytes(parms));
             },
             [](py::tuple t){
                 if (t.size() != 1)
                     throw std::runtime_error("(Pickle) Invalid input tuple!");
-                std::string str = t[0].cast<std::string>();
-                std::stringstream in(std::ios::binary | std::ios::in);
-                in.str(str);
                 EncryptionParameters parms;
-                parms.load(in);
+                load_from(parms, t[0]);
                 return parms;
             }
         ));
@@ -216,9 +4716,18 @@ PYBIND11_MODULE(seal, m)
     py::class_<SEALContext, std::shared_ptr<SEALContext>>(
         m, "SEALContext",
         SEAL_DOC("Validates encryption parameters and stores heavy-weight pre-computations used by SEAL operations."))
-        .def(py::init<const EncryptionParameters &, bool, sec_level_type>(),
-            py::arg("parms"), py::arg("expand_mod_chain")=true, py::arg("sec_level")=sec_level_type::tc128,
+        .def(py::init(&make_context),
+            py::arg("parms"), py::arg("expand_mod_chain")=true, py::arg("sec_level")=sec_level_type::tc128, release_gil(),
             SEAL_DOC("Create a SEALContext from encryption parameters and optionally expand the modulus switching chain."))
+        .def_static("shared", [](const EncryptionParameters &parms, bool expand_mod_chain, sec_level_type sec_level){
+                return context_cache().get(parms, expand_mod_chain, sec_level);
+            },
+            py::arg("parms"), py::arg("expand_mod_chain")=true, py::arg("sec_level")=sec_level_type::tc128, release_gil(),
+            SEAL_DOC("Return the process-wide SEALContext for these parameters, creating it on first use."))
+        .def_static("shared_count", []{ return context_cache().size(); },
+            SEAL_DOC("Return the number of contexts held by SEALContext.shared."))
+        .def_static("clear_shared", []{ context_cache().clear(); }, release_gil(),
+            SEAL_DOC("Drop the cache behind SEALContext.shared; contexts still referenced elsewhere stay alive."))
         .def("get_context_data", &SEALContext::get_context_data, py::arg("parms_id"),
             SEAL_DOC("Return the ContextData for a specific parms_id."))
         .def("key_context_data", &SEALContext::key_context_data, SEAL_DOC("Return the key-level ContextData."))
@@ -230,54 +4739,36 @@ PYBIND11_MODULE(seal, m)
         .def("first_parms_id", &SEALContext::first_parms_id, SEAL_DOC("Return the parms_id for the first data-level parameters."))
         .def("last_parms_id", &SEALContext::last_parms_id, SEAL_DOC("Return the parms_id for the last valid parameters in the chain."))
         .def("using_keyswitching", &SEALContext::using_keyswitching, SEAL_DOC("Return True if the parameter chain supports key switching."))
-        .def("from_cipher_str", [](const SEALContext &context, const std::string &str){
-            Ciphertext cipher;
-            std::stringstream in(std::ios::binary | std::ios::in);
-            in.str(str);
-            cipher.load(context, in);
-            return cipher;
-        }, py::arg("data"),
+        .def("from_cipher_str", &load_string<Ciphertext>, py::arg("data"),
             SEAL_DOC("Deserialize a Ciphertext from a serialized bytes-like string."))
-        .def("from_plain_str", [](const SEALContext &context, const std::string &str){
-            Plaintext plain;
-            std::stringstream in(std::ios::binary | std::ios::in);
-            in.str(str);
-            plain.load(context, in);
-            return plain;
-        }, py::arg("data"),
+        .def("from_plain_str", &load_string<Plaintext>, py::arg("data"),
             SEAL_DOC("Deserialize a Plaintext from a serialized bytes-like string."))
-        .def("from_secret_str", [](const SEALContext &context, const std::string &str){
-            SecretKey secret;
-            std::stringstream in(std::ios::binary | std::ios::in);
-            in.str(str);
-            secret.load(context, in);
-            return secret;
-        }, py::arg("data"),
+        .def("from_secret_str", &load_string<SecretKey>, py::arg("data"),
             SEAL_DOC("Deserialize a SecretKey from a serialized bytes-like string."))
-        .def("from_public_str", [](const SEALContext &context, const std::string &str){
-            PublicKey public_;
-            std::stringstream in(std::ios::binary | std::ios::in);
-            in.str(str);
-            public_.load(context, in);
-            return public_;
-        }, py::arg("data"),
+        .def("from_public_str", &load_string<PublicKey>, py::arg("data"),
             SEAL_DOC("Deserialize a PublicKey from a serialized bytes-like string."))
-        .def("from_relin_str", [](const SEALContext &context, const std::string &str){
-            RelinKeys relin;
-            std::stringstream in(std::ios::binary | std::ios::in);
-            in.str(str);
-            relin.load(context, in);
-            return relin;
-        }, py::arg("data"),
+        .def("from_relin_str", &load_string<RelinKeys>, py::arg("data"),
             SEAL_DOC("Deserialize RelinKeys from a serialized bytes-like string."))
-        .def("from_galois_str", [](const SEALContext &context, const std::string &str){
-            GaloisKeys galois;
-            std::stringstream in(std::ios::binary | std::ios::in);
-            in.str(str);
-            galois.load(context, in);
-            return galois;
-        }, py::arg("data"),
-            SEAL_DOC("Deserialize GaloisKeys from a serialized bytes-like string."));
+        .def("from_galois_str", &load_string<GaloisKeys>, py::arg("data"),
+            SEAL_DOC("Deserialize GaloisKeys from a serialized bytes-like string."))
+        .def(py::pickle(
+            [](const SEALContext &context){
+                auto key_data = context.key_context_data();
+                auto first_data = context.first_context_data();
+                bool expand_mod_chain = first_data && first_data->next_context_data();
+                return py::make_tuple(save_bytes(key_data->parms()), expand_mod_chain, key_data->qualifiers().sec_level);
+            },
+            [](py::tuple t){
+                if (t.size() != 3)
+                    throw std::runtime_error("(Pickle) Invalid input tuple!");
+                EncryptionParameters parms;
+                load_from(parms, t[0]);
+                bool expand_mod_chain = t[1].cast<bool>();
+                auto sec_level = t[2].cast<sec_level_type>();
+                py::gil_scoped_release release;
+                return context_cache().get(parms, expand_mod_chain, sec_level);
+            }
+        ));
 
     // modulus.h
     py::class_<Modulus>(m, "Modulus", SEAL_DOC("Represents an integer modulus used in encryption parameters."))
@@ -315,7 +4806,7 @@ PYBIND11_MODULE(seal, m)
 
     // plaintext.h
     py::class_<Plaintext>(
-        m, "Plaintext",
+        m, "Plaintext", py::buffer_protocol(),
         SEAL_DOC("Stores a plaintext polynomial. In CKKS, plaintexts are typically kept in NTT form and also carry a scale."))
         .def(py::init<>(), SEAL_DOC("Construct an empty plaintext with no allocated data."))
         .def(py::init<std::size_t>(), py::arg("coeff_count"),
@@ -367,26 +4858,38 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("context"), py::arg("path"),
             SEAL_DOC("Load a serialized plaintext from a file and validate it against the context."))
         .def("load_bytes", [](Plaintext &plain, const SEALContext &context, py::bytes data){
-            std::string raw = data;
-            plain.load(context, reinterpret_cast<const seal_byte *>(raw.data()), raw.size());
+            load_from(plain, context, data);
         }, py::arg("context"), py::arg("data"),
             SEAL_DOC("Load a serialized plaintext from a bytes object and validate it against the context."))
+        .def("load_from", &load_from<Plaintext>, py::arg("context"), py::arg("buffer"),
+            SEAL_DOC("Load a serialized plaintext from any C-contiguous buffer-protocol object without copying it, "
+                "validating it against the context. Return the number of bytes read."))
         .def("save_size", [](const Plaintext &plain){
             return plain.save_size();
         }, SEAL_DOC("Return the serialized size in bytes using the default compression mode."))
         .def("save_size", py::overload_cast<compr_mode_type>(&Plaintext::save_size, py::const_),
             py::arg("compr_mode")=Serialization::compr_mode_default,
             SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
-        .def("to_bytes", [](const Plaintext &plain, compr_mode_type compr_mode){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            plain.save(out, compr_mode);
-            return py::bytes(out.str());
-        }, py::arg("compr_mode")=Serialization::compr_mode_default,
-            SEAL_DOC("Serialize the plaintext to a Python bytes object."));
+        .def("to_bytes", &save_bytes<Plaintext>, py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the plaintext to a Python bytes object."))
+        .def("save_into", &save_into<Plaintext>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the plaintext into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
+        .def("data", [](py::object self){
+            Plaintext &plain = self.cast<Plaintext &>();
+            return py::array_t<std::uint64_t>({ plain.coeff_count() }, plain.data(), self);
+        }, SEAL_DOC("Return a writable uint64 NumPy view of the coefficients that keeps the plaintext alive. "
+            "The view is invalidated if the plaintext is resized or reallocated."))
+        .def_buffer([](Plaintext &plain){
+            return py::buffer_info(plain.data(), static_cast<py::ssize_t>(plain.coeff_count()));
+        })
+        .def(py::pickle(&getstate<Plaintext>, &unpickle_state<Plaintext>))
+        .def("__reduce_ex__", &reduce_ex<Plaintext>, py::arg("protocol"),
+            SEAL_DOC("Pickle support. Under protocol 5 the coefficients travel as an out-of-band PickleBuffer."));
 
     // ciphertext.h
     py::class_<Ciphertext>(
-        m, "Ciphertext",
+        m, "Ciphertext", py::buffer_protocol(),
         SEAL_DOC("Stores an encrypted value as two or more CRT polynomials together with parameter metadata."))
         .def(py::init<>(), SEAL_DOC("Construct an empty ciphertext with no allocated data."))
         .def(py::init<const SEALContext &>(), py::arg("context"),
@@ -432,22 +4935,36 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("context"), py::arg("path"),
             SEAL_DOC("Load a serialized ciphertext from a file and validate it against the context."))
         .def("load_bytes", [](Ciphertext &cipher, const SEALContext &context, py::bytes data){
-            std::string raw = data;
-            cipher.load(context, reinterpret_cast<const seal_byte *>(raw.data()), raw.size());
+            load_from(cipher, context, data);
         }, py::arg("context"), py::arg("data"),
             SEAL_DOC("Load a serialized ciphertext from a bytes object and validate it against the context."))
+        .def("load_from", &load_from<Ciphertext>, py::arg("context"), py::arg("buffer"),
+            SEAL_DOC("Load a serialized ciphertext from any C-contiguous buffer-protocol object without copying it, "
+                "validating it against the context. Return the number of bytes read."))
         .def("save_size", [](const Ciphertext &cipher){
             return cipher.save_size();
         }, SEAL_DOC("Return the serialized size in bytes using the default compression mode."))
         .def("save_size", py::overload_cast<compr_mode_type>(&Ciphertext::save_size, py::const_),
             py::arg("compr_mode")=Serialization::compr_mode_default,
             SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
-        .def("to_string", [](const Ciphertext &cipher, compr_mode_type compr_mode){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            cipher.save(out, compr_mode);
-            return py::bytes(out.str());
-        }, py::arg("compr_mode")=Serialization::compr_mode_default,
-            SEAL_DOC("Serialize the ciphertext to a Python bytes object."));
+        .def("to_string", &save_bytes<Ciphertext>, py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the ciphertext to a Python bytes object."))
+        .def("save_into", &save_into<Ciphertext>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the ciphertext into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
+        .def("data", [](py::object self){
+            Ciphertext &cipher = self.cast<Ciphertext &>();
+            return py::array_t<std::uint64_t>(ciphertext_shape(cipher), cipher.data(), self);
+        }, SEAL_DOC("Return a writable uint64 NumPy view of shape (size, coeff_modulus_size, poly_modulus_degree) "
+            "that keeps the ciphertext alive. The view is invalidated if the ciphertext is resized or reallocated."))
+        .def_buffer([](Ciphertext &cipher){
+            auto shape = ciphertext_shape(cipher);
+            std::vector<py::ssize_t> strides = { shape[1] * shape[2] * 8, shape[2] * 8, 8 };
+            return py::buffer_info(cipher.data(), shape, strides);
+        })
+        .def(py::pickle(&getstate<Ciphertext>, &unpickle_state<Ciphertext>))
+        .def("__reduce_ex__", &reduce_ex<Ciphertext>, py::arg("protocol"),
+            SEAL_DOC("Pickle support. Under protocol 5 the polynomial data travels as an out-of-band PickleBuffer."));
 
     // secretkey.h
     py::class_<SecretKey>(m, "SecretKey", SEAL_DOC("Stores the secret key used for decryption and symmetric encryption."))
@@ -469,10 +4986,20 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("context"), py::arg("path"),
             SEAL_DOC("Load a serialized secret key from a file."))
         .def("to_string", [](const SecretKey &secret){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            secret.save(out);
-            return py::bytes(out.str());
-        }, SEAL_DOC("Serialize the secret key to a Python bytes object."));
+            return save_bytes(secret);
+        }, SEAL_DOC("Serialize the secret key to a Python bytes object."))
+        .def("save_size", py::overload_cast<compr_mode_type>(&SecretKey::save_size, py::const_),
+            py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
+        .def("save_into", &save_into<SecretKey>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the secret key into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
+        .def("load_from", &load_from<SecretKey>, py::arg("context"), py::arg("buffer"),
+            SEAL_DOC("Load a serialized secret key from any C-contiguous buffer-protocol object without copying it. "
+                "Return the number of bytes read."))
+        .def(py::pickle(&getstate<SecretKey>, &unpickle_state<SecretKey>))
+        .def("__reduce_ex__", &reduce_ex<SecretKey>, py::arg("protocol"),
+            SEAL_DOC("Pickle support. Under protocol 5 the serialized secret key data travel as an out-of-band PickleBuffer."));
 
     // publickey.h
     py::class_<PublicKey>(m, "PublicKey", SEAL_DOC("Stores the public key used for public-key encryption."))
@@ -494,10 +5021,20 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("context"), py::arg("path"),
             SEAL_DOC("Load a serialized public key from a file."))
         .def("to_string", [](const PublicKey &public_){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            public_.save(out);
-            return py::bytes(out.str());
-        }, SEAL_DOC("Serialize the public key to a Python bytes object."));
+            return save_bytes(public_);
+        }, SEAL_DOC("Serialize the public key to a Python bytes object."))
+        .def("save_size", py::overload_cast<compr_mode_type>(&PublicKey::save_size, py::const_),
+            py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
+        .def("save_into", &save_into<PublicKey>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the public key into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
+        .def("load_from", &load_from<PublicKey>, py::arg("context"), py::arg("buffer"),
+            SEAL_DOC("Load a serialized public key from any C-contiguous buffer-protocol object without copying it. "
+                "Return the number of bytes read."))
+        .def(py::pickle(&getstate<PublicKey>, &unpickle_state<PublicKey>))
+        .def("__reduce_ex__", &reduce_ex<PublicKey>, py::arg("protocol"),
+            SEAL_DOC("Pickle support. Under protocol 5 the serialized public key data travel as an out-of-band PickleBuffer."));
 
     // kswitchkeys.h
     py::class_<KSwitchKeys>(m, "KSwitchKeys", SEAL_DOC("Base container for key switching key material."))
@@ -545,10 +5082,20 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("context"), py::arg("path"),
             SEAL_DOC("Load serialized relinearization keys from a file."))
         .def("to_string", [](const RelinKeys &relin){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            relin.save(out);
-            return py::bytes(out.str());
-        }, SEAL_DOC("Serialize the relinearization keys to a Python bytes object."));
+            return save_bytes(relin);
+        }, SEAL_DOC("Serialize the relinearization keys to a Python bytes object."))
+        .def("save_size", py::overload_cast<compr_mode_type>(&RelinKeys::save_size, py::const_),
+            py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
+        .def("save_into", &save_into<RelinKeys>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the relinearization keys into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
+        .def("load_from", &load_from<RelinKeys>, py::arg("context"), py::arg("buffer"),
+            SEAL_DOC("Load serialized relinearization keys from any C-contiguous buffer-protocol object without copying it. "
+                "Return the number of bytes read."))
+        .def(py::pickle(&getstate<RelinKeys>, &unpickle_state<RelinKeys>))
+        .def("__reduce_ex__", &reduce_ex<RelinKeys>, py::arg("protocol"),
+            SEAL_DOC("Pickle support. Under protocol 5 the serialized relinearization keys travel as an out-of-band PickleBuffer."));
 
     // galoiskeys.h
     py::class_<GaloisKeys, KSwitchKeys>(m, "GaloisKeys", SEAL_DOC("Galois keys used for rotations and CKKS complex conjugation."))
@@ -575,524 +5122,722 @@ PYBIND11_MODULE(seal, m)
         }, py::arg("context"), py::arg("path"),
             SEAL_DOC("Load serialized Galois keys from a file."))
         .def("to_string", [](const GaloisKeys &galois){
-            std::stringstream out(std::ios::binary | std::ios::out);
-            galois.save(out);
-            return py::bytes(out.str());
-        }, SEAL_DOC("Serialize the Galois keys to a Python bytes object."));
+            return save_bytes(galois);
+        }, SEAL_DOC("Serialize the Galois keys to a Python bytes object."))
+        .def("save_size", py::overload_cast<compr_mode_type>(&GaloisKeys::save_size, py::const_),
+            py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Return the serialized size in bytes for the given compression mode."))
+        .def("save_into", &save_into<GaloisKeys>, py::arg("buffer"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Serialize the Galois keys into a writable buffer of at least save_size(compr_mode) bytes. "
+                "Return the number of bytes written."))
+        .def("load_from", &load_from<GaloisKeys>, py::arg("context"), py::arg("buffer"),
+            SEAL_DOC("Load serialized Galois keys from any C-contiguous buffer-protocol object without copying it. "
+                "Return the number of bytes read."))
+        .def(py::pickle(&getstate<GaloisKeys>, &unpickle_state<GaloisKeys>))
+        .def("__reduce_ex__", &reduce_ex<GaloisKeys>, py::arg("protocol"),
+            SEAL_DOC("Pickle support. Under protocol 5 the serialized Galois keys travel as an out-of-band PickleBuffer."));
+
+    // serializable.h
+    bind_serializable<PublicKey>(m, "SerializablePublicKey", SEAL_DOC("Seed-compressed public key returned by KeyGenerator.create_public_key_serializable()."));
+    bind_serializable<RelinKeys>(m, "SerializableRelinKeys", SEAL_DOC("Seed-compressed relinearization keys returned by KeyGenerator.create_relin_keys_serializable()."));
+    bind_serializable<GaloisKeys>(m, "SerializableGaloisKeys", SEAL_DOC("Seed-compressed Galois keys returned by KeyGenerator.create_galois_keys_serializable()."));
+    bind_serializable<Ciphertext>(m, "SerializableCiphertext", SEAL_DOC("Seed-compressed ciphertext returned by Encryptor.encrypt_symmetric_serializable()."));
 
     // keygenerator.h
     py::class_<KeyGenerator>(m, "KeyGenerator", SEAL_DOC("Generates secret, public, relinearization, and Galois keys for a SEALContext."))
-        .def(py::init<const SEALContext &>(), py::arg("context"),
+        .def(py::init<const SEALContext &>(), py::arg("context"), release_gil(),
             SEAL_DOC("Create a key generator and generate a fresh secret key."))
-        .def(py::init<const SEALContext &, const SecretKey &>(), py::arg("context"), py::arg("secret_key"),
+        .def(py::init<const SEALContext &, const SecretKey &>(), py::arg("context"), py::arg("secret_key"), release_gil(),
             SEAL_DOC("Create a key generator from an existing secret key."))
         .def("secret_key", &KeyGenerator::secret_key, SEAL_DOC("Return the secret key managed by this generator."))
-        .def("create_public_key", py::overload_cast<PublicKey &>(&KeyGenerator::create_public_key, py::const_), py::arg("destination"),
+        .def("create_public_key", py::overload_cast<PublicKey &>(&KeyGenerator::create_public_key, py::const_), py::arg("destination"), release_gil(),
             SEAL_DOC("Generate a public key and store it in destination."))
-        .def("create_relin_keys", py::overload_cast<RelinKeys &>(&KeyGenerator::create_relin_keys), py::arg("destination"),
+        .def("create_relin_keys", py::overload_cast<RelinKeys &>(&KeyGenerator::create_relin_keys), py::arg("destination"), release_gil(),
             SEAL_DOC("Generate relinearization keys and store them in destination."))
         .def("create_galois_keys", py::overload_cast<const std::vector<int> &, GaloisKeys &>(&KeyGenerator::create_galois_keys),
-            py::arg("steps"), py::arg("destination"),
+            py::arg("steps"), py::arg("destination"), release_gil(),
             SEAL_DOC("Generate Galois keys for the requested rotation steps and store them in destination."))
-        .def("create_galois_keys", py::overload_cast<GaloisKeys &>(&KeyGenerator::create_galois_keys), py::arg("destination"),
+        .def("create_galois_keys", py::overload_cast<GaloisKeys &>(&KeyGenerator::create_galois_keys), py::arg("destination"), release_gil(),
             SEAL_DOC("Generate all supported Galois keys and store them in destination."))
         .def("create_public_key", [](KeyGenerator &keygen){
             PublicKey pk;
             keygen.create_public_key(pk);
             return pk;
-        }, SEAL_DOC("Generate and return a new public key."))
+        }, release_gil(), SEAL_DOC("Generate and return a new public key."))
         .def("create_relin_keys", [](KeyGenerator &keygen){
             RelinKeys rk;
             keygen.create_relin_keys(rk);
             return rk;
-        }, SEAL_DOC("Generate and return relinearization keys."))
+        }, release_gil(), SEAL_DOC("Generate and return relinearization keys."))
         .def("create_galois_keys", [](KeyGenerator &keygen){
             GaloisKeys gk;
             keygen.create_galois_keys(gk);
             return gk;
-        }, SEAL_DOC("Generate and return all supported Galois keys."));
+        }, release_gil(), SEAL_DOC("Generate and return all supported Galois keys."))
+        .def("create_galois_keys", [](KeyGenerator &keygen, const std::vector<int> &steps){
+            GaloisKeys gk;
+            keygen.create_galois_keys(steps, gk);
+            return gk;
+        }, py::arg("steps"), release_gil(),
+            SEAL_DOC("Generate and return Galois keys for the requested rotation steps only."))
+        .def("create_public_key_serializable", [](const KeyGenerator &keygen){
+            return keygen.create_public_key();
+        }, release_gil(), SEAL_DOC("Generate a public key that serializes with a seed, at about half the size. Load it on the receiving side as a PublicKey."))
+        .def("create_relin_keys_serializable", [](KeyGenerator &keygen){
+            return keygen.create_relin_keys();
+        }, release_gil(), SEAL_DOC("Generate relinearization keys that serialize with seeds, at about half the size. Load them on the receiving side as RelinKeys."))
+        .def("create_galois_keys_serializable", [](KeyGenerator &keygen, const std::vector<int> &steps){
+            return keygen.create_galois_keys(steps);
+        }, py::arg("steps"), release_gil(),
+            SEAL_DOC("Generate Galois keys for the requested rotation steps that serialize with seeds, at about half the size. "
+                "Load them on the receiving side as GaloisKeys."))
+        .def("create_galois_keys_serializable", [](KeyGenerator &keygen){
+            return keygen.create_galois_keys();
+        }, release_gil(), SEAL_DOC("Generate all supported Galois keys so that they serialize with seeds, at about half the size."));
 
     // encryptor.h
     py::class_<Encryptor>(m, "Encryptor", SEAL_DOC("Encrypts plaintexts using a public key or a secret key."))
-        .def(py::init<const SEALContext &, const PublicKey &>(), py::arg("context"), py::arg("public_key"),
+        .def(py::init<const SEALContext &, const PublicKey &>(), py::arg("context"), py::arg("public_key"), release_gil(),
             SEAL_DOC("Create an encryptor configured for public-key encryption."))
-        .def(py::init<const SEALContext &, const SecretKey &>(), py::arg("context"), py::arg("secret_key"),
+        .def(py::init<const SEALContext &, const SecretKey &>(), py::arg("context"), py::arg("secret_key"), release_gil(),
             SEAL_DOC("Create an encryptor configured for secret-key encryption."))
         .def(py::init<const SEALContext &, const PublicKey &, const SecretKey &>(),
-            py::arg("context"), py::arg("public_key"), py::arg("secret_key"),
+            py::arg("context"), py::arg("public_key"), py::arg("secret_key"), release_gil(),
             SEAL_DOC("Create an encryptor configured with both public and secret keys."))
         .def("set_public_key", &Encryptor::set_public_key, py::arg("public_key"),
             SEAL_DOC("Set or replace the public key used for encryption."))
         .def("set_secret_key", &Encryptor::set_secret_key, py::arg("secret_key"),
             SEAL_DOC("Set or replace the secret key used for symmetric encryption."))
-        .def("encrypt_zero", [](const Encryptor &encryptor){
-            Ciphertext encrypted;
-            encryptor.encrypt_zero(encrypted);
+        .def("encrypt_zero", [](const Encryptor &encryptor, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext encrypted(handle);
+            encryptor.encrypt_zero(encrypted, handle);
             return encrypted;
-        }, SEAL_DOC("Encrypt the zero plaintext at the first data level and return the ciphertext."))
-        .def("encrypt_zero", [](const Encryptor &encryptor, Ciphertext &destination){
-            encryptor.encrypt_zero(destination);
-        }, py::arg("destination"),
+        }, py::kw_only(), py::arg("pool")=py::none(), release_gil(), SEAL_DOC("Encrypt the zero plaintext at the first data level and return the ciphertext."))
+        .def("encrypt_zero", [](const Encryptor &encryptor, Ciphertext &destination, const MemoryPoolHandle *pool){
+            encryptor.encrypt_zero(destination, pool_or_default(pool));
+        }, py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encrypt the zero plaintext at the first data level into destination."))
-        .def("encrypt_zero", [](const Encryptor &encryptor, parms_id_type parms_id){
-            Ciphertext encrypted;
-            encryptor.encrypt_zero(parms_id, encrypted);
+        .def("encrypt_zero", [](const Encryptor &encryptor, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext encrypted(handle);
+            encryptor.encrypt_zero(parms_id, encrypted, handle);
             return encrypted;
-        }, py::arg("parms_id"),
+        }, py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encrypt the zero plaintext for the specified parms_id and return the ciphertext."))
-        .def("encrypt_zero", [](const Encryptor &encryptor, parms_id_type parms_id, Ciphertext &destination){
-            encryptor.encrypt_zero(parms_id, destination);
-        }, py::arg("parms_id"), py::arg("destination"),
+        .def("encrypt_zero", [](const Encryptor &encryptor, parms_id_type parms_id, Ciphertext &destination, const MemoryPoolHandle *pool){
+            encryptor.encrypt_zero(parms_id, destination, pool_or_default(pool));
+        }, py::arg("parms_id"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encrypt the zero plaintext for the specified parms_id into destination."))
-        .def("encrypt", [](const Encryptor &encryptor, const Plaintext &plain){
-            Ciphertext encrypted;
-            encryptor.encrypt(plain, encrypted);
+        .def("encrypt", [](const Encryptor &encryptor, const Plaintext &plain, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext encrypted(handle);
+            encryptor.encrypt(plain, encrypted, handle);
             return encrypted;
-        }, py::arg("plain"),
+        }, py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encrypt a plaintext with the public key and return the ciphertext."))
-        .def("encrypt", [](const Encryptor &encryptor, const Plaintext &plain, Ciphertext &destination){
-            encryptor.encrypt(plain, destination);
-        }, py::arg("plain"), py::arg("destination"),
+        .def("encrypt", [](const Encryptor &encryptor, const Plaintext &plain, Ciphertext &destination, const MemoryPoolHandle *pool){
+            encryptor.encrypt(plain, destination, pool_or_default(pool));
+        }, py::arg("plain"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encrypt a plaintext with the public key into destination."))
-        .def("encrypt_symmetric", [](const Encryptor &encryptor, const Plaintext &plain){
-            Ciphertext encrypted;
-            encryptor.encrypt_symmetric(plain, encrypted);
+        .def("encrypt_symmetric", [](const Encryptor &encryptor, const Plaintext &plain, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext encrypted(handle);
+            encryptor.encrypt_symmetric(plain, encrypted, handle);
             return encrypted;
-        }, py::arg("plain"),
+        }, py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encrypt a plaintext with the secret key and return the ciphertext."))
-        .def("encrypt_symmetric", [](const Encryptor &encryptor, const Plaintext &plain, Ciphertext &destination){
-            encryptor.encrypt_symmetric(plain, destination);
-        }, py::arg("plain"), py::arg("destination"),
-            SEAL_DOC("Encrypt a plaintext with the secret key into destination."));
+        .def("encrypt_symmetric", [](const Encryptor &encryptor, const Plaintext &plain, Ciphertext &destination, const MemoryPoolHandle *pool){
+            encryptor.encrypt_symmetric(plain, destination, pool_or_default(pool));
+        }, py::arg("plain"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Encrypt a plaintext with the secret key into destination."))
+        .def("encrypt_symmetric_serializable", [](const Encryptor &encryptor, const Plaintext &plain, const MemoryPoolHandle *pool){
+            return encryptor.encrypt_symmetric(plain, pool_or_default(pool));
+        }, py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Encrypt a plaintext with the secret key into a ciphertext that serializes with a seed, at about half the size. "
+                "Load it on the receiving side as a Ciphertext."))
+        .def("encrypt_zero_symmetric_serializable", [](const Encryptor &encryptor, const MemoryPoolHandle *pool){
+            return encryptor.encrypt_zero_symmetric(pool_or_default(pool));
+        }, py::kw_only(), py::arg("pool")=py::none(), release_gil(), SEAL_DOC("Encrypt zero with the secret key at the first data level into a seed-compressed serializable ciphertext."))
+        .def("encrypt_zero_symmetric_serializable", [](const Encryptor &encryptor, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            return encryptor.encrypt_zero_symmetric(parms_id, pool_or_default(pool));
+        }, py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Encrypt zero with the secret key for the specified parms_id into a seed-compressed serializable ciphertext."));
 
     // evaluator.h
     py::class_<Evaluator>(m, "Evaluator", SEAL_DOC("Applies homomorphic operations to ciphertexts and plaintexts."))
-        .def(py::init<const SEALContext &>(), py::arg("context"),
+        // The context stays registered for as long as the evaluator lives, which rotate_*_many relies on.
+        .def(py::init<const SEALContext &>(), py::arg("context"), py::keep_alive<1, 2>(), release_gil(),
             SEAL_DOC("Create an evaluator for ciphertext operations under the given context."))
-        .def("negate_inplace", &Evaluator::negate_inplace, py::arg("encrypted"),
+        .def("negate_inplace", &Evaluator::negate_inplace, py::arg("encrypted"), release_gil(),
             SEAL_DOC("Negate a ciphertext in place."))
         .def("negate", [](Evaluator &evaluator, const Ciphertext &encrypted1){
             Ciphertext destination;
             evaluator.negate(encrypted1, destination);
             return destination;
-        }, py::arg("encrypted"),
+        }, py::arg("encrypted"), release_gil(),
             SEAL_DOC("Negate a ciphertext and return the result."))
-        .def("add_inplace", &Evaluator::add_inplace, py::arg("encrypted1"), py::arg("encrypted2"),
+        .def("add_inplace", &Evaluator::add_inplace, py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
             SEAL_DOC("Add two ciphertexts and store the result in encrypted1."))
         .def("add", [](Evaluator &evaluator, const Ciphertext &encrypted1, const Ciphertext &encrypted2){
             Ciphertext destination;
             evaluator.add(encrypted1, encrypted2, destination);
             return destination;
-        }, py::arg("encrypted1"), py::arg("encrypted2"),
+        }, py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
             SEAL_DOC("Add two ciphertexts and return the result."))
         .def("add_many", [](Evaluator &evaluator, const std::vector<Ciphertext> &encrypteds){
             Ciphertext destination;
             evaluator.add_many(encrypteds, destination);
             return destination;
-        }, py::arg("encrypteds"),
+        }, py::arg("encrypteds"), release_gil(),
             SEAL_DOC("Add many ciphertexts together and return the sum."))
-        .def("sub_inplace", &Evaluator::sub_inplace, py::arg("encrypted1"), py::arg("encrypted2"),
+        .def("sub_inplace", &Evaluator::sub_inplace, py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
             SEAL_DOC("Subtract encrypted2 from encrypted1 in place."))
         .def("sub", [](Evaluator &evaluator, const Ciphertext &encrypted1, const Ciphertext &encrypted2){
             Ciphertext destination;
             evaluator.sub(encrypted1, encrypted2, destination);
             return destination;
-        }, py::arg("encrypted1"), py::arg("encrypted2"),
+        }, py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
             SEAL_DOC("Subtract two ciphertexts and return the result."))
-        .def("multiply_inplace", [](Evaluator &evaluator, Ciphertext &encrypted1, const Ciphertext &encrypted2){
-            evaluator.multiply_inplace(encrypted1, encrypted2);
-        }, py::arg("encrypted1"), py::arg("encrypted2"),
+        .def("multiply_inplace", [](Evaluator &evaluator, Ciphertext &encrypted1, const Ciphertext &encrypted2, const MemoryPoolHandle *pool){
+            evaluator.multiply_inplace(encrypted1, encrypted2, pool_or_default(pool));
+        }, py::arg("encrypted1"), py::arg("encrypted2"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Multiply two ciphertexts and store the result in encrypted1."))
-        .def("multiply", [](Evaluator &evaluator, const Ciphertext &encrypted1, const Ciphertext &encrypted2){
-            Ciphertext destination;
-            evaluator.multiply(encrypted1, encrypted2, destination);
+        .def("multiply", [](Evaluator &evaluator, const Ciphertext &encrypted1, const Ciphertext &encrypted2, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.multiply(encrypted1, encrypted2, destination, handle);
             return destination;
-        }, py::arg("encrypted1"), py::arg("encrypted2"),
+        }, py::arg("encrypted1"), py::arg("encrypted2"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Multiply two ciphertexts and return the result."))
-        .def("square_inplace", [](Evaluator &evaluator, Ciphertext &encrypted1){
-            evaluator.square_inplace(encrypted1);
-        }, py::arg("encrypted"),
+        .def("square_inplace", [](Evaluator &evaluator, Ciphertext &encrypted1, const MemoryPoolHandle *pool){
+            evaluator.square_inplace(encrypted1, pool_or_default(pool));
+        }, py::arg("encrypted"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Square a ciphertext in place."))
-        .def("square", [](Evaluator &evaluator, const Ciphertext &encrypted1){
-            Ciphertext destination;
-            evaluator.square(encrypted1, destination);
+        .def("square", [](Evaluator &evaluator, const Ciphertext &encrypted1, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.square(encrypted1, destination, handle);
             return destination;
-        }, py::arg("encrypted"),
+        }, py::arg("encrypted"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Square a ciphertext and return the result."))
-        .def("relinearize_inplace", [](Evaluator &evaluator, Ciphertext &encrypted1, const RelinKeys &relin_keys){
-            evaluator.relinearize_inplace(encrypted1, relin_keys);
-        }, py::arg("encrypted"), py::arg("relin_keys"),
+        .def("relinearize_inplace", [](Evaluator &evaluator, Ciphertext &encrypted1, const RelinKeys &relin_keys, const MemoryPoolHandle *pool){
+            evaluator.relinearize_inplace(encrypted1, relin_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("relin_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Relinearize a ciphertext in place using relinearization keys."))
-        .def("relinearize", [](Evaluator &evaluator, const Ciphertext &encrypted1, const RelinKeys &relin_keys){
-            Ciphertext destination;
-            evaluator.relinearize(encrypted1, relin_keys, destination);
+        .def("relinearize", [](Evaluator &evaluator, const Ciphertext &encrypted1, const RelinKeys &relin_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.relinearize(encrypted1, relin_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("relin_keys"),
+        }, py::arg("encrypted"), py::arg("relin_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Relinearize a ciphertext and return the result."))
-        .def("mod_switch_to_next", [](Evaluator &evaluator, const Ciphertext &encrypted){
-            Ciphertext destination;
-            evaluator.mod_switch_to_next(encrypted, destination);
+        .def("mod_switch_to_next", [](Evaluator &evaluator, const Ciphertext &encrypted, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.mod_switch_to_next(encrypted, destination, handle);
             return destination;
-        }, py::arg("encrypted"),
+        }, py::arg("encrypted"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Mod-switch a ciphertext to the next level in the modulus chain and return the result."))
-        .def("mod_switch_to_next_inplace", [](Evaluator &evaluator, Ciphertext &encrypted){
-            evaluator.mod_switch_to_next_inplace(encrypted);
-        }, py::arg("encrypted"),
+        .def("mod_switch_to_next_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const MemoryPoolHandle *pool){
+            evaluator.mod_switch_to_next_inplace(encrypted, pool_or_default(pool));
+        }, py::arg("encrypted"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Mod-switch a ciphertext to the next level in place."))
         .def("mod_switch_to_next_inplace", py::overload_cast<Plaintext &>(&Evaluator::mod_switch_to_next_inplace, py::const_),
-            py::arg("plain"),
+            py::arg("plain"), release_gil(),
             SEAL_DOC("Mod-switch a plaintext to the next level in place."))
         .def("mod_switch_to_next", [](Evaluator &evaluator, const Plaintext &plain){
             Plaintext destination;
             evaluator.mod_switch_to_next(plain, destination);
             return destination;
-        }, py::arg("plain"),
+        }, py::arg("plain"), release_gil(),
             SEAL_DOC("Mod-switch a plaintext to the next level and return the result."))
-        .def("mod_switch_to_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, parms_id_type parms_id){
-            evaluator.mod_switch_to_inplace(encrypted, parms_id);
-        }, py::arg("encrypted"), py::arg("parms_id"),
+        .def("mod_switch_to_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            evaluator.mod_switch_to_inplace(encrypted, parms_id, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Mod-switch a ciphertext in place to the specified parms_id."))
-        .def("mod_switch_to", [](Evaluator &evaluator, const Ciphertext &encrypted, parms_id_type parms_id){
-            Ciphertext destination;
-            evaluator.mod_switch_to(encrypted, parms_id, destination);
+        .def("mod_switch_to", [](Evaluator &evaluator, const Ciphertext &encrypted, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.mod_switch_to(encrypted, parms_id, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("parms_id"),
+        }, py::arg("encrypted"), py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Mod-switch a ciphertext to the specified parms_id and return the result."))
         .def("mod_switch_to_inplace", py::overload_cast<Plaintext &, parms_id_type>(&Evaluator::mod_switch_to_inplace, py::const_),
-            py::arg("plain"), py::arg("parms_id"),
+            py::arg("plain"), py::arg("parms_id"), release_gil(),
             SEAL_DOC("Mod-switch a plaintext in place to the specified parms_id."))
         .def("mod_switch_to", [](Evaluator &evaluator, const Plaintext &plain, parms_id_type parms_id){
             Plaintext destination;
             evaluator.mod_switch_to(plain, parms_id, destination);
             return destination;
-        }, py::arg("plain"), py::arg("parms_id"),
+        }, py::arg("plain"), py::arg("parms_id"), release_gil(),
             SEAL_DOC("Mod-switch a plaintext to the specified parms_id and return the result."))
-        .def("rescale_to_next", [](Evaluator &evaluator, const Ciphertext &encrypted){
-            Ciphertext destination;
-            evaluator.rescale_to_next(encrypted, destination);
+        .def("rescale_to_next", [](Evaluator &evaluator, const Ciphertext &encrypted, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.rescale_to_next(encrypted, destination, handle);
             return destination;
-        }, py::arg("encrypted"),
+        }, py::arg("encrypted"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rescale a CKKS ciphertext to the next level and return the result."))
-        .def("rescale_to_next_inplace", [](Evaluator &evaluator, Ciphertext &encrypted){
-            evaluator.rescale_to_next_inplace(encrypted);
-        }, py::arg("encrypted"),
+        .def("rescale_to_next_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const MemoryPoolHandle *pool){
+            evaluator.rescale_to_next_inplace(encrypted, pool_or_default(pool));
+        }, py::arg("encrypted"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rescale a CKKS ciphertext to the next level in place."))
-        .def("rescale_to_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, parms_id_type parms_id){
-            evaluator.rescale_to_inplace(encrypted, parms_id);
-        }, py::arg("encrypted"), py::arg("parms_id"),
+        .def("rescale_to_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            evaluator.rescale_to_inplace(encrypted, parms_id, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rescale a CKKS ciphertext in place to the specified parms_id."))
-        .def("rescale_to", [](Evaluator &evaluator, const Ciphertext &encrypted, parms_id_type parms_id){
-            Ciphertext destination;
-            evaluator.rescale_to(encrypted, parms_id, destination);
+        .def("rescale_to", [](Evaluator &evaluator, const Ciphertext &encrypted, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.rescale_to(encrypted, parms_id, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("parms_id"),
+        }, py::arg("encrypted"), py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rescale a CKKS ciphertext to the specified parms_id and return the result."))
-        .def("multiply_many", [](Evaluator &evaluator,  const std::vector<Ciphertext> &encrypteds, const RelinKeys &relin_keys){
-            Ciphertext destination;
-            evaluator.multiply_many(encrypteds, relin_keys, destination);
+        .def("multiply_many", [](Evaluator &evaluator,  const std::vector<Ciphertext> &encrypteds, const RelinKeys &relin_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.multiply_many(encrypteds, relin_keys, destination, handle);
             return destination;
-        }, py::arg("encrypteds"), py::arg("relin_keys"),
+        }, py::arg("encrypteds"), py::arg("relin_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Multiply many ciphertexts together and return the result."))
-        .def("exponentiate_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, std::uint64_t exponent, const RelinKeys &relin_keys){
-            evaluator.exponentiate_inplace(encrypted, exponent, relin_keys);
-        }, py::arg("encrypted"), py::arg("exponent"), py::arg("relin_keys"),
+        .def("exponentiate_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, std::uint64_t exponent, const RelinKeys &relin_keys, const MemoryPoolHandle *pool){
+            evaluator.exponentiate_inplace(encrypted, exponent, relin_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("exponent"), py::arg("relin_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Raise a ciphertext to a power in place using repeated multiplication and relinearization."))
-        .def("exponentiate", [](Evaluator &evaluator,  const Ciphertext &encrypted, std::uint64_t exponent, const RelinKeys &relin_keys){
-            Ciphertext destination;
-            evaluator.exponentiate(encrypted, exponent, relin_keys, destination);
+        .def("exponentiate", [](Evaluator &evaluator,  const Ciphertext &encrypted, std::uint64_t exponent, const RelinKeys &relin_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.exponentiate(encrypted, exponent, relin_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("exponent"), py::arg("relin_keys"),
+        }, py::arg("encrypted"), py::arg("exponent"), py::arg("relin_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Raise a ciphertext to a power and return the result."))
-        .def("add_plain_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const Plaintext &plain){
-            evaluator.add_plain_inplace(encrypted, plain);
-        }, py::arg("encrypted"), py::arg("plain"),
+        .def("add_plain_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const Plaintext &plain, const MemoryPoolHandle *pool){
+            evaluator.add_plain_inplace(encrypted, plain, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Add a plaintext to a ciphertext in place."))
-        .def("add_plain", [](Evaluator &evaluator, const Ciphertext &encrypted, const Plaintext &plain){
-            Ciphertext destination;
-            evaluator.add_plain(encrypted, plain, destination);
+        .def("add_plain", [](Evaluator &evaluator, const Ciphertext &encrypted, const Plaintext &plain, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.add_plain(encrypted, plain, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("plain"),
+        }, py::arg("encrypted"), py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Add a plaintext to a ciphertext and return the result."))
-        .def("sub_plain_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const Plaintext &plain){
-            evaluator.sub_plain_inplace(encrypted, plain);
-        }, py::arg("encrypted"), py::arg("plain"),
+        .def("sub_plain_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const Plaintext &plain, const MemoryPoolHandle *pool){
+            evaluator.sub_plain_inplace(encrypted, plain, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Subtract a plaintext from a ciphertext in place."))
-        .def("sub_plain", [](Evaluator &evaluator, const Ciphertext &encrypted, const Plaintext &plain){
-            Ciphertext destination;
-            evaluator.sub_plain(encrypted, plain, destination);
+        .def("sub_plain", [](Evaluator &evaluator, const Ciphertext &encrypted, const Plaintext &plain, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.sub_plain(encrypted, plain, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("plain"),
+        }, py::arg("encrypted"), py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Subtract a plaintext from a ciphertext and return the result."))
-        .def("multiply_plain_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const Plaintext &plain){
-            evaluator.multiply_plain_inplace(encrypted, plain);
-        }, py::arg("encrypted"), py::arg("plain"),
+        .def("multiply_plain_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const Plaintext &plain, const MemoryPoolHandle *pool){
+            evaluator.multiply_plain_inplace(encrypted, plain, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Multiply a ciphertext by a plaintext in place."))
-        .def("multiply_plain", [](Evaluator &evaluator, const Ciphertext &encrypted, const Plaintext &plain){
-            Ciphertext destination;
-            evaluator.multiply_plain(encrypted, plain, destination);
+        .def("multiply_plain", [](Evaluator &evaluator, const Ciphertext &encrypted, const Plaintext &plain, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.multiply_plain(encrypted, plain, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("plain"),
+        }, py::arg("encrypted"), py::arg("plain"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Multiply a ciphertext by a plaintext and return the result."))
-        .def("transform_to_ntt_inplace", [](Evaluator &evaluator, Plaintext &plain, parms_id_type parms_id){
-            evaluator.transform_to_ntt_inplace(plain,parms_id);
-        }, py::arg("plain"), py::arg("parms_id"),
+        .def("transform_to_ntt_inplace", [](Evaluator &evaluator, Plaintext &plain, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            evaluator.transform_to_ntt_inplace(plain,parms_id, pool_or_default(pool));
+        }, py::arg("plain"), py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Transform a plaintext to NTT form in place."))
-        .def("transform_to_ntt", [](Evaluator &evaluator, const Plaintext &plain, parms_id_type parms_id){
-            Plaintext destination_ntt;
-            evaluator.transform_to_ntt(plain, parms_id, destination_ntt);
+        .def("transform_to_ntt", [](Evaluator &evaluator, const Plaintext &plain, parms_id_type parms_id, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Plaintext destination_ntt(handle);
+            evaluator.transform_to_ntt(plain, parms_id, destination_ntt, handle);
             return destination_ntt;
-        }, py::arg("plain"), py::arg("parms_id"),
+        }, py::arg("plain"), py::arg("parms_id"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Transform a plaintext to NTT form and return the result."))
         .def("transform_to_ntt_inplace", py::overload_cast<Ciphertext &>(&Evaluator::transform_to_ntt_inplace, py::const_),
-            py::arg("encrypted"),
+            py::arg("encrypted"), release_gil(),
             SEAL_DOC("Transform a ciphertext to NTT form in place."))
         .def("transform_to_ntt", [](Evaluator &evaluator, const Ciphertext &encrypted){
             Ciphertext destination_ntt;
             evaluator.transform_to_ntt(encrypted, destination_ntt);
             return destination_ntt;
-        }, py::arg("encrypted"),
+        }, py::arg("encrypted"), release_gil(),
             SEAL_DOC("Transform a ciphertext to NTT form and return the result."))
-        .def("transform_from_ntt_inplace", &Evaluator::transform_from_ntt_inplace, py::arg("encrypted_ntt"),
+        .def("transform_from_ntt_inplace", &Evaluator::transform_from_ntt_inplace, py::arg("encrypted_ntt"), release_gil(),
             SEAL_DOC("Transform an NTT-form ciphertext back to coefficient form in place."))
         .def("transform_from_ntt", [](Evaluator &evaluator, const Ciphertext &encrypted_ntt){
             Ciphertext destination;
             evaluator.transform_from_ntt(encrypted_ntt, destination);
             return destination;
-        }, py::arg("encrypted_ntt"),
+        }, py::arg("encrypted_ntt"), release_gil(),
             SEAL_DOC("Transform an NTT-form ciphertext back to coefficient form and return the result."))
-        .def("apply_galois_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, std::uint32_t galois_elt, const GaloisKeys &galois_keys){
-            evaluator.apply_galois_inplace(encrypted, galois_elt, galois_keys);
-        }, py::arg("encrypted"), py::arg("galois_elt"), py::arg("galois_keys"),
+        .def("apply_galois_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, std::uint32_t galois_elt, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            evaluator.apply_galois_inplace(encrypted, galois_elt, galois_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("galois_elt"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Apply a Galois automorphism to a ciphertext in place."))
-        .def("apply_galois", [](Evaluator &evaluator, const Ciphertext &encrypted, std::uint32_t galois_elt, const GaloisKeys &galois_keys){
-            Ciphertext destination;
-            evaluator.apply_galois(encrypted, galois_elt, galois_keys, destination);
+        .def("apply_galois", [](Evaluator &evaluator, const Ciphertext &encrypted, std::uint32_t galois_elt, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.apply_galois(encrypted, galois_elt, galois_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("galois_elt"), py::arg("galois_keys"),
+        }, py::arg("encrypted"), py::arg("galois_elt"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Apply a Galois automorphism to a ciphertext and return the result."))
-        .def("rotate_rows_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys){
-            evaluator.rotate_rows_inplace(encrypted, steps, galois_keys);
-        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"),
+        .def("rotate_rows_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            evaluator.rotate_rows_inplace(encrypted, steps, galois_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rotate BFV/BGV batching rows in place."))
-        .def("rotate_rows", [](Evaluator &evaluator, const Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys){
-            Ciphertext destination;
-            evaluator.rotate_rows(encrypted, steps, galois_keys, destination);
+        .def("rotate_rows", [](Evaluator &evaluator, const Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.rotate_rows(encrypted, steps, galois_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"),
+        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rotate BFV/BGV batching rows and return the result."))
-        .def("rotate_columns_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const GaloisKeys &galois_keys){
-            evaluator.rotate_columns_inplace(encrypted, galois_keys);
-        }, py::arg("encrypted"), py::arg("galois_keys"),
+        .def("rotate_columns_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            evaluator.rotate_columns_inplace(encrypted, galois_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rotate BFV/BGV batching columns in place."))
-        .def("rotate_columns", [](Evaluator &evaluator, const Ciphertext &encrypted, const GaloisKeys &galois_keys){
-            Ciphertext destination;
-            evaluator.rotate_columns(encrypted, galois_keys, destination);
+        .def("rotate_columns", [](Evaluator &evaluator, const Ciphertext &encrypted, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.rotate_columns(encrypted, galois_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("galois_keys"),
+        }, py::arg("encrypted"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rotate BFV/BGV batching columns and return the result."))
-        .def("rotate_vector_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys){
-            evaluator.rotate_vector_inplace(encrypted, steps, galois_keys);
-        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"),
+        .def("rotate_vector_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            evaluator.rotate_vector_inplace(encrypted, steps, galois_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rotate a CKKS vector in place."))
-        .def("rotate_vector", [](Evaluator &evaluator, const Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys){
-            Ciphertext destination;
-            evaluator.rotate_vector(encrypted, steps, galois_keys, destination);
+        .def("rotate_vector", [](Evaluator &evaluator, const Ciphertext &encrypted, int steps, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.rotate_vector(encrypted, steps, galois_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"),
+        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Rotate a CKKS vector and return the result."))
-        .def("complex_conjugate_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const GaloisKeys &galois_keys){
-            evaluator.complex_conjugate_inplace(encrypted, galois_keys);
-        }, py::arg("encrypted"), py::arg("galois_keys"),
+        .def("complex_conjugate_inplace", [](Evaluator &evaluator, Ciphertext &encrypted, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            evaluator.complex_conjugate_inplace(encrypted, galois_keys, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Apply CKKS complex conjugation in place."))
-        .def("complex_conjugate", [](Evaluator &evaluator, const Ciphertext &encrypted, const GaloisKeys &galois_keys){
-            Ciphertext destination;
-            evaluator.complex_conjugate(encrypted, galois_keys, destination);
+        .def("complex_conjugate", [](Evaluator &evaluator, const Ciphertext &encrypted, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Ciphertext destination(handle);
+            evaluator.complex_conjugate(encrypted, galois_keys, destination, handle);
             return destination;
-        }, py::arg("encrypted"), py::arg("galois_keys"),
-            SEAL_DOC("Apply CKKS complex conjugation and return the result."));
+        }, py::arg("encrypted"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Apply CKKS complex conjugation and return the result."))
+        .def("add_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds1,
+                const std::vector<const Ciphertext *> &encrypteds2, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            check_same_size(encrypteds1, encrypteds2.size());
+            return map_batch(encrypteds1.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.add(deref_item(encrypteds1[i], "encrypteds1"), deref_item(encrypteds2[i], "encrypteds2"), destination);
+            });
+        }, py::arg("encrypteds1"), py::arg("encrypteds2"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Add two lists of ciphertexts element-wise on the native thread pool and return the results."))
+        .def("sub_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds1,
+                const std::vector<const Ciphertext *> &encrypteds2, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            check_same_size(encrypteds1, encrypteds2.size());
+            return map_batch(encrypteds1.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.sub(deref_item(encrypteds1[i], "encrypteds1"), deref_item(encrypteds2[i], "encrypteds2"), destination);
+            });
+        }, py::arg("encrypteds1"), py::arg("encrypteds2"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Subtract two lists of ciphertexts element-wise on the native thread pool and return the results."))
+        .def("multiply_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds1,
+                const std::vector<const Ciphertext *> &encrypteds2, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            check_same_size(encrypteds1, encrypteds2.size());
+            return map_batch(encrypteds1.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.multiply(deref_item(encrypteds1[i], "encrypteds1"), deref_item(encrypteds2[i], "encrypteds2"), destination, handle);
+            });
+        }, py::arg("encrypteds1"), py::arg("encrypteds2"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Multiply two lists of ciphertexts element-wise on the native thread pool and return the results."))
+        .def("add_plain_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds,
+                const std::vector<const Plaintext *> &plains, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            check_same_size(encrypteds, plains.size());
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.add_plain(deref_item(encrypteds[i], "encrypteds"), deref_item(plains[i], "plains"), destination, handle);
+            });
+        }, py::arg("encrypteds"), py::arg("plains"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Add plaintexts to ciphertexts element-wise on the native thread pool and return the results."))
+        .def("multiply_plain_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds,
+                const std::vector<const Plaintext *> &plains, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            check_same_size(encrypteds, plains.size());
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.multiply_plain(deref_item(encrypteds[i], "encrypteds"), deref_item(plains[i], "plains"), destination, handle);
+            });
+        }, py::arg("encrypteds"), py::arg("plains"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Multiply ciphertexts by plaintexts element-wise on the native thread pool and return the results."))
+        .def("relinearize_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds,
+                const RelinKeys &relin_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.relinearize(deref_item(encrypteds[i], "encrypteds"), relin_keys, destination, handle);
+            });
+        }, py::arg("encrypteds"), py::arg("relin_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Relinearize a list of ciphertexts on the native thread pool and return the results."))
+        .def("rescale_to_next_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.rescale_to_next(deref_item(encrypteds[i], "encrypteds"), destination, handle);
+            });
+        }, py::arg("encrypteds"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Rescale a list of CKKS ciphertexts to the next level on the native thread pool and return the results."))
+        .def("rotate_rows_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds, int steps,
+                const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.rotate_rows(deref_item(encrypteds[i], "encrypteds"), steps, galois_keys, destination, handle);
+            });
+        }, py::arg("encrypteds"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Rotate the BFV/BGV batching rows of every ciphertext by steps on the native thread pool."))
+        .def("rotate_vector_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds, int steps,
+                const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.rotate_vector(deref_item(encrypteds[i], "encrypteds"), steps, galois_keys, destination, handle);
+            });
+        }, py::arg("encrypteds"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Rotate every CKKS ciphertext by steps on the native thread pool and return the results."))
+        .def("rotate_vector_batch", [](Evaluator &evaluator, const std::vector<const Ciphertext *> &encrypteds,
+                const std::vector<int> &steps, const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            check_same_size(encrypteds, steps.size());
+            return map_batch(encrypteds.size(), handle, [&](std::size_t i, Ciphertext &destination){
+                evaluator.rotate_vector(deref_item(encrypteds[i], "encrypteds"), steps[i], galois_keys, destination, handle);
+            });
+        }, py::arg("encrypteds"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Rotate each CKKS ciphertext by its own step count on the native thread pool and return the results."))
+        .def("rotate_rows_many", [](const Evaluator &evaluator, const Ciphertext &encrypted, const std::vector<int> &steps,
+                const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto context = context_registry().find(encrypted.parms_id());
+            return rotate_many(*context, evaluator, encrypted, steps, galois_keys, true, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Rotate one BFV/BGV ciphertext by every step, decomposing it once, and return the rotations in order."))
+        .def("rotate_vector_many", [](const Evaluator &evaluator, const Ciphertext &encrypted, const std::vector<int> &steps,
+                const GaloisKeys &galois_keys, const MemoryPoolHandle *pool){
+            auto context = context_registry().find(encrypted.parms_id());
+            return rotate_many(*context, evaluator, encrypted, steps, galois_keys, false, pool_or_default(pool));
+        }, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
+            SEAL_DOC("Rotate one CKKS ciphertext by every step, decomposing it once, and return the rotations in order."));
 
     // ckks.h
     py::class_<CKKSEncoder>(m, "CKKSEncoder", SEAL_DOC("Encodes floating-point and complex vectors into CKKS plaintext polynomials."))
         .def(py::init<const SEALContext &>(), py::arg("context"),
             SEAL_DOC("Create a CKKS encoder for the given context."))
         .def("slot_count", &CKKSEncoder::slot_count, SEAL_DOC("Return the number of SIMD slots available for CKKS encoding."))
-        .def("encode_complex", [](CKKSEncoder &encoder, const std::vector<std::complex<double>> &values, double scale, Plaintext &destination){
-            encoder.encode(values, scale, destination);
-        }, py::arg("values"), py::arg("scale"), py::arg("destination"),
+        .def("encode_complex", [](CKKSEncoder &encoder, const std::vector<std::complex<double>> &values, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            encoder.encode(values, scale, destination, handle);
+        }, py::arg("values"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a vector of complex values into destination."))
-        .def("encode", [](CKKSEncoder &encoder, const std::vector<double> &values, double scale, Plaintext &destination){
-            encoder.encode(values, scale, destination);
-        }, py::arg("values"), py::arg("scale"), py::arg("destination"),
+        .def("encode", [](CKKSEncoder &encoder, const std::vector<double> &values, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            encoder.encode(values, scale, destination, handle);
+        }, py::arg("values"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a vector of real values into destination."))
-        .def("encode_complex", [](CKKSEncoder &encoder, py::array_t<std::complex<double>> values, double scale){
-            py::buffer_info buf = values.request();
-            if (buf.ndim == 0)
+        .def("encode_complex", [](CKKSEncoder &encoder, py::array array, double scale, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            contiguous_array<std::complex<double>> values(array);
+            if (values.ndim() == 0)
             {
-                auto *ptr = static_cast<std::complex<double> *>(buf.ptr);
-                Plaintext pt;
-                encoder.encode(ptr[0], scale, pt);
-                return pt;
-            }
-            if (buf.ndim != 1)
-                throw std::runtime_error("E101: Number of dimensions must be one");
-
-            auto *ptr = static_cast<std::complex<double> *>(buf.ptr);
-            std::vector<std::complex<double>> vec(static_cast<std::size_t>(buf.shape[0]));
-
-            for (py::ssize_t i = 0; i < buf.shape[0]; i++)
-                vec[static_cast<std::size_t>(i)] = ptr[i];
-
-            Plaintext pt;
-            encoder.encode(vec, scale, pt);
-            return pt;
-        }, py::arg("values"), py::arg("scale"),
-            SEAL_DOC("Encode a NumPy array or scalar of complex values and return the plaintext."))
-        .def("encode_complex", [](CKKSEncoder &encoder, py::array_t<std::complex<double>> values, double scale, Plaintext &destination){
-            py::buffer_info buf = values.request();
-            if (buf.ndim == 0)
-            {
-                auto *ptr = static_cast<std::complex<double> *>(buf.ptr);
-                encoder.encode(ptr[0], scale, destination);
-                return;
+                Plaintext pt(handle);
+                {
+                    py::gil_scoped_release release;
+                    encoder.encode(*values.data(), scale, pt, handle);
+                }
+                return py::cast(std::move(pt));
             }
-            if (buf.ndim != 1)
+            return encode_rows(values, handle, [&](const std::complex<double> *row, std::size_t count, Plaintext &destination){
+                ckks_encode(encoder, row, count, scale, destination, handle);
+            });
+        }, py::arg("values"), py::arg("scale"), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Encode a NumPy scalar or 1-D array of complex values and return the plaintext. "
+                "A 2-D array of shape (batch, slots) is encoded row by row in parallel and returns a list of plaintexts."))
+        .def("encode_complex", [](CKKSEncoder &encoder, py::array array, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            contiguous_array<std::complex<double>> values(array);
+            if (values.ndim() > 1)
                 throw std::runtime_error("E101: Number of dimensions must be one");
 
-            auto *ptr = static_cast<std::complex<double> *>(buf.ptr);
-            std::vector<std::complex<double>> vec(static_cast<std::size_t>(buf.shape[0]));
-
-            for (py::ssize_t i = 0; i < buf.shape[0]; i++)
-                vec[static_cast<std::size_t>(i)] = ptr[i];
-
-            encoder.encode(vec, scale, destination);
-        }, py::arg("values"), py::arg("scale"), py::arg("destination"),
+            const std::complex<double> *ptr = values.data();
+            std::size_t count = values.ndim() == 0 ? 1 : static_cast<std::size_t>(values.shape(0));
+            py::gil_scoped_release release;
+            if (values.ndim() == 0)
+                encoder.encode(*ptr, scale, destination, handle);
+            else
+                ckks_encode(encoder, ptr, count, scale, destination, handle);
+        }, py::arg("values"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(),
             SEAL_DOC("Encode a NumPy array or scalar of complex values into destination."))
-        .def("encode", [](CKKSEncoder &encoder, py::array_t<double> values, double scale){
-            py::buffer_info buf = values.request();
-            if (buf.ndim != 1)
-                throw std::runtime_error("E101: Number of dimensions must be one");
-
-            double *ptr = (double *)buf.ptr;
-            std::vector<double> vec(buf.shape[0]);
-
-            for (auto i = 0; i < buf.shape[0]; i++)
-                vec[i] = ptr[i];
-
-            Plaintext pt;
-            encoder.encode(vec, scale, pt);
-            return pt;
-        }, py::arg("values"), py::arg("scale"),
-            SEAL_DOC("Encode a one-dimensional NumPy array of real values and return the plaintext."))
-        .def("encode_complex", [](CKKSEncoder &encoder, py::iterable values, double scale){
+        .def("encode", [](CKKSEncoder &encoder, py::array array, double scale, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            contiguous_array<double> values(array);
+            return encode_rows(values, handle, [&](const double *row, std::size_t count, Plaintext &destination){
+                ckks_encode(encoder, row, count, scale, destination, handle);
+            });
+        }, py::arg("values"), py::arg("scale"), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Encode a one-dimensional NumPy array of real values and return the plaintext. "
+                "A 2-D array of shape (batch, slots) is encoded row by row in parallel and returns a list of plaintexts."))
+        .def("encode_complex", [](CKKSEncoder &encoder, py::iterable values, double scale, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
             std::vector<std::complex<double>> vec;
             vec.reserve(py::len(values));
             for (const auto &value : values)
                 vec.push_back(py::cast<std::complex<double>>(value));
 
-            Plaintext pt;
-            encoder.encode(vec, scale, pt);
+            Plaintext pt(handle);
+            {
+                py::gil_scoped_release release;
+                encoder.encode(vec, scale, pt, handle);
+            }
             return pt;
-        }, py::arg("values"), py::arg("scale"),
+        }, py::arg("values"), py::arg("scale"), py::kw_only(), py::arg("pool")=py::none(),
             SEAL_DOC("Encode an iterable of complex values and return the plaintext."))
-        .def("encode_complex", [](CKKSEncoder &encoder, py::iterable values, double scale, Plaintext &destination){
+        .def("encode_complex", [](CKKSEncoder &encoder, py::iterable values, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
             std::vector<std::complex<double>> vec;
             vec.reserve(py::len(values));
             for (const auto &value : values)
                 vec.push_back(py::cast<std::complex<double>>(value));
-            encoder.encode(vec, scale, destination);
-        }, py::arg("values"), py::arg("scale"), py::arg("destination"),
+
+            py::gil_scoped_release release;
+            encoder.encode(vec, scale, destination, handle);
+        }, py::arg("values"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(),
             SEAL_DOC("Encode an iterable of complex values into destination."))
-        .def("encode", [](CKKSEncoder &encoder, py::iterable values, double scale){
+        .def("encode", [](CKKSEncoder &encoder, py::iterable values, double scale, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
             std::vector<double> vec;
             vec.reserve(py::len(values));
             for (const auto &value : values)
                 vec.push_back(py::cast<double>(value));
 
-            Plaintext pt;
-            encoder.encode(vec, scale, pt);
+            Plaintext pt(handle);
+            {
+                py::gil_scoped_release release;
+                encoder.encode(vec, scale, pt, handle);
+            }
             return pt;
-        }, py::arg("values"), py::arg("scale"),
+        }, py::arg("values"), py::arg("scale"), py::kw_only(), py::arg("pool")=py::none(),
             SEAL_DOC("Encode an iterable of real values and return the plaintext."))
-        .def("encode", [](CKKSEncoder &encoder, py::iterable values, double scale, Plaintext &destination){
+        .def("encode", [](CKKSEncoder &encoder, py::iterable values, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
             std::vector<double> vec;
             vec.reserve(py::len(values));
             for (const auto &value : values)
                 vec.push_back(py::cast<double>(value));
-            encoder.encode(vec, scale, destination);
-        }, py::arg("values"), py::arg("scale"), py::arg("destination"),
+
+            py::gil_scoped_release release;
+            encoder.encode(vec, scale, destination, handle);
+        }, py::arg("values"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(),
             SEAL_DOC("Encode an iterable of real values into destination."))
-        .def("encode", [](CKKSEncoder &encoder, double value, double scale){
-            Plaintext pt;
-            encoder.encode(value, scale, pt);
+        .def("encode", [](CKKSEncoder &encoder, double value, double scale, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Plaintext pt(handle);
+            encoder.encode(value, scale, pt, handle);
             return pt;
-        }, py::arg("value"), py::arg("scale"),
+        }, py::arg("value"), py::arg("scale"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a single real value and return the plaintext."))
-        .def("encode", [](CKKSEncoder &encoder, double value, double scale, Plaintext &destination){
-            encoder.encode(value, scale, destination);
-        }, py::arg("value"), py::arg("scale"), py::arg("destination"),
+        .def("encode", [](CKKSEncoder &encoder, double value, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            encoder.encode(value, scale, destination, handle);
+        }, py::arg("value"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a single real value into destination."))
-        .def("encode_complex", [](CKKSEncoder &encoder, std::complex<double> value, double scale){
-            Plaintext pt;
-            encoder.encode(value, scale, pt);
+        .def("encode_complex", [](CKKSEncoder &encoder, std::complex<double> value, double scale, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Plaintext pt(handle);
+            encoder.encode(value, scale, pt, handle);
             return pt;
-        }, py::arg("value"), py::arg("scale"),
+        }, py::arg("value"), py::arg("scale"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a single complex value and return the plaintext."))
-        .def("encode_complex", [](CKKSEncoder &encoder, std::complex<double> value, double scale, Plaintext &destination){
-            encoder.encode(value, scale, destination);
-        }, py::arg("value"), py::arg("scale"), py::arg("destination"),
+        .def("encode_complex", [](CKKSEncoder &encoder, std::complex<double> value, double scale, Plaintext &destination, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            encoder.encode(value, scale, destination, handle);
+        }, py::arg("value"), py::arg("scale"), py::arg("destination"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a single complex value into destination."))
-        .def("encode", [](CKKSEncoder &encoder, std::int64_t value){
-            Plaintext pt;
+        .def("encode", [](CKKSEncoder &encoder, std::int64_t value, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            Plaintext pt(handle);
             encoder.encode(value, pt);
             return pt;
-        }, py::arg("value"),
+        }, py::arg("value"), py::kw_only(), py::arg("pool")=py::none(), release_gil(),
             SEAL_DOC("Encode a signed integer exactly into a CKKS plaintext."))
         .def("encode", [](CKKSEncoder &encoder, std::int64_t value, Plaintext &destination){
             encoder.encode(value, destination);
-        }, py::arg("value"), py::arg("destination"),
+        }, py::arg("value"), py::arg("destination"), release_gil(),
             SEAL_DOC("Encode a signed integer exactly into destination."))
-        .def("decode", [](CKKSEncoder &encoder, const Plaintext &plain){
-            std::vector<double> destination;
-            encoder.decode(plain, destination);
-
-            py::array_t<double> values(destination.size());
-            py::buffer_info buf = values.request();
-            double *ptr = (double *)buf.ptr;
-
-            for (auto i = 0; i < buf.shape[0]; i++)
-                ptr[i] = destination[i];
-
+        .def("decode", [](CKKSEncoder &encoder, const Plaintext &plain, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto values = output_array<double>(out, { static_cast<py::ssize_t>(encoder.slot_count()) });
+            double *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                decode_into(encoder, plain, ptr, handle);
+            }
             return values;
-        }, py::arg("plain"),
-            SEAL_DOC("Decode a CKKS plaintext into a NumPy array of real values."))
-        .def("decode_complex", [](CKKSEncoder &encoder, const Plaintext &plain){
-            std::vector<std::complex<double>> destination;
-            encoder.decode(plain, destination);
-
-            py::array_t<std::complex<double>> values(destination.size());
-            py::buffer_info buf = values.request();
-            auto *ptr = static_cast<std::complex<double> *>(buf.ptr);
-
-            for (py::ssize_t i = 0; i < buf.shape[0]; i++)
-                ptr[i] = destination[static_cast<std::size_t>(i)];
-
+        }, py::arg("plain"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a CKKS plaintext into a NumPy array of real values. If out is given, it must be a writable C-contiguous "
+                "float64 array of length slot_count() and is filled in place and returned."))
+        .def("decode_many", [](CKKSEncoder &encoder, const std::vector<const Plaintext *> &plains, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto slots = encoder.slot_count();
+            auto values = output_array<double>(out, { static_cast<py::ssize_t>(plains.size()), static_cast<py::ssize_t>(slots) });
+            double *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                batch_pool().parallel_for(plains.size(), [&](std::size_t i){
+                    decode_into(encoder, deref_item(plains[i], "plains"), ptr + i * slots, handle);
+                });
+            }
             return values;
-        }, py::arg("plain"),
-            SEAL_DOC("Decode a CKKS plaintext into a NumPy array of complex values."));
+        }, py::arg("plains"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a list of CKKS plaintexts in parallel into one (batch, slots) array of real values. If out is given, it must be a writable C-contiguous float64 array of shape "
+                "(len(plains), slot_count()) and is filled in place and returned."))
+        .def("decode_complex", [](CKKSEncoder &encoder, const Plaintext &plain, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto values = output_array<std::complex<double>>(out, { static_cast<py::ssize_t>(encoder.slot_count()) });
+            std::complex<double> *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                decode_into(encoder, plain, ptr, handle);
+            }
+            return values;
+        }, py::arg("plain"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a CKKS plaintext into a NumPy array of complex values. If out is given, it must be a writable C-contiguous "
+                "complex128 array of length slot_count() and is filled in place and returned."))
+        .def("decode_complex_many", [](CKKSEncoder &encoder, const std::vector<const Plaintext *> &plains, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto slots = encoder.slot_count();
+            auto values = output_array<std::complex<double>>(out, { static_cast<py::ssize_t>(plains.size()), static_cast<py::ssize_t>(slots) });
+            std::complex<double> *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                batch_pool().parallel_for(plains.size(), [&](std::size_t i){
+                    decode_into(encoder, deref_item(plains[i], "plains"), ptr + i * slots, handle);
+                });
+            }
+            return values;
+        }, py::arg("plains"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a list of CKKS plaintexts in parallel into one (batch, slots) array of complex values. If out is given, it must be a writable C-contiguous complex128 array of shape "
+                "(len(plains), slot_count()) and is filled in place and returned."));
 
     // decryptor.h
     py::class_<Decryptor>(m, "Decryptor", SEAL_DOC("Decrypts ciphertexts using the secret key and inspects their remaining noise budget."))
-        .def(py::init<const SEALContext &, const SecretKey &>(), py::arg("context"), py::arg("secret_key"),
+        .def(py::init<const SEALContext &, const SecretKey &>(), py::arg("context"), py::arg("secret_key"), release_gil(),
             SEAL_DOC("Create a decryptor for the given context and secret key."))
-        .def("decrypt", &Decryptor::decrypt, py::arg("encrypted"), py::arg("destination"),
+        .def("decrypt", &Decryptor::decrypt, py::arg("encrypted"), py::arg("destination"), release_gil(),
             SEAL_DOC("Decrypt a ciphertext into destination."))
-        .def("invariant_noise_budget", &Decryptor::invariant_noise_budget, py::arg("encrypted"),
+        .def("invariant_noise_budget", &Decryptor::invariant_noise_budget, py::arg("encrypted"), release_gil(),
             SEAL_DOC("Return the invariant noise budget of a ciphertext in bits."))
         .def("decrypt", [](Decryptor &decryptor, const Ciphertext &encrypted){
             Plaintext pt;
             decryptor.decrypt(encrypted, pt);
             return pt;
-        }, py::arg("encrypted"),
+        }, py::arg("encrypted"), release_gil(),
             SEAL_DOC("Decrypt a ciphertext and return the plaintext."));
 
     // batchencoder.h
@@ -1102,81 +5847,632 @@ PYBIND11_MODULE(seal, m)
         .def("slot_count", &BatchEncoder::slot_count, SEAL_DOC("Return the number of batching slots available."))
         .def("encode", [](BatchEncoder &encoder, const std::vector<std::int64_t> &values, Plaintext &destination){
             encoder.encode(values, destination);
-        }, py::arg("values"), py::arg("destination"),
+        }, py::arg("values"), py::arg("destination"), release_gil(),
             SEAL_DOC("Encode a vector of signed integers into destination."))
         .def("encode", [](BatchEncoder &encoder, const std::vector<std::uint64_t> &values, Plaintext &destination){
             encoder.encode(values, destination);
-        }, py::arg("values"), py::arg("destination"),
+        }, py::arg("values"), py::arg("destination"), release_gil(),
             SEAL_DOC("Encode a vector of unsigned integers into destination."))
-        .def("encode", [](BatchEncoder &encoder, py::array_t<std::int64_t> values){
-            py::buffer_info buf = values.request();
-            if (buf.ndim != 1)
-                throw std::runtime_error("E101: Number of dimensions must be one");
-
-            std::int64_t *ptr = (std::int64_t *)buf.ptr;
-            std::vector<std::int64_t> vec(buf.shape[0]);
-
-            for (auto i = 0; i < buf.shape[0]; i++)
-                vec[i] = ptr[i];
-
-            Plaintext pt;
-            encoder.encode(vec, pt);
-            return pt;
-        }, py::arg("values"),
-            SEAL_DOC("Encode a one-dimensional NumPy array of signed integers and return the plaintext."))
-        .def("encode", [](BatchEncoder &encoder, py::array_t<std::uint64_t> values){
-            py::buffer_info buf = values.request();
-            if (buf.ndim != 1)
-                throw std::runtime_error("E101: Number of dimensions must be one");
-
-            auto *ptr = static_cast<std::uint64_t *>(buf.ptr);
-            std::vector<std::uint64_t> vec(static_cast<std::size_t>(buf.shape[0]));
-
-            for (py::ssize_t i = 0; i < buf.shape[0]; i++)
-                vec[static_cast<std::size_t>(i)] = ptr[i];
-
-            Plaintext pt;
-            encoder.encode(vec, pt);
-            return pt;
-        }, py::arg("values"),
-            SEAL_DOC("Encode a one-dimensional NumPy array of unsigned integers and return the plaintext."))
-        .def("encode", [](BatchEncoder &encoder, py::iterable values){
+        .def("encode", [](BatchEncoder &encoder, py::array array, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            if (py::isinstance<py::array_t<std::uint64_t>>(array))
+            {
+                contiguous_array<std::uint64_t> values(array);
+                return encode_rows(values, handle, [&](const std::uint64_t *row, std::size_t count, Plaintext &destination){
+                    batch_encode(encoder, row, count, destination);
+                });
+            }
+            contiguous_array<std::int64_t> values(array);
+            return encode_rows(values, handle, [&](const std::int64_t *row, std::size_t count, Plaintext &destination){
+                batch_encode(encoder, row, count, destination);
+            });
+        }, py::arg("values"), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Encode a one-dimensional NumPy array of integers and return the plaintext. uint64 arrays are encoded "
+                "as unsigned values, everything else as signed 64-bit integers. A 2-D array of shape (batch, slots) is "
+                "encoded row by row in parallel and returns a list of plaintexts."))
+        .def("encode", [](BatchEncoder &encoder, py::iterable values, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
             std::vector<std::int64_t> vec;
             vec.reserve(py::len(values));
             for (const auto &value : values)
                 vec.push_back(py::cast<std::int64_t>(value));
 
-            Plaintext pt;
-            encoder.encode(vec, pt);
+            Plaintext pt(handle);
+            {
+                py::gil_scoped_release release;
+                encoder.encode(vec, pt);
+            }
             return pt;
-        }, py::arg("values"),
+        }, py::arg("values"), py::kw_only(), py::arg("pool")=py::none(),
             SEAL_DOC("Encode an iterable of integers and return the plaintext."))
-        .def("decode_uint64", [](BatchEncoder &encoder, const Plaintext &plain){
-            std::vector<std::uint64_t> destination;
-            encoder.decode(plain, destination);
+        .def("decode_uint64", [](BatchEncoder &encoder, const Plaintext &plain, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto values = output_array<std::uint64_t>(out, { static_cast<py::ssize_t>(encoder.slot_count()) });
+            std::uint64_t *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                decode_into(encoder, plain, ptr, handle);
+            }
+            return values;
+        }, py::arg("plain"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a batched plaintext into a NumPy array of unsigned 64-bit integers. If out is given, it must be a writable C-contiguous "
+                "uint64 array of length slot_count() and is filled in place and returned."))
+        .def("decode_uint64_many", [](BatchEncoder &encoder, const std::vector<const Plaintext *> &plains, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto slots = encoder.slot_count();
+            auto values = output_array<std::uint64_t>(out, { static_cast<py::ssize_t>(plains.size()), static_cast<py::ssize_t>(slots) });
+            std::uint64_t *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                batch_pool().parallel_for(plains.size(), [&](std::size_t i){
+                    decode_into(encoder, deref_item(plains[i], "plains"), ptr + i * slots, handle);
+                });
+            }
+            return values;
+        }, py::arg("plains"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a list of batched plaintexts in parallel into one (batch, slots) array of unsigned 64-bit integers. If out is given, it must be a writable C-contiguous uint64 array of shape "
+                "(len(plains), slot_count()) and is filled in place and returned."))
+        .def("decode", [](BatchEncoder &encoder, const Plaintext &plain, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto values = output_array<std::int64_t>(out, { static_cast<py::ssize_t>(encoder.slot_count()) });
+            std::int64_t *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                decode_into(encoder, plain, ptr, handle);
+            }
+            return values;
+        }, py::arg("plain"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a batched plaintext into a NumPy array of signed 64-bit integers. If out is given, it must be a writable C-contiguous "
+                "int64 array of length slot_count() and is filled in place and returned."))
+        .def("decode_many", [](BatchEncoder &encoder, const std::vector<const Plaintext *> &plains, py::object out, const MemoryPoolHandle *pool){
+            auto handle = pool_or_default(pool);
+            auto slots = encoder.slot_count();
+            auto values = output_array<std::int64_t>(out, { static_cast<py::ssize_t>(plains.size()), static_cast<py::ssize_t>(slots) });
+            std::int64_t *ptr = values.mutable_data();
+            {
+                py::gil_scoped_release release;
+                batch_pool().parallel_for(plains.size(), [&](std::size_t i){
+                    decode_into(encoder, deref_item(plains[i], "plains"), ptr + i * slots, handle);
+                });
+            }
+            return values;
+        }, py::arg("plains"), py::arg("out")=py::none(), py::kw_only(), py::arg("pool")=py::none(),
+            SEAL_DOC("Decode a list of batched plaintexts in parallel into one (batch, slots) array of signed 64-bit integers. If out is given, it must be a writable C-contiguous int64 array of shape "
+                "(len(plains), slot_count()) and is filled in place and returned."));
 
-            py::array_t<std::uint64_t> values(destination.size());
-            py::buffer_info buf = values.request();
-            auto *ptr = static_cast<std::uint64_t *>(buf.ptr);
+    // container files
+    py::class_<ContainerWriter>(m, "ContainerWriter",
+        SEAL_DOC("Writes many ciphertexts and plaintexts into one container file with a parms_id header and an offset index."))
+        .def(py::init<const std::string &, std::shared_ptr<SEALContext>>(), py::arg("path"), py::arg("context"),
+            SEAL_DOC("Create or truncate a container file for objects of the given context."))
+        .def("append", py::overload_cast<const Ciphertext &, compr_mode_type>(&ContainerWriter::append),
+            py::arg("cipher"), py::arg("compr_mode")=Serialization::compr_mode_default, release_gil(),
+            SEAL_DOC("Append a ciphertext and return its record index."))
+        .def("append", py::overload_cast<const Plaintext &, compr_mode_type>(&ContainerWriter::append),
+            py::arg("plain"), py::arg("compr_mode")=Serialization::compr_mode_default, release_gil(),
+            SEAL_DOC("Append a plaintext and return its record index."))
+        .def("close", &ContainerWriter::close, release_gil(),
+            SEAL_DOC("Write the index and close the file. Called automatically when used as a context manager."))
+        .def("__len__", &ContainerWriter::size, SEAL_DOC("Return the number of records written so far."))
+        .def("__enter__", [](py::object self){
+            return self;
+        })
+        .def("__exit__", [](ContainerWriter &writer, py::args){
+            py::gil_scoped_release release;
+            writer.close();
+        });
 
-            for (py::ssize_t i = 0; i < buf.shape[0]; i++)
-                ptr[i] = destination[static_cast<std::size_t>(i)];
+    py::class_<ContainerReader>(m, "ContainerReader",
+        SEAL_DOC("Memory-maps a container file and loads records lazily by index or slice."))
+        .def(py::init<const std::string &, std::shared_ptr<SEALContext>>(), py::arg("path"), py::arg("context")=py::none(),
+            SEAL_DOC("Open a container file. Without a context, records are bound to the live SEALContext matching the header parms_id."))
+        .def("__len__", &ContainerReader::size, SEAL_DOC("Return the number of records in the container."))
+        .def("__getitem__", py::overload_cast<py::ssize_t>(&ContainerReader::get), py::arg("index"),
+            SEAL_DOC("Load one record as a Ciphertext or Plaintext."))
+        .def("__getitem__", py::overload_cast<const py::slice &>(&ContainerReader::get), py::arg("slice"),
+            SEAL_DOC("Load a slice of records in parallel and return them as a list."))
+        .def("parms_id", &ContainerReader::parms_id, SEAL_DOC("Return the key-level parms_id recorded in the header."))
+        .def("close", &ContainerReader::close, SEAL_DOC("Unmap and close the file."))
+        .def("__enter__", [](py::object self){
+            return self;
+        })
+        .def("__exit__", [](ContainerReader &reader, py::args){
+            reader.close();
+        });
 
-            return values;
-        }, py::arg("plain"),
-            SEAL_DOC("Decode a batched plaintext into a NumPy array of unsigned 64-bit integers."))
-        .def("decode", [](BatchEncoder &encoder, const Plaintext &plain){
-            std::vector<std::int64_t> destination;
-            encoder.decode(plain, destination);
+    py::class_<CiphertextWriter>(m, "CiphertextWriter",
+        SEAL_DOC("Writes framed ciphertexts and plaintexts incrementally to a binary stream such as a file, pipe, socket file or gzip.open()."))
+        .def(py::init<py::object, std::shared_ptr<SEALContext>>(), py::arg("stream"), py::arg("context"),
+            SEAL_DOC("Write the stream header for the given context to a binary stream opened for writing."))
+        .def("write", py::overload_cast<const Ciphertext &, compr_mode_type>(&CiphertextWriter::write),
+            py::arg("cipher"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Append one ciphertext frame to the stream."))
+        .def("write", py::overload_cast<const Plaintext &, compr_mode_type>(&CiphertextWriter::write),
+            py::arg("plain"), py::arg("compr_mode")=Serialization::compr_mode_default,
+            SEAL_DOC("Append one plaintext frame to the stream."))
+        .def("flush", &CiphertextWriter::flush, SEAL_DOC("Flush the underlying stream."));
 
-            py::array_t<std::int64_t> values(destination.size());
-            py::buffer_info buf = values.request();
-            std::int64_t *ptr = (std::int64_t *)buf.ptr;
+    py::class_<CiphertextReader>(m, "CiphertextReader",
+        SEAL_DOC("Iterates over the ciphertexts and plaintexts in a stream written by CiphertextWriter, reading one frame at a time."))
+        .def(py::init<py::object, std::shared_ptr<SEALContext>, std::size_t>(), py::arg("stream"), py::arg("context")=py::none(),
+            py::arg("max_frame_bytes")=0,
+            SEAL_DOC("Read the stream header. Without a context, objects are bound to the live SEALContext matching the header parms_id. "
+                "Frames larger than max_frame_bytes are rejected as corrupted; 0 allows an uncompressed ciphertext of the maximum "
+                "size at the key level."))
+        .def("__iter__", [](py::object self){
+            return self;
+        })
+        .def("__next__", &CiphertextReader::next, SEAL_DOC("Load the next object, raising StopIteration at the end of the stream."));
 
-            for (auto i = 0; i < buf.shape[0]; i++)
-                ptr[i] = destination[i];
+    py::class_<GaloisKeyPlan>(m, "GaloisKeyPlan",
+        SEAL_DOC("Galois key set chosen by plan_galois_keys, with the composition of every requested rotation."))
+        .def("steps", [](const GaloisKeyPlan &plan){
+            return plan.steps;
+        }, SEAL_DOC("Return the rotation steps to pass to KeyGenerator.create_galois_keys."))
+        .def("key_bytes", &GaloisKeyPlan::key_bytes,
+            SEAL_DOC("Return the estimated in-memory size of the planned keys in bytes. Uncompressed serialization is about the same, "
+                "seed-compressed serialization about half."))
+        .def("bytes_per_key", [](const GaloisKeyPlan &plan){
+            return plan.bytes_per_key;
+        }, SEAL_DOC("Return the estimated size of one Galois key in bytes."))
+        .def("path", &GaloisKeyPlan::path, py::arg("rotation"),
+            SEAL_DOC("Return the planned steps whose rotations compose to the requested rotation."))
+        .def("rotation_cost", [](const GaloisKeyPlan &plan, int rotation){
+            return plan.path(rotation).size();
+        }, py::arg("rotation"),
+            SEAL_DOC("Return the number of key-switching rotations needed for the requested rotation."))
+        .def("extra_rotations", &GaloisKeyPlan::extra_rotations,
+            SEAL_DOC("Return the total number of rotations beyond one per requested rotation."));
 
-            return values;
-        }, py::arg("plain"),
-            SEAL_DOC("Decode a batched plaintext into a NumPy array of signed 64-bit integers."));
+    py::class_<LinearTransform>(m, "LinearTransform",
+        SEAL_DOC("Pre-encoded CKKS matrix-vector product using baby-step giant-step rotations."))
+        .def(py::init([](const SEALContext &context, const contiguous_array<double> &matrix, double scale,
+                const py::object &parms_id, std::size_t baby_steps){
+            auto level = parms_id.is_none() ? context.first_parms_id() : parms_id.cast<parms_id_type>();
+            auto entries = matrix_entries(matrix);
+            auto transform = std::make_unique<LinearTransform>(context, static_cast<std::size_t>(matrix.shape(0)),
+                static_cast<std::size_t>(matrix.shape(1)), entries, scale, level, baby_steps);
+            py::gil_scoped_release release;
+            transform->encoded(level);
+            return transform;
+        }), py::arg("context"), py::arg("matrix"), py::arg("scale"), py::arg("parms_id")=py::none(), py::arg("baby_steps")=0,
+            SEAL_DOC("Encode the diagonals of a (rows, columns) matrix at scale and parms_id, the first data level by default. "
+                "baby_steps defaults to the power of two nearest the square root of the padded dimension."))
+        .def("apply", &LinearTransform::apply, py::arg("encrypted"), py::arg("galois_keys"), release_gil(),
+            SEAL_DOC("Return M x for a ciphertext holding x in its first columns slots and zeros elsewhere. "
+                "The result holds M x in its first rows slots, at the product of both scales and not rescaled. "
+                "Diagonals are encoded again the first time a new level is used."))
+        .def("galois_steps", &LinearTransform::galois_steps,
+            SEAL_DOC("Return the rotation steps apply() uses, to pass to KeyGenerator.create_galois_keys."))
+        .def("rotation_count", &LinearTransform::rotation_count,
+            SEAL_DOC("Return the number of key-switching rotations per apply()."))
+        .def("shape", [](const LinearTransform &transform){
+            return py::make_tuple(transform.rows(), transform.columns());
+        }, SEAL_DOC("Return the matrix shape as (rows, columns)."))
+        .def("baby_steps", &LinearTransform::baby_steps, SEAL_DOC("Return the baby-step count n1."))
+        .def("diagonal_count", &LinearTransform::diagonal_count, SEAL_DOC("Return the number of nonzero diagonals encoded."))
+        .def("scale", &LinearTransform::scale, SEAL_DOC("Return the scale the diagonals are encoded at."));
+
+    py::class_<EncryptedMatMul>(m, "EncryptedMatMul",
+        SEAL_DOC("Encrypted square matrix product for CKKS with pre-encoded permutation plaintexts."))
+        .def(py::init([](std::shared_ptr<SEALContext> context, std::size_t dimension, const py::object &parms_id,
+                const py::object &cache_path){
+            auto level = parms_id.is_none() ? context->first_parms_id() : parms_id.cast<parms_id_type>();
+            auto path = cache_path.is_none() ? std::string() : cache_path.cast<std::string>();
+            return std::make_unique<EncryptedMatMul>(std::move(context), dimension, level, path);
+        }), py::arg("context"), py::arg("dimension"), py::arg("parms_id")=py::none(), py::arg("cache_path")=py::none(),
+            SEAL_DOC("Encode the permutation plaintexts for dimension x dimension matrices at parms_id, the first data level by default. "
+                "If cache_path is given, the plaintexts are loaded from that container file when it matches and written to it otherwise."))
+        .def("multiply", &EncryptedMatMul::multiply, py::arg("encrypted1"), py::arg("encrypted2"), py::arg("relin_keys"), py::arg("galois_keys"),
+            release_gil(),
+            SEAL_DOC("Return the encrypted product of two row-major encrypted matrices, relinearized and rescaled. "
+                "Inputs above parms_id are switched down to it; the result is three levels below parms_id at the product of the input scales "
+                "divided by the last prime dropped."))
+        .def("galois_steps", &EncryptedMatMul::galois_steps,
+            SEAL_DOC("Return the rotation steps multiply() uses, to pass to KeyGenerator.create_galois_keys."))
+        .def("dimension", &EncryptedMatMul::dimension, SEAL_DOC("Return the matrix dimension."))
+        .def("parms_id", &EncryptedMatMul::parms_id, SEAL_DOC("Return the parms_id the inputs are multiplied at."));
+
+    py::class_<PlaintextCache>(m, "PlaintextCache",
+        SEAL_DOC("Memory-bounded LRU cache of encoded plaintexts keyed by a digest of the values, the scale and the target parms_id."))
+        .def(py::init<const SEALContext &, std::size_t>(), py::arg("context"), py::arg("max_bytes")=std::size_t(1) << 28,
+            SEAL_DOC("Create an empty cache for the given context holding at most max_bytes of plaintext data, 256 MiB by default."))
+        .def("encode", [](PlaintextCache &cache, const contiguous_array<double> &values, double scale, const py::object &parms_id){
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return cache.encode(values, scale, level);
+        }, py::arg("values"), py::arg("scale"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Return the CKKS plaintext for a 1-D array of real values at scale and parms_id, the first data level by default, "
+                "encoding it only on a cache miss."))
+        .def("encode_complex", [](PlaintextCache &cache, const contiguous_array<std::complex<double>> &values, double scale, const py::object &parms_id){
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return cache.encode(values, scale, level);
+        }, py::arg("values"), py::arg("scale"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Return the CKKS plaintext for a 1-D array of complex values at scale and parms_id, the first data level by default, "
+                "encoding it only on a cache miss."))
+        .def("encode_integers", [](PlaintextCache &cache, const contiguous_array<std::int64_t> &values, const py::object &parms_id){
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return cache.encode(values, level);
+        }, py::arg("values"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Return the BFV/BGV batched plaintext for a 1-D array of signed 64-bit integers, encoding it only on a cache miss. "
+                "With parms_id, the plaintext is in NTT form at that level."))
+        .def("encode_integers", [](PlaintextCache &cache, const contiguous_array<std::uint64_t> &values, const py::object &parms_id){
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return cache.encode(values, level);
+        }, py::arg("values"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Return the BFV/BGV batched plaintext for a 1-D array of unsigned 64-bit integers, encoding it only on a cache miss. "
+                "With parms_id, the plaintext is in NTT form at that level."))
+        .def("clear", &PlaintextCache::clear, SEAL_DOC("Drop every cached plaintext; the counters are kept."))
+        .def("__len__", &PlaintextCache::size, SEAL_DOC("Return the number of cached plaintexts."))
+        .def("bytes", &PlaintextCache::bytes, SEAL_DOC("Return the plaintext data currently cached, in bytes."))
+        .def("max_bytes", &PlaintextCache::max_bytes, SEAL_DOC("Return the memory bound in bytes."))
+        .def("hits", &PlaintextCache::hits, SEAL_DOC("Return the number of lookups served from the cache."))
+        .def("misses", &PlaintextCache::misses, SEAL_DOC("Return the number of lookups that had to encode."))
+        .def("evictions", &PlaintextCache::evictions, SEAL_DOC("Return the number of plaintexts evicted to stay within max_bytes."));
+
+    // slot packing
+    auto packed_records = [](const SlotPacker &packer, const py::array &records){
+        if (records.ndim() != 2 || static_cast<std::size_t>(records.shape(1)) != packer.width())
+            throw std::invalid_argument("records must have shape (count, " + std::to_string(packer.width()) + ")");
+        return static_cast<std::size_t>(records.shape(0));
+    };
+    auto unpack_as = [](auto *tag, const SlotPacker &packer, const std::vector<const Plaintext *> &plains,
+        const py::object &count, const py::object &out) -> py::object {
+        using T = std::remove_pointer_t<decltype(tag)>;
+        auto records = count.is_none() ? plains.size() * packer.capacity() : count.cast<std::size_t>();
+        auto values = output_array<T>(out, { static_cast<py::ssize_t>(records), static_cast<py::ssize_t>(packer.width()) });
+        T *ptr = values.mutable_data();
+        {
+            py::gil_scoped_release release;
+            packer.unpack(plains, records, ptr);
+        }
+        return values;
+    };
+
+    py::class_<SlotPacker>(m, "SlotPacker",
+        SEAL_DOC("Packs many fixed-width records into the slots of each plaintext. Record i lives in plaintext i // capacity() "
+            "at slot offset(i % capacity())."))
+        .def(py::init<const SEALContext &, std::size_t>(), py::arg("context"), py::arg("width"),
+            SEAL_DOC("Create a packer for records of width slots under a CKKS context or a BFV/BGV context with batching."))
+        .def("width", &SlotPacker::width, SEAL_DOC("Return the number of slots per record."))
+        .def("capacity", &SlotPacker::capacity, SEAL_DOC("Return the number of records packed into one plaintext."))
+        .def("slot_count", &SlotPacker::slot_count, SEAL_DOC("Return the number of slots per plaintext."))
+        .def("plain_count", &SlotPacker::plain_count, py::arg("records"),
+            SEAL_DOC("Return the number of plaintexts needed to hold the given number of records."))
+        .def("offset", &SlotPacker::offset, py::arg("position"),
+            SEAL_DOC("Return the first slot of the record at position within its plaintext."))
+        .def("locate", &SlotPacker::locate, py::arg("record"),
+            SEAL_DOC("Return (plaintext index, slot offset) of a record."))
+        .def("locate", [](const SlotPacker &packer, const contiguous_array<std::uint64_t> &records){
+            auto count = static_cast<py::ssize_t>(records.size());
+            py::array_t<std::uint64_t> indices(count), offsets(count);
+            const std::uint64_t *data = records.data();
+            std::uint64_t *index_ptr = indices.mutable_data(), *offset_ptr = offsets.mutable_data();
+            for (py::ssize_t i = 0; i < count; i++)
+                std::tie(index_ptr[i], offset_ptr[i]) = packer.locate(static_cast<std::size_t>(data[i]));
+            return py::make_tuple(indices, offsets);
+        }, py::arg("records"),
+            SEAL_DOC("Return (plaintext indices, slot offsets) arrays for an array of records."))
+        .def("pack", [packed_records](const SlotPacker &packer, const contiguous_array<double> &records, double scale, const py::object &parms_id){
+            auto count = packed_records(packer, records);
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return packer.pack(records.data(), count, scale, level);
+        }, py::arg("records"), py::arg("scale"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Pack a (count, width) array of real records into plain_count(count) CKKS plaintexts at scale and parms_id, "
+                "the first data level by default, encoded in parallel. Unused slots are zero."))
+        .def("pack_integers", [packed_records](const SlotPacker &packer, const contiguous_array<std::int64_t> &records, const py::object &parms_id){
+            auto count = packed_records(packer, records);
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return packer.pack(records.data(), count, level);
+        }, py::arg("records"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Pack a (count, width) array of signed 64-bit records into BFV/BGV plaintexts, encoded in parallel. "
+                "With parms_id, the plaintexts are in NTT form at that level."))
+        .def("pack_integers", [packed_records](const SlotPacker &packer, const contiguous_array<std::uint64_t> &records, const py::object &parms_id){
+            auto count = packed_records(packer, records);
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            py::gil_scoped_release release;
+            return packer.pack(records.data(), count, level);
+        }, py::arg("records"), py::arg("parms_id")=py::none(),
+            SEAL_DOC("Pack a (count, width) array of unsigned 64-bit records into BFV/BGV plaintexts, encoded in parallel. "
+                "With parms_id, the plaintexts are in NTT form at that level."))
+        .def("unpack", [unpack_as](const SlotPacker &packer, const std::vector<const Plaintext *> &plains, const py::object &count, const py::object &out){
+            return unpack_as(static_cast<double *>(nullptr), packer, plains, count, out);
+        }, py::arg("plains"), py::arg("count")=py::none(), py::arg("out")=py::none(),
+            SEAL_DOC("Decode the first count records, every record by default, of CKKS plaintexts into a (count, width) float64 array, "
+                "in parallel. If out is given, it must be a writable C-contiguous array of that shape and is filled in place."))
+        .def("unpack_integers", [unpack_as](const SlotPacker &packer, const std::vector<const Plaintext *> &plains, const py::object &count,
+            bool is_signed, const py::object &out){
+            if (is_signed)
+                return unpack_as(static_cast<std::int64_t *>(nullptr), packer, plains, count, out);
+            return unpack_as(static_cast<std::uint64_t *>(nullptr), packer, plains, count, out);
+        }, py::arg("plains"), py::arg("count")=py::none(), py::arg("signed")=true, py::arg("out")=py::none(),
+            SEAL_DOC("Decode the first count records, every record by default, of BFV/BGV plaintexts into a (count, width) int64 array, "
+                "or uint64 with signed=False, in parallel. If out is given, it must be a writable C-contiguous array of that shape."))
+        .def("mask", [](const SlotPacker &packer, const std::vector<std::size_t> &positions, const py::object &parms_id, const py::object &scale){
+            auto level = parms_id.is_none() ? parms_id_zero : parms_id.cast<parms_id_type>();
+            auto mask_scale = scale.is_none() ? 0.0 : scale.cast<double>();
+            py::gil_scoped_release release;
+            return packer.mask(positions, level, mask_scale);
+        }, py::arg("positions"), py::arg("parms_id")=py::none(), py::arg("scale")=py::none(),
+            SEAL_DOC("Return a plaintext with ones in the slots of the records at positions and zeros elsewhere. CKKS masks default to the "
+                "last prime of their level as scale, so rescale_to_next after multiply_plain restores the ciphertext's scale. "
+                "BFV/BGV masks are in NTT form at parms_id if given."))
+        .def("extract", [](const SlotPacker &packer, const Ciphertext &encrypted, std::size_t position, const GaloisKeys *galois_keys){
+            py::gil_scoped_release release;
+            return packer.extract(encrypted, position, galois_keys);
+        }, py::arg("encrypted"), py::arg("position"), py::arg("galois_keys")=py::none(),
+            SEAL_DOC("Multiply encrypted by the mask of the record at position, zeroing every other slot, and with galois_keys rotate "
+                "the record to slot 0. CKKS results carry the mask's scale and are ready for rescale_to_next."));
+
+    // lazy circuits
+    auto node_of = [](const std::shared_ptr<Circuit> &circuit, const CircuitNode &node){
+        if (node.circuit != circuit)
+            throw std::invalid_argument("node belongs to a different Circuit");
+        return node.id;
+    };
+    auto node_ids = [node_of](const std::shared_ptr<Circuit> &circuit, const std::vector<CircuitNode> &nodes){
+        std::vector<std::size_t> ids;
+        for (auto &node : nodes)
+            ids.push_back(node_of(circuit, node));
+        return ids;
+    };
+    auto binary = [node_of](CircuitOp op){
+        return [node_of, op](const std::shared_ptr<Circuit> &circuit, const CircuitNode &a, const CircuitNode &b){
+            return CircuitNode{ circuit, circuit->binary(op, node_of(circuit, a), node_of(circuit, b)) };
+        };
+    };
+    auto unary = [node_of](CircuitOp op){
+        return [node_of, op](const std::shared_ptr<Circuit> &circuit, const CircuitNode &a){
+            return CircuitNode{ circuit, circuit->unary(op, node_of(circuit, a), 0) };
+        };
+    };
+    auto rotation = [node_of](CircuitOp op){
+        return [node_of, op](const std::shared_ptr<Circuit> &circuit, const CircuitNode &a, int steps){
+            return CircuitNode{ circuit, circuit->unary(op, node_of(circuit, a), steps) };
+        };
+    };
+
+    py::class_<CircuitNode>(m, "CircuitNode",
+        SEAL_DOC("Handle to a value recorded in a Circuit. Supports +, -, * and unary - with other nodes of the same circuit."))
+        .def("__add__", [binary](const CircuitNode &a, const CircuitNode &b){
+            return binary(CircuitOp::add)(a.circuit, a, b);
+        }, py::is_operator())
+        .def("__sub__", [binary](const CircuitNode &a, const CircuitNode &b){
+            return binary(CircuitOp::sub)(a.circuit, a, b);
+        }, py::is_operator())
+        .def("__mul__", [binary](const CircuitNode &a, const CircuitNode &b){
+            return binary(CircuitOp::multiply)(a.circuit, a, b);
+        }, py::is_operator())
+        .def("__neg__", [unary](const CircuitNode &a){
+            return unary(CircuitOp::negate)(a.circuit, a);
+        })
+        .def("is_plain", [](const CircuitNode &node){
+            return node.circuit->is_plain(node.id);
+        }, SEAL_DOC("Return True if the node is a plaintext input."));
+
+    py::class_<Circuit, std::shared_ptr<Circuit>>(m, "Circuit",
+        SEAL_DOC("Records Evaluator operations lazily and runs them optimized and in parallel in evaluate()."))
+        .def(py::init<const SEALContext &>(), py::arg("context"),
+            SEAL_DOC("Create an empty circuit for the given context."))
+        .def("input", [](const std::shared_ptr<Circuit> &circuit, const Ciphertext &encrypted){
+            return CircuitNode{ circuit, circuit->input(encrypted) };
+        }, py::arg("encrypted"), SEAL_DOC("Record a copy of a ciphertext input and return its node."))
+        .def("input", [](const std::shared_ptr<Circuit> &circuit, const Plaintext &plain){
+            return CircuitNode{ circuit, circuit->input(plain) };
+        }, py::arg("plain"), SEAL_DOC("Record a copy of a plaintext input and return its node."))
+        .def("add", binary(CircuitOp::add), py::arg("a"), py::arg("b"),
+            SEAL_DOC("Record a + b. One operand may be a plaintext."))
+        .def("sub", binary(CircuitOp::sub), py::arg("a"), py::arg("b"),
+            SEAL_DOC("Record a - b. One operand may be a plaintext."))
+        .def("multiply", binary(CircuitOp::multiply), py::arg("a"), py::arg("b"),
+            SEAL_DOC("Record a * b. One operand may be a plaintext."))
+        .def("square", [node_of](const std::shared_ptr<Circuit> &circuit, const CircuitNode &a){
+            auto id = node_of(circuit, a);
+            return CircuitNode{ circuit, circuit->binary(CircuitOp::multiply, id, id) };
+        }, py::arg("a"), SEAL_DOC("Record a * a."))
+        .def("negate", unary(CircuitOp::negate), py::arg("a"), SEAL_DOC("Record -a."))
+        .def("rotate_vector", rotation(CircuitOp::rotate_vector), py::arg("a"), py::arg("steps"),
+            SEAL_DOC("Record a CKKS vector rotation of a."))
+        .def("rotate_rows", rotation(CircuitOp::rotate_rows), py::arg("a"), py::arg("steps"),
+            SEAL_DOC("Record a BFV/BGV row rotation of a."))
+        .def("rotate_columns", unary(CircuitOp::rotate_columns), py::arg("a"),
+            SEAL_DOC("Record a BFV/BGV column rotation of a."))
+        .def("rescale", unary(CircuitOp::rescale), py::arg("a"),
+            SEAL_DOC("Record a CKKS rescale of a to the next level."))
+        .def("evaluate", [node_of](const std::shared_ptr<Circuit> &circuit, const CircuitNode &output,
+                const RelinKeys *relin_keys, const GaloisKeys *galois_keys){
+            auto id = node_of(circuit, output);
+            py::gil_scoped_release release;
+            return circuit->evaluate({ id }, relin_keys, galois_keys)[0];
+        }, py::arg("output"), py::arg("relin_keys")=py::none(), py::arg("galois_keys")=py::none(),
+            SEAL_DOC("Run the operations output depends on and return its ciphertext at the highest level its operations allow. "
+                "With relin_keys, products are relinearized where the optimizer places them and the result has size 2; "
+                "galois_keys are needed for rotations."))
+        .def("evaluate", [node_ids](const std::shared_ptr<Circuit> &circuit, const std::vector<CircuitNode> &outputs,
+                const RelinKeys *relin_keys, const GaloisKeys *galois_keys){
+            auto ids = node_ids(circuit, outputs);
+            py::gil_scoped_release release;
+            return circuit->evaluate(ids, relin_keys, galois_keys);
+        }, py::arg("outputs"), py::arg("relin_keys")=py::none(), py::arg("galois_keys")=py::none(),
+            SEAL_DOC("Run the operations the outputs depend on, sharing common work, and return one ciphertext per output."))
+        .def("counts", [node_ids](const std::shared_ptr<Circuit> &circuit, const std::vector<CircuitNode> &outputs, bool relinearize){
+            return circuit->counts(node_ids(circuit, outputs), relinearize);
+        }, py::arg("outputs"), py::arg("relinearize")=true,
+            SEAL_DOC("Return how many operations of each kind evaluate() would run for the outputs, after optimization."))
+        .def("__len__", &Circuit::size, SEAL_DOC("Return the number of recorded nodes."));
+
+    py::class_<ManagedEvaluator>(m, "ManagedEvaluator",
+        SEAL_DOC("Evaluator that aligns operand levels and CKKS scales automatically and counts the RNS limbs each operation touched."))
+        .def(py::init<const SEALContext &, double>(), py::arg("context"), py::arg("scale_tolerance")=0.0,
+            SEAL_DOC("Create a managed evaluator. CKKS scales whose relative difference is within scale_tolerance are treated as equal "
+                "by overwriting the scale; others are corrected exactly with a multiplication by one and a rescale."))
+        .def("add", &ManagedEvaluator::add, py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
+            SEAL_DOC("Return encrypted1 + encrypted2 at their lowest common level and a common scale."))
+        .def("sub", &ManagedEvaluator::sub, py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
+            SEAL_DOC("Return encrypted1 - encrypted2 at their lowest common level and a common scale."))
+        .def("add_many", &ManagedEvaluator::add_many, py::arg("encrypteds"), release_gil(),
+            SEAL_DOC("Return the sum of the ciphertexts at their lowest common level and a common scale."))
+        .def("multiply", &ManagedEvaluator::multiply, py::arg("encrypted1"), py::arg("encrypted2"), py::arg("relin_keys")=py::none(),
+            release_gil(),
+            SEAL_DOC("Return encrypted1 * encrypted2 at their lowest common level, relinearized if relin_keys is given and rescaled for CKKS."))
+        .def("multiply_plain", py::overload_cast<const Ciphertext &, const Plaintext &>(&ManagedEvaluator::multiply_plain),
+            py::arg("encrypted"), py::arg("plain"), release_gil(),
+            SEAL_DOC("Return encrypted * plain at their lowest common level, rescaled for CKKS."))
+        .def("multiply_plain", py::overload_cast<const Ciphertext &, const contiguous_array<double> &>(&ManagedEvaluator::multiply_plain),
+            py::arg("encrypted"), py::arg("values"), release_gil(),
+            SEAL_DOC("Return encrypted times CKKS values (a scalar or 1-D array) encoded at its level and rescaled, keeping its scale."))
+        .def("add_plain", py::overload_cast<const Ciphertext &, const Plaintext &>(&ManagedEvaluator::add_plain),
+            py::arg("encrypted"), py::arg("plain"), release_gil(),
+            SEAL_DOC("Return encrypted + plain at their lowest common level."))
+        .def("add_plain", py::overload_cast<const Ciphertext &, const contiguous_array<double> &>(&ManagedEvaluator::add_plain),
+            py::arg("encrypted"), py::arg("values"), release_gil(),
+            SEAL_DOC("Return encrypted plus CKKS values (a scalar or 1-D array) encoded at its level and scale."))
+        .def("sub_plain", py::overload_cast<const Ciphertext &, const Plaintext &>(&ManagedEvaluator::sub_plain),
+            py::arg("encrypted"), py::arg("plain"), release_gil(),
+            SEAL_DOC("Return encrypted - plain at their lowest common level."))
+        .def("sub_plain", py::overload_cast<const Ciphertext &, const contiguous_array<double> &>(&ManagedEvaluator::sub_plain),
+            py::arg("encrypted"), py::arg("values"), release_gil(),
+            SEAL_DOC("Return encrypted minus CKKS values (a scalar or 1-D array) encoded at its level and scale."))
+        .def("negate", &ManagedEvaluator::negate, py::arg("encrypted"), release_gil(), SEAL_DOC("Return -encrypted."))
+        .def("rotate_vector", &ManagedEvaluator::rotate_vector, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), release_gil(),
+            SEAL_DOC("Return a CKKS vector rotation of encrypted."))
+        .def("rotate_rows", &ManagedEvaluator::rotate_rows, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"), release_gil(),
+            SEAL_DOC("Return a BFV/BGV row rotation of encrypted."))
+        .def("rotate_columns", &ManagedEvaluator::rotate_columns, py::arg("encrypted"), py::arg("galois_keys"), release_gil(),
+            SEAL_DOC("Return a BFV/BGV column rotation of encrypted."))
+        .def("align", py::overload_cast<const Ciphertext &, const Ciphertext &>(&ManagedEvaluator::align),
+            py::arg("encrypted1"), py::arg("encrypted2"), release_gil(),
+            SEAL_DOC("Return copies of both ciphertexts at their lowest common level and, for CKKS, a common scale."))
+        .def("stats", &ManagedEvaluator::stats,
+            SEAL_DOC("Return {operation: (calls, limbs)} for every Evaluator call made, where limbs sums the RNS limbs of the ciphertext "
+                "each call ran on."))
+        .def("reset_stats", &ManagedEvaluator::reset_stats, SEAL_DOC("Clear the operation counters."));
+
+    // profiling
+    py::class_<Profile>(m, "Profile",
+        SEAL_DOC("Per-method call counts, wall time histograms and memory pool growth of Evaluator, Encryptor, Decryptor, encoder "
+            "and serialization calls, by ciphertext level. Methods are only instrumented while a profile is active."))
+        .def(py::init<>(), SEAL_DOC("Create an inactive profile."))
+        .def("start", &Profile::start, SEAL_DOC("Start recording calls made from any thread."))
+        .def("stop", &Profile::stop, SEAL_DOC("Stop recording; the original bindings are restored once no profile is active."))
+        .def("active", &Profile::active, SEAL_DOC("Return whether the profile is recording."))
+        .def("reset", &Profile::reset, SEAL_DOC("Discard everything recorded so far."))
+        .def("to_dict", &Profile::to_dict,
+            SEAL_DOC("Return {method: {calls, total_ns, alloc_bytes, levels}} where levels maps the chain index (None when unknown) "
+                "to the same counters plus a histogram of (upper bound in seconds, calls) pairs."))
+        .def("to_prometheus", &Profile::to_prometheus, py::arg("prefix")="seal",
+            SEAL_DOC("Return the counters in the Prometheus text exposition format."))
+        .def("__enter__", [](py::object self){
+            self.cast<Profile &>().start();
+            return self;
+        })
+        .def("__exit__", [](Profile &profile, py::args){
+            profile.stop();
+        });
+
+    m.def("profile", [](){
+        return std::make_unique<Profile>();
+    }, SEAL_DOC("Return a new Profile; use it as a context manager to record the calls made inside the block."));
+
+    // asyncio facades
+    py::class_<AsyncExecutor, std::shared_ptr<AsyncExecutor>>(m, "AsyncExecutor",
+        SEAL_DOC("Native worker threads that run the Async* facades and complete their asyncio futures on the submitting loop. "
+            "At most max_pending calls are queued or running; later calls wait in order and are dropped if cancelled before they start. "
+            "Once max_waiting calls are waiting, further calls raise RuntimeError."))
+        .def(py::init<std::size_t, std::size_t, std::size_t>(), py::arg("workers")=0, py::arg("max_pending")=0, py::arg("max_waiting")=0,
+            SEAL_DOC("Start workers threads (zero selects one per hardware core); max_pending zero selects twice the worker count "
+                "and max_waiting zero four times max_pending."))
+        .def("workers", &AsyncExecutor::workers, SEAL_DOC("Return the number of worker threads."))
+        .def("max_pending", &AsyncExecutor::max_pending, SEAL_DOC("Return how many calls may be queued or running at once."))
+        .def("max_waiting", &AsyncExecutor::max_waiting, SEAL_DOC("Return how many calls may wait for a slot before submissions are rejected."))
+        .def("running", &AsyncExecutor::running, SEAL_DOC("Return the number of calls queued for or running on a worker."))
+        .def("waiting", &AsyncExecutor::waiting, SEAL_DOC("Return the number of calls waiting for a free slot."));
+
+    m.def("default_async_executor", &default_async_executor,
+        SEAL_DOC("Return the executor shared by Async* facades created without one."));
+
+    py::class_<AsyncEvaluator>(m, "AsyncEvaluator",
+        SEAL_DOC("Evaluator whose methods return asyncio futures and run on an AsyncExecutor, so the event loop is never blocked."))
+        .def(py::init<const SEALContext &, std::shared_ptr<AsyncExecutor>>(), py::arg("context"), py::arg("executor")=py::none(),
+            SEAL_DOC("Create an asyncio evaluator; without an executor the default_async_executor() is used."))
+        .def("negate", &AsyncEvaluator::negate, py::arg("encrypted"), SEAL_DOC("Await -encrypted."))
+        .def("add", &AsyncEvaluator::add, py::arg("encrypted1"), py::arg("encrypted2"), SEAL_DOC("Await encrypted1 + encrypted2."))
+        .def("sub", &AsyncEvaluator::sub, py::arg("encrypted1"), py::arg("encrypted2"), SEAL_DOC("Await encrypted1 - encrypted2."))
+        .def("add_many", &AsyncEvaluator::add_many, py::arg("encrypteds"), SEAL_DOC("Await the sum of the ciphertexts."))
+        .def("multiply", &AsyncEvaluator::multiply, py::arg("encrypted1"), py::arg("encrypted2"),
+            SEAL_DOC("Await encrypted1 * encrypted2, without relinearization."))
+        .def("square", &AsyncEvaluator::square, py::arg("encrypted"), SEAL_DOC("Await encrypted squared, without relinearization."))
+        .def("relinearize", &AsyncEvaluator::relinearize, py::arg("encrypted"), py::arg("relin_keys"),
+            SEAL_DOC("Await the relinearized ciphertext."))
+        .def("exponentiate", &AsyncEvaluator::exponentiate, py::arg("encrypted"), py::arg("exponent"), py::arg("relin_keys"),
+            SEAL_DOC("Await encrypted raised to exponent, relinearizing after every multiplication."))
+        .def("add_plain", &AsyncEvaluator::add_plain, py::arg("encrypted"), py::arg("plain"), SEAL_DOC("Await encrypted + plain."))
+        .def("sub_plain", &AsyncEvaluator::sub_plain, py::arg("encrypted"), py::arg("plain"), SEAL_DOC("Await encrypted - plain."))
+        .def("multiply_plain", &AsyncEvaluator::multiply_plain, py::arg("encrypted"), py::arg("plain"),
+            SEAL_DOC("Await encrypted * plain."))
+        .def("mod_switch_to_next", &AsyncEvaluator::mod_switch_to_next, py::arg("encrypted"),
+            SEAL_DOC("Await the ciphertext mod-switched to the next level."))
+        .def("mod_switch_to", &AsyncEvaluator::mod_switch_to, py::arg("encrypted"), py::arg("parms_id"),
+            SEAL_DOC("Await the ciphertext mod-switched to parms_id."))
+        .def("rescale_to_next", &AsyncEvaluator::rescale_to_next, py::arg("encrypted"),
+            SEAL_DOC("Await the CKKS ciphertext rescaled to the next level."))
+        .def("rescale_to", &AsyncEvaluator::rescale_to, py::arg("encrypted"), py::arg("parms_id"),
+            SEAL_DOC("Await the CKKS ciphertext rescaled to parms_id."))
+        .def("rotate_rows", &AsyncEvaluator::rotate_rows, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"),
+            SEAL_DOC("Await a BFV/BGV row rotation."))
+        .def("rotate_columns", &AsyncEvaluator::rotate_columns, py::arg("encrypted"), py::arg("galois_keys"),
+            SEAL_DOC("Await a BFV/BGV column rotation."))
+        .def("rotate_vector", &AsyncEvaluator::rotate_vector, py::arg("encrypted"), py::arg("steps"), py::arg("galois_keys"),
+            SEAL_DOC("Await a CKKS vector rotation."))
+        .def("complex_conjugate", &AsyncEvaluator::complex_conjugate, py::arg("encrypted"), py::arg("galois_keys"),
+            SEAL_DOC("Await the CKKS complex conjugate."))
+        .def("executor", &AsyncEvaluator::executor, SEAL_DOC("Return the executor the calls run on."));
+
+    py::class_<AsyncEncryptor>(m, "AsyncEncryptor", SEAL_DOC("Encryptor whose methods return asyncio futures and run on an AsyncExecutor."))
+        .def(py::init<const SEALContext &, const PublicKey *, const SecretKey *, std::shared_ptr<AsyncExecutor>>(),
+            py::arg("context"), py::arg("public_key")=py::none(), py::arg("secret_key")=py::none(), py::arg("executor")=py::none(),
+            SEAL_DOC("Create an asyncio encryptor from a public key, a secret key or both."))
+        .def("encrypt", &AsyncEncryptor::encrypt, py::arg("plain"), SEAL_DOC("Await the plaintext encrypted with the public key."))
+        .def("encrypt_symmetric", &AsyncEncryptor::encrypt_symmetric, py::arg("plain"),
+            SEAL_DOC("Await the plaintext encrypted with the secret key."))
+        .def("encrypt_zero", &AsyncEncryptor::encrypt_zero, SEAL_DOC("Await an encryption of zero at the first data level."))
+        .def("executor", &AsyncEncryptor::executor, SEAL_DOC("Return the executor the calls run on."));
+
+    py::class_<AsyncDecryptor>(m, "AsyncDecryptor", SEAL_DOC("Decryptor whose methods return asyncio futures and run on an AsyncExecutor."))
+        .def(py::init<const SEALContext &, const SecretKey &, std::shared_ptr<AsyncExecutor>>(),
+            py::arg("context"), py::arg("secret_key"), py::arg("executor")=py::none(),
+            SEAL_DOC("Create an asyncio decryptor."))
+        .def("decrypt", &AsyncDecryptor::decrypt, py::arg("encrypted"), SEAL_DOC("Await the decrypted plaintext."))
+        .def("invariant_noise_budget", &AsyncDecryptor::invariant_noise_budget, py::arg("encrypted"),
+            SEAL_DOC("Await the invariant noise budget in bits."))
+        .def("executor", &AsyncDecryptor::executor, SEAL_DOC("Return the executor the calls run on."));
+
+    py::class_<AsyncCKKSEncoder>(m, "AsyncCKKSEncoder", SEAL_DOC("CKKSEncoder whose methods return asyncio futures and run on an AsyncExecutor."))
+        .def(py::init<const SEALContext &, std::shared_ptr<AsyncExecutor>>(), py::arg("context"), py::arg("executor")=py::none(),
+            SEAL_DOC("Create an asyncio CKKS encoder."))
+        .def("encode", &AsyncCKKSEncoder::encode, py::arg("values"), py::arg("scale"),
+            SEAL_DOC("Await a 1-D array of real values encoded at scale; the values are copied before the call returns."))
+        .def("decode", &AsyncCKKSEncoder::decode, py::arg("plain"), SEAL_DOC("Await the decoded slots as a float64 array."))
+        .def("executor", &AsyncCKKSEncoder::executor, SEAL_DOC("Return the executor the calls run on."));
+
+    py::class_<AsyncBatchEncoder>(m, "AsyncBatchEncoder", SEAL_DOC("BatchEncoder whose methods return asyncio futures and run on an AsyncExecutor."))
+        .def(py::init<const SEALContext &, std::shared_ptr<AsyncExecutor>>(), py::arg("context"), py::arg("executor")=py::none(),
+            SEAL_DOC("Create an asyncio batch encoder."))
+        .def("encode", &AsyncBatchEncoder::encode, py::arg("values"),
+            SEAL_DOC("Await a 1-D integer array encoded into a plaintext; uint64 arrays are encoded as unsigned values. "
+                "The values are copied before the call returns."))
+        .def("decode", &AsyncBatchEncoder::decode, py::arg("plain"), SEAL_DOC("Await the decoded slots as an int64 array."))
+        .def("decode_uint64", &AsyncBatchEncoder::decode_uint64, py::arg("plain"),
+            SEAL_DOC("Await the decoded slots as a uint64 array."))
+        .def("executor", &AsyncBatchEncoder::executor, SEAL_DOC("Return the executor the calls run on."));
+
+    m.def("plan_galois_keys", &plan_galois_keys, py::arg("context"), py::arg("rotations"), py::arg("max_hops")=2, release_gil(),
+        SEAL_DOC("Choose a small set of rotation steps from which every requested rotation can be composed with at most max_hops rotations. "
+            "Candidates are the requested steps, the power-of-two steps and, for up to 128 distinct rotations, their pairwise differences; "
+            "a greedy cover picks among them."));
 }